@@ -0,0 +1 @@
+"""Whiteprint benchmarks."""
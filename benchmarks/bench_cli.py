@@ -0,0 +1,40 @@
+"""Benchmark the CLI startup."""
+
+import subprocess  # nosec
+import sys
+
+import pytest
+import rich_click as click
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from whiteprint.cli import entrypoint
+
+
+@pytest.mark.parametrize("option", ["--help", "--version"])
+def bench_cold_start(benchmark: BenchmarkFixture, option: str) -> None:
+    """Benchmark a fresh interpreter running `wp --help` or `wp --version`."""
+    command = [
+        sys.executable,
+        "-c",
+        "from whiteprint.cli.entrypoint import whiteprint; whiteprint()",
+        option,
+    ]
+    benchmark.pedantic(
+        subprocess.run,  # nosec
+        args=(command,),
+        kwargs={"check": True, "capture_output": True},
+        rounds=10,
+        warmup_rounds=1,
+    )
+
+
+def bench_list_commands(benchmark: BenchmarkFixture) -> None:
+    """Benchmark the discovery of the commands by the lazy loader."""
+
+    def list_commands() -> list[str]:
+        entrypoint.LazyCommandLoader._list_commands.cache_clear()  # noqa: SLF001
+        return entrypoint.whiteprint.list_commands(
+            click.Context(entrypoint.whiteprint),
+        )
+
+    assert "init" in benchmark(list_commands), "init was not listed."
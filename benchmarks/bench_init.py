@@ -0,0 +1,83 @@
+"""Benchmark the generation of a project from a local template."""
+
+import itertools
+import pathlib
+
+import copier
+from click import testing
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from whiteprint.cli import entrypoint
+
+
+ROUNDS = 3
+"""Number of rounds of each benchmark, in a fresh destination each time."""
+
+ANSWERS = {
+    "project_name": "Benchmark Whiteprint",
+    "author": "Benchmark",
+    "email": "benchmark@whiteprint.test",
+}
+"""The answers of the template."""
+
+
+def bench_copier_render(
+    benchmark: BenchmarkFixture,
+    template: pathlib.Path,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Benchmark the rendering of the template by copier alone."""
+    destinations = (
+        tmp_path / f"project_{index}" for index in itertools.count()
+    )
+    benchmark.pedantic(
+        copier.run_copy,
+        setup=lambda: (
+            (str(template), next(destinations)),
+            {
+                "data": ANSWERS,
+                "defaults": True,
+                "quiet": True,
+                "unsafe": True,
+                "skip_tasks": True,
+            },
+        ),
+        rounds=ROUNDS,
+    )
+
+
+def bench_init(
+    benchmark: BenchmarkFixture,
+    template: pathlib.Path,
+    project_manager: str,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Benchmark a full `init --skip-tests`, post-processing included."""
+    del project_manager
+    runner = testing.CliRunner(mix_stderr=False)
+    destinations = (
+        tmp_path / f"project_{index}" for index in itertools.count()
+    )
+
+    def init(destination: pathlib.Path) -> None:
+        """Generate a project without running its tests."""
+        result = runner.invoke(
+            entrypoint.whiteprint,
+            [
+                "init",
+                str(destination),
+                "--whiteprint-source",
+                str(template),
+                "--defaults",
+                "--no-data",
+                "--skip-tests",
+                "--quiet",
+            ],
+        )
+        assert result.exit_code == 0, result.stderr
+
+    benchmark.pedantic(
+        init,
+        setup=lambda: ((next(destinations),), {}),
+        rounds=ROUNDS,
+    )
@@ -0,0 +1,28 @@
+"""Benchmark the reading of the configuration files."""
+
+import pathlib
+
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from whiteprint.cli.commands import init
+from whiteprint.config_cache import ConfigCache
+
+
+def bench_read_yaml(
+    benchmark: BenchmarkFixture,
+    large_yaml: pathlib.Path,
+) -> None:
+    """Benchmark the parsing of a large configuration file."""
+    assert benchmark(init.read_yaml, large_yaml), "Nothing was read."
+
+
+def bench_read_yaml_cached(
+    benchmark: BenchmarkFixture,
+    large_yaml: pathlib.Path,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Benchmark the reading of a large configuration file from the cache."""
+    cache = ConfigCache(tmp_path / "cache")
+    init.read_yaml(large_yaml, cache=cache)
+
+    assert benchmark(init.read_yaml, large_yaml, cache=cache), "Nothing read."
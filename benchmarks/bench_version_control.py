@@ -0,0 +1,140 @@
+"""Benchmark the version control operations on a large project tree."""
+
+import itertools
+import pathlib
+from collections.abc import Iterator
+
+import pygit2
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.conftest import make_synthetic_tree
+from whiteprint import version_control
+
+
+COMMIT_DATA = version_control.CommitData(message="benchmark")
+"""The data of the benchmarked commits."""
+
+ROUNDS = 5
+"""Number of rounds of each benchmark, on a fresh tree each time."""
+
+
+@pytest.fixture
+def trees(tmp_path: pathlib.Path) -> Iterator[pathlib.Path]:
+    """Fresh synthetic project trees.
+
+    Returns:
+        An iterator of synthetic project trees.
+    """
+    return (
+        make_synthetic_tree(tmp_path / f"project_{index}")
+        for index in itertools.count()
+    )
+
+
+def _committed(
+    trees: Iterator[pathlib.Path],
+    *,
+    shared_objects: pathlib.Path | None = None,
+) -> pygit2.Repository:
+    """Commit a fresh synthetic project tree.
+
+    Args:
+        trees: fresh synthetic project trees.
+        shared_objects: an optional shared object store used as alternate.
+
+    Returns:
+        The committed repository.
+    """
+    return version_control.init_and_commit(
+        next(trees),
+        commit_data=COMMIT_DATA,
+        shared_objects=shared_objects,
+    )
+
+
+def bench_init_and_commit(
+    benchmark: BenchmarkFixture,
+    trees: Iterator[pathlib.Path],
+) -> None:
+    """Benchmark git init, add and commit."""
+    benchmark.pedantic(
+        version_control.init_and_commit,
+        setup=lambda: ((next(trees),), {"commit_data": COMMIT_DATA}),
+        rounds=ROUNDS,
+    )
+
+
+def bench_init_and_commit_shared_objects(
+    benchmark: BenchmarkFixture,
+    trees: Iterator[pathlib.Path],
+    tmp_path: pathlib.Path,
+) -> None:
+    """Benchmark git init, add and commit with a warm shared object store."""
+    shared_objects = tmp_path / "objects.git"
+    version_control.init_and_commit(
+        next(trees),
+        commit_data=COMMIT_DATA,
+        shared_objects=shared_objects,
+    )
+    benchmark.pedantic(
+        version_control.init_and_commit,
+        setup=lambda: (
+            (next(trees),),
+            {"commit_data": COMMIT_DATA, "shared_objects": shared_objects},
+        ),
+        rounds=ROUNDS,
+    )
+
+
+def bench_pack_repository(
+    benchmark: BenchmarkFixture,
+    trees: Iterator[pathlib.Path],
+) -> None:
+    """Benchmark the packing of the loose objects."""
+    benchmark.pedantic(
+        version_control.pack_repository,
+        setup=lambda: ((_committed(trees),), {}),
+        rounds=ROUNDS,
+    )
+
+
+def bench_share_objects(
+    benchmark: BenchmarkFixture,
+    trees: Iterator[pathlib.Path],
+    tmp_path: pathlib.Path,
+) -> None:
+    """Benchmark the move of the loose objects to a shared object store."""
+    shared_objects = tmp_path / "objects.git"
+    benchmark.pedantic(
+        version_control.share_objects,
+        setup=lambda: (
+            (_committed(trees, shared_objects=shared_objects),),
+            {"shared_objects": shared_objects},
+        ),
+        rounds=ROUNDS,
+    )
+
+
+def bench_detach_repository(
+    benchmark: BenchmarkFixture,
+    trees: Iterator[pathlib.Path],
+    tmp_path: pathlib.Path,
+) -> None:
+    """Benchmark the copy of the shared objects into a repository."""
+    shared_objects = tmp_path / "objects.git"
+
+    def shared() -> tuple[tuple[pygit2.Repository], dict[str, object]]:
+        """Commit a fresh tree using the shared object store."""
+        repository = _committed(trees, shared_objects=shared_objects)
+        version_control.share_objects(
+            repository,
+            shared_objects=shared_objects,
+        )
+        return (repository,), {}
+
+    benchmark.pedantic(
+        version_control.detach_repository,
+        setup=shared,
+        rounds=ROUNDS,
+    )
@@ -0,0 +1,94 @@
+"""Shared benchmark configuration file.
+
+The benchmarks use pytest-benchmark. Run them with `tox run -e benchmark`,
+which stores the results as JSON in `.benchmarks/` so that they can be
+compared over time (see `pytest-benchmark compare`).
+"""
+
+import os
+import pathlib
+import shutil
+from typing import Final
+
+import pytest
+
+
+SYNTHETIC_DIRECTORIES: Final = 50
+"""Number of directories of the synthetic project tree."""
+
+SYNTHETIC_FILES: Final = 40
+"""Number of files per directory of the synthetic project tree."""
+
+YAML_KEYS: Final = 5_000
+"""Number of keys of the synthetic configuration file."""
+
+
+@pytest.fixture
+def template() -> pathlib.Path:
+    """A local clone of the Whiteprint template.
+
+    The template is read from WHITEPRINT_REPOSITORY, like the init command.
+    The benchmark is skipped if it is not a local directory, so that no
+    network access is benchmarked.
+
+    Returns:
+        The path of the template.
+    """
+    source = pathlib.Path(os.environ.get("WHITEPRINT_REPOSITORY", ""))
+    if not (source.parts and source.is_dir()):
+        pytest.skip("WHITEPRINT_REPOSITORY is not a local template clone.")
+
+    return source.resolve()
+
+
+@pytest.fixture
+def project_manager() -> str:
+    """The project manager used by the post-processing of init.
+
+    Returns:
+        The path of uv.
+    """
+    if (uv := shutil.which("uv")) is None:
+        pytest.skip("uv is not installed.")
+
+    return uv
+
+
+def make_synthetic_tree(destination: pathlib.Path) -> pathlib.Path:
+    """Write a synthetic project tree.
+
+    Args:
+        destination: the root of the tree.
+
+    Returns:
+        The root of the tree.
+    """
+    for directory_index in range(SYNTHETIC_DIRECTORIES):
+        (directory := destination / f"package_{directory_index}").mkdir(
+            parents=True,
+        )
+        for file_index in range(SYNTHETIC_FILES):
+            (directory / f"module_{file_index}.py").write_text(
+                f'"""Module {directory_index}.{file_index}."""\n\n'
+                + "".join(
+                    f"VALUE_{line} = {directory_index * line + file_index}\n"
+                    for line in range(50)
+                ),
+                encoding="utf-8",
+            )
+
+    return destination
+
+
+@pytest.fixture
+def large_yaml(tmp_path: pathlib.Path) -> pathlib.Path:
+    """A large configuration file, like the org-wide user defaults.
+
+    Returns:
+        The path of the configuration file.
+    """
+    (config := tmp_path / "defaults.yml").write_text(
+        "".join(f"key_{index}: value {index}\n" for index in range(YAML_KEYS)),
+        encoding="utf-8",
+    )
+    return config
@@ -0,0 +1,370 @@
+"""Bundles of the caches used by whiteprint, to prewarm a machine."""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess  # nosec
+import tarfile
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Final
+
+import platformdirs
+
+from whiteprint import start_process
+from whiteprint.caches import CACHES
+from whiteprint.cli import __app_name__
+from whiteprint.loc import _
+from whiteprint.project_manager import (
+    PROJECT_MANAGER_NAME,
+    ProjectManagerNotFoundError,
+)
+
+
+__all__: Final = [
+    "CACHES",
+    "UNBUNDLED",
+    "GitNotFoundError",
+    "cache_directories",
+    "export_bundle",
+    "import_bundle",
+    "mirror_template",
+    "remote_reachable",
+    "template_mirror",
+    "template_refs",
+]
+"""Public module attributes."""
+
+UNBUNDLED: Final = frozenset({"whiteprint/config"})
+"""The directories of the caches which are never bundled.
+
+The parsed configuration files hold the user defaults (e.g. the author and
+their email) and are keyed by the paths of this machine: they are neither
+shared nor useful on another machine.
+"""
+
+MANIFEST: Final = "manifest.json"
+"""Name of the file describing the content of a bundle."""
+
+_URL_PREFIXES: Final = {
+    "gh:": "https://github.com/",
+    "gl:": "https://gitlab.com/",
+}
+"""The template URL shortcuts (as understood by Copier)."""
+
+_MIRROR_KEY_LENGTH: Final = 16
+"""Number of hexadecimal digits of the name of a template mirror."""
+
+
+class GitNotFoundError(RuntimeError):
+    """Git was not found on the system."""
+
+
+def _uv_cache() -> Path:
+    """The cache directory of uv.
+
+    Returns:
+        The cache directory reported by uv.
+    """
+    return Path(
+        start_process.start_in_directory(
+            [
+                start_process.which(
+                    PROJECT_MANAGER_NAME,
+                    exception=ProjectManagerNotFoundError,
+                ),
+                "cache",
+                "dir",
+            ],
+            capture_output=True,
+            encoding="utf-8",
+        ).stdout.strip(),
+    )
+
+
+def _pre_commit_cache() -> Path:
+    """The cache directory of pre-commit.
+
+    Returns:
+        $PRE_COMMIT_HOME, or `pre-commit` in the XDG cache directory.
+    """
+    if pre_commit_home := os.environ.get("PRE_COMMIT_HOME"):
+        return Path(pre_commit_home)
+
+    return (
+        Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+        / "pre-commit"
+    )
+
+
+def cache_directories(caches: Iterable[str] = CACHES) -> dict[str, Path]:
+    """Locate the caches on this machine.
+
+    Args:
+        caches: the names of the caches (see `CACHES`).
+
+    Returns:
+        The directory of each cache.
+    """
+    locators = {
+        "whiteprint": lambda: Path(platformdirs.user_cache_dir(__app_name__)),
+        "uv": _uv_cache,
+        "pre-commit": _pre_commit_cache,
+    }
+    return {cache: locators[cache]() for cache in caches}
+
+
+def _template_url(source: str) -> str:
+    """Expand the shortcut of a template URL.
+
+    Args:
+        source: the location of the template, as given to `init`.
+
+    Returns:
+        The location with its shortcut (e.g. "gh:") expanded.
+    """
+    return next(
+        (
+            source.replace(prefix, expansion, 1)
+            for prefix, expansion in _URL_PREFIXES.items()
+            if source.startswith(prefix)
+        ),
+        source,
+    )
+
+
+def template_mirror(source: str) -> Path | None:
+    """The path of the local mirror of a remote template.
+
+    Args:
+        source: the location of the template, as given to `init`.
+
+    Returns:
+        The path of the mirror in the cache of whiteprint, None if the
+        template is not remote.
+    """
+    url = _template_url(source)
+    if "://" not in url and not url.startswith("git@"):
+        return None
+
+    key = hashlib.sha256(url.encode()).hexdigest()[:_MIRROR_KEY_LENGTH]
+    return Path(platformdirs.user_cache_dir(__app_name__)) / "templates" / key
+
+
+def remote_reachable(source: str) -> bool:
+    """Check that the repository of a remote template can be reached.
+
+    Args:
+        source: the location of the template, as given to `init`.
+
+    Returns:
+        True if `git ls-remote` lists the repository, False otherwise (e.g.
+        without network).
+    """
+    try:
+        start_process.start_in_directory(
+            [
+                start_process.which("git", exception=GitNotFoundError),
+                "ls-remote",
+                "--quiet",
+                "--exit-code",
+                _template_url(source),
+                "HEAD",
+            ],
+            capture_output=True,
+        )
+    except subprocess.CalledProcessError:
+        return False
+
+    return True
+
+
+def template_refs(source: str, *, vcs_ref: str | None = None) -> str:
+    """List the references of the repository of a template.
+
+    Args:
+        source: the location of the template (remote, or a local
+            repository).
+        vcs_ref: the tag or branch to list. If None, list all the tags.
+
+    Returns:
+        The output of `git ls-remote`: the commit and the name of each
+        reference. Empty when `vcs_ref` is a commit.
+    """
+    return start_process.start_in_directory(
+        [
+            start_process.which("git", exception=GitNotFoundError),
+            "ls-remote",
+            "--quiet",
+            *(() if vcs_ref else ("--tags",)),
+            _template_url(source),
+            *((vcs_ref,) if vcs_ref else ()),
+        ],
+        capture_output=True,
+        encoding="utf-8",
+    ).stdout
+
+
+def mirror_template(source: str) -> Path | None:
+    """Create or update the local mirror of a remote template.
+
+    Args:
+        source: the location of the template, as given to `init`.
+
+    Returns:
+        The path of the mirror, None if the template is not remote.
+    """
+    if (mirror := template_mirror(source)) is None:
+        return None
+
+    git = start_process.which("git", exception=GitNotFoundError)
+    if mirror.is_dir():
+        start_process.start_in_directory(
+            [git, "pull", "--quiet", "--ff-only", "--tags", "--force"],
+            working_directory=mirror,
+        )
+    else:
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+        start_process.start_in_directory(
+            [git, "clone", "--quiet", _template_url(source), str(mirror)],
+        )
+
+    return mirror
+
+
+def _compression(archive: Path) -> str:
+    """The compression of an archive, from its suffix.
+
+    Args:
+        archive: the path of the archive.
+
+    Returns:
+        "gz" for .tar.gz and .tgz, "xz" for .tar.xz, "" otherwise.
+    """
+    if archive.name.endswith((".tar.gz", ".tgz")):
+        return "gz"
+
+    return "xz" if archive.name.endswith(".tar.xz") else ""
+
+
+def _bundled(member: tarfile.TarInfo) -> tarfile.TarInfo | None:
+    """Leave the unbundled directories out of a bundle.
+
+    Args:
+        member: a member of the directory of a cache in a bundle.
+
+    Returns:
+        The member, None if it belongs to a directory of `UNBUNDLED`.
+    """
+    if any(
+        member.name == directory or member.name.startswith(f"{directory}/")
+        for directory in UNBUNDLED
+    ):
+        return None
+
+    return member
+
+
+def export_bundle(archive: Path, directories: Mapping[str, Path]) -> None:
+    """Bundle caches in a tarball.
+
+    Each cache is stored under its name, next to a manifest listing the
+    caches. The missing caches and the directories of `UNBUNDLED` are
+    skipped.
+
+    Args:
+        archive: the path of the tarball. Compressed with gzip or xz when
+            its name ends with .tar.gz (.tgz) or .tar.xz.
+        directories: the directory of each cache.
+    """
+    logger = logging.getLogger(__name__)
+    bundled = {
+        cache: directory
+        for cache, directory in directories.items()
+        if directory.is_dir()
+    }
+    for cache in directories.keys() - bundled.keys():
+        logger.warning(_("Cache '%s' not found, skipped."), cache)
+
+    manifest = archive.with_name(f".{archive.name}.{MANIFEST}")
+    manifest.write_text(
+        json.dumps({"caches": sorted(bundled)}),
+        encoding="utf-8",
+    )
+    try:
+        with tarfile.open(archive, f"w:{_compression(archive)}") as tarball:
+            tarball.add(manifest, arcname=MANIFEST)
+            for cache, directory in bundled.items():
+                logger.info(_("Bundling cache '%s' (%s)"), cache, directory)
+                tarball.add(directory, arcname=cache, filter=_bundled)
+    finally:
+        manifest.unlink()
+
+
+def _relocated(member: tarfile.TarInfo, *, prefix: str) -> tarfile.TarInfo:
+    """Move a member of a bundle out of the directory of its cache.
+
+    Args:
+        member: a member of the directory of a cache in a bundle.
+        prefix: the directory of the cache in the bundle.
+
+    Returns:
+        The member, relative to the directory of its cache. The hard links
+        are relocated as well.
+    """
+    return member.replace(
+        name=member.name.removeprefix(prefix),
+        linkname=(
+            member.linkname.removeprefix(prefix)
+            if member.islnk()
+            else member.linkname
+        ),
+        deep=False,
+    )
+
+
+def import_bundle(
+    archive: Path,
+    directories: Mapping[str, Path],
+) -> list[str]:
+    """Extract caches from a tarball, over the existing caches.
+
+    Args:
+        archive: the path of the tarball (see `export_bundle`).
+        directories: the directory of each cache to extract. The caches of
+            the tarball which are not listed are ignored.
+
+    Returns:
+        The names of the extracted caches.
+    """
+    logger = logging.getLogger(__name__)
+    with tarfile.open(archive, "r:*") as tarball:
+        manifest = tarball.extractfile(MANIFEST)
+        bundled = (
+            [] if manifest is None else json.load(manifest).get("caches", [])
+        )
+        extracted = [cache for cache in bundled if cache in directories]
+        for cache in extracted:
+            prefix = f"{cache}/"
+            members = [
+                _relocated(member, prefix=prefix)
+                for member in tarball.getmembers()
+                if member.name.startswith(prefix)
+            ]
+            logger.info(
+                _("Extracting cache '%s' to %s"),
+                cache,
+                directories[cache],
+            )
+            directories[cache].mkdir(parents=True, exist_ok=True)
+            # The "tar" filter keeps the links of the virtual environments to
+            # the system interpreters, while refusing the members extracted
+            # outside of the cache.
+            tarball.extractall(
+                directories[cache],
+                members=members,
+                filter="tar",
+            )
+
+    return extracted
@@ -0,0 +1,18 @@
+"""The caches used by whiteprint."""
+
+from typing import Final
+
+
+__all__: Final = ["CACHES"]
+"""Public module attributes."""
+
+CACHES: Final = ("whiteprint", "uv", "pre-commit")
+"""The caches which can be bundled (see `whiteprint.cache_bundle`).
+
+- whiteprint: the cache of whiteprint (GitHub lookups and template
+  mirrors). The parsed configuration files are not bundled (see
+  `whiteprint.cache_bundle.UNBUNDLED`).
+- uv: the cache of uv (the packages installed by the tox environments and
+  locked by the projects).
+- pre-commit: the environments of the pre-commit hooks.
+"""
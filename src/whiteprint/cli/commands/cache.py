@@ -0,0 +1,104 @@
+"""Export and import the caches used by whiteprint."""
+
+import importlib
+import logging
+import os
+from pathlib import Path
+from typing import Final
+
+import rich_click as click
+
+from whiteprint.caches import CACHES
+from whiteprint.cli import APP_NAME
+from whiteprint.loc import _
+
+
+__all__: Final = ["cache"]
+"""Public module attributes."""
+
+_CACHE_OPTION: Final = click.option(
+    "--cache",
+    "caches",
+    type=click.Choice(CACHES),
+    multiple=True,
+    help=_("A cache to bundle (can be repeated). Defaults to all caches."),
+    default=CACHES,
+    show_default=True,
+)
+
+
+@click.group(help=_("Export and import the caches used by whiteprint."))
+def cache() -> None:
+    """Export and import the caches used by whiteprint."""
+
+
+@cache.command(name="export")
+@click.argument(
+    "archive",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+)
+@_CACHE_OPTION
+@click.option(
+    "--template",
+    "templates",
+    type=str,
+    multiple=True,
+    help=_(
+        "A remote template to mirror in the whiteprint cache before the"
+        " export (can be repeated), so that `init --offline` copies it"
+        " without any network fetch."
+    ),
+    default=(
+        os.environ.get(
+            f"{APP_NAME}_REPOSITORY",
+            "gh:whiteprints/whiteprint.git",
+        ),
+    ),
+    show_default=True,
+)
+def export_caches(
+    archive: Path,
+    caches: tuple[str, ...],
+    templates: tuple[str, ...],
+) -> None:
+    """Bundle the caches in a tarball.
+
+    To prewarm a container image or a CI cache, run `whiteprint init` once,
+    then export the caches: the tarball then holds the template mirrors,
+    the packages of the template's locked dependencies and tox environments
+    (uv cache) and the pre-commit hook environments. The parsed
+    configuration files, holding the user defaults, are not exported. The
+    tarball is compressed when ARCHIVE ends with .tar.gz or .tar.xz.
+    """
+    cache_bundle = importlib.import_module("whiteprint.cache_bundle")
+    if "whiteprint" in caches:
+        for template in templates:
+            cache_bundle.mirror_template(template)
+
+    cache_bundle.export_bundle(
+        archive,
+        cache_bundle.cache_directories(caches),
+    )
+
+
+@cache.command(name="import")
+@click.argument(
+    "archive",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@_CACHE_OPTION
+def import_caches(archive: Path, caches: tuple[str, ...]) -> None:
+    """Extract the caches of a tarball made by `whiteprint cache export`.
+
+    The caches are extracted over the caches of this machine, at their
+    location on this machine.
+    """
+    cache_bundle = importlib.import_module("whiteprint.cache_bundle")
+    extracted = cache_bundle.import_bundle(
+        archive,
+        cache_bundle.cache_directories(caches),
+    )
+    logging.getLogger(__name__).info(
+        _("Imported caches: %s"),
+        ", ".join(extracted) or "-",
+    )
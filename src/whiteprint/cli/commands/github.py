@@ -0,0 +1,460 @@
+"""Manage the GitHub repositories of whiteprint projects."""
+
+import contextlib
+import contextvars
+import importlib
+import logging
+import os
+import sys
+import threading
+from collections.abc import Generator
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, TypedDict
+
+import platformdirs
+import rich_click as click
+from click import Path as ClickPath
+from returns.maybe import Maybe
+
+from whiteprint import console, log_context, metrics
+from whiteprint.cli import APP_NAME, __app_name__
+from whiteprint.cli.commands.init import (
+    COPIER_ANSWER_FILE,
+    LABEL_FILE,
+    RepositoryConfiguration,
+    push_stall_timeout_default,
+    read_yaml,
+)
+from whiteprint.cli.exceptions import ProvisioningError
+from whiteprint.loc import _
+
+
+if sys.version_info < (3, 11):  # pragma: nocover
+    from typing_extensions import Unpack
+else:
+    from typing import Unpack
+
+if TYPE_CHECKING:
+    from whiteprint.version_control import GithubSession, GithubUser
+else:
+    # The runtime type checks would otherwise import the version control
+    # module (and PyGithub) as soon as the commands are listed.
+    GithubSession = GithubUser = object
+
+
+__all__: Final = [
+    "create_remote",
+    "github",
+    "open_session",
+    "provision_repository",
+    "publish_repository",
+    "remote_created_in_background",
+]
+"""Public module attributes."""
+
+
+PROVISION_JOBS: Final = 4
+"""Default number of repositories provisioned concurrently."""
+
+
+def open_session(
+    github_user: "GithubUser",
+    *,
+    base_url: str | None = None,
+    jobs: int = 1,
+) -> "GithubSession":
+    """Open a GitHub session caching the organizations on disk.
+
+    Args:
+        github_user: a Github user.
+        base_url: the URL of the GitHub API. If None, use github.com.
+        jobs: the number of repositories provisioned concurrently, used to
+            size the pool of HTTP connections.
+
+    Returns:
+        A GitHub session.
+    """
+    version_control = importlib.import_module(
+        "whiteprint.version_control",
+        __package__,
+    )
+    return version_control.GithubSession(
+        github_user,
+        base_url=Maybe.from_optional(base_url).value_or(
+            importlib.import_module("github.Consts").DEFAULT_BASE_URL,
+        ),
+        pool_size=jobs * version_control.LABELS_MAX_WORKERS,
+        cache_directory=(
+            Path(platformdirs.user_cache_dir(__app_name__)) / "github"
+        ),
+    )
+
+
+def _github_login(destination: Path) -> str:
+    """Read the GitHub owner of a project from its Copier answers.
+
+    Args:
+        destination: path to the python project.
+
+    Raises:
+        BadParameter: the project has no GitHub user in its answers.
+
+    Returns:
+        The GitHub login name of the user or the organization.
+    """
+    copier_answers = read_yaml(destination / COPIER_ANSWER_FILE)
+    if "github_user" not in copier_answers:
+        raise click.BadParameter(
+            _("{} has no GitHub user in its Copier answers.").format(
+                destination,
+            ),
+            param_hint="DIRECTORY",
+        )
+
+    return str(copier_answers["github_user"])
+
+
+def create_remote(
+    destination: Path,
+    *,
+    session: "GithubSession",
+    created: threading.Event | None = None,
+) -> None:
+    """Create the GitHub repository of a project and synchronise its labels.
+
+    The owner and the name of the GitHub repository are read from the Copier
+    answers of the project.
+
+    Args:
+        destination: path to the python project.
+        session: a GitHub session.
+        created: an event set once the GitHub repository exists, before its
+            labels are synchronised.
+    """
+    version_control = importlib.import_module(
+        "whiteprint.version_control",
+        __package__,
+    )
+    copier_answers = read_yaml(destination / COPIER_ANSWER_FILE)
+    session = session.with_login(str(copier_answers["github_user"]))
+    github_repository = version_control.create_empty_github_repository(
+        importlib.import_module("pygit2").Repository(destination),
+        project_slug=str(copier_answers["project_slug"]),
+        session=session,
+    )
+    if created is not None:
+        created.set()
+
+    version_control.sync_labels(
+        github_repository,
+        labels=destination / LABEL_FILE,
+        scheduler=session.scheduler,
+    )
+
+
+def publish_repository(
+    destination: Path,
+    *,
+    session: "GithubSession",
+    repository_configuration: RepositoryConfiguration,
+) -> None:
+    """Push a project to its GitHub repository and protect it.
+
+    The GitHub repository must have been created by `create_remote`.
+
+    Args:
+        destination: path to the python project.
+        session: a GitHub session.
+        repository_configuration: the configuration of the repository.
+    """
+    version_control = importlib.import_module(
+        "whiteprint.version_control",
+        __package__,
+    )
+    copier_answers = read_yaml(destination / COPIER_ANSWER_FILE)
+    repository = importlib.import_module("pygit2").Repository(destination)
+    session = session.with_login(str(copier_answers["github_user"]))
+    version_control.push_repository(
+        repository,
+        github_user=session.github_user,
+        stall_timeout=repository_configuration.push_stall_timeout,
+    )
+    version_control.protect_repository(
+        repository,
+        project_slug=str(copier_answers["project_slug"]),
+        session=session,
+        https_origin=repository_configuration.https_origin,
+    )
+
+
+def provision_repository(
+    destination: Path,
+    *,
+    session: "GithubSession",
+    repository_configuration: RepositoryConfiguration,
+) -> None:
+    """Create, push and protect the GitHub repository of a project.
+
+    Args:
+        destination: path to the python project.
+        session: a GitHub session.
+        repository_configuration: the configuration of the repository.
+    """
+    create_remote(destination, session=session)
+    publish_repository(
+        destination,
+        session=session,
+        repository_configuration=repository_configuration,
+    )
+
+
+def _delete_remote(
+    destination: Path,
+    *,
+    session: "GithubSession",
+) -> None:
+    """Delete the GitHub repository of a project.
+
+    Args:
+        destination: path to the python project.
+        session: the GitHub session which created the repository.
+    """
+    copier_answers = read_yaml(destination / COPIER_ANSWER_FILE)
+    logging.getLogger(__name__).info(
+        _("Deleting the GitHub repository %s"),
+        copier_answers["project_slug"],
+    )
+    importlib.import_module(
+        "whiteprint.version_control",
+        __package__,
+    ).delete_github_repository(
+        str(copier_answers["project_slug"]),
+        session=session,
+        owner=str(copier_answers["github_user"]),
+    )
+
+
+@contextlib.contextmanager
+def remote_created_in_background(
+    destination: Path,
+    *,
+    session: "GithubSession",
+) -> Generator[None, None, None]:
+    """Create the GitHub repository of a project while the context runs.
+
+    The network bound creation (and labels synchronisation) overlaps the
+    work done in the context, typically the tests of the project. It runs
+    in a copy of the current context, so that its logs are bound to the
+    project and to the step. If the context or the labels synchronisation
+    fails, the GitHub repository is deleted once created.
+
+    Args:
+        destination: path to the python project.
+        session: a GitHub session.
+
+    Yields:
+        None
+    """
+    created = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        creation = executor.submit(
+            contextvars.copy_context().run,
+            create_remote,
+            destination,
+            session=session,
+            created=created,
+        )
+        try:
+            yield
+            creation.result()
+        except BaseException:
+            futures.wait([creation])
+            if created.is_set():
+                _delete_remote(destination, session=session)
+
+            raise
+
+
+@click.group(help=_("Manage the GitHub repositories of whiteprint projects."))
+def github() -> None:
+    """Manage the GitHub repositories of whiteprint projects."""
+
+
+class ProvisionArgsType(TypedDict):
+    """The provision command arguments types."""
+
+    repositories: tuple[Path, ...]
+    github_token: str
+    github_api_url: str | None
+    https_origin: bool
+    jobs: int
+    push_stall_timeout: float
+    quiet: bool
+
+
+def _try_provision(
+    destination: Path,
+    *,
+    session: "GithubSession",
+    repository_configuration: RepositoryConfiguration,
+) -> bool:
+    """Provision a repository, logging its failure.
+
+    Args:
+        destination: path to the python project.
+        session: a GitHub session.
+        repository_configuration: the configuration of the repository.
+
+    Returns:
+        Whether the repository was provisioned.
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        with (
+            log_context.bound(log_context.DESTINATION, str(destination)),
+            metrics.step(f"provision {destination.name}"),
+        ):
+            provision_repository(
+                destination,
+                session=session,
+                repository_configuration=repository_configuration,
+            )
+    except Exception:
+        logger.exception(_("Failed to provision %s"), destination)
+        return False
+
+    logger.info(_("Provisioned %s"), destination)
+    return True
+
+
+@github.command()
+@click.argument(
+    "repositories",
+    type=ClickPath(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    metavar="DIRECTORY...",
+    nargs=-1,
+    required=True,
+)
+@click.option(
+    "--github-token",
+    type=str,
+    help=_(
+        "Github Token to create and push the repositories. The token must"
+        " have writing permissions."
+    ),
+    default=os.environ.get(f"{APP_NAME}_GITHUB_TOKEN"),
+    required=True,
+)
+@click.option(
+    "--github-api-url",
+    type=str,
+    help=_("The URL of the GitHub API (e.g. of a GitHub Enterprise Server)."),
+    default=os.environ.get(f"{APP_NAME}_GITHUB_API_URL"),
+    show_default=True,
+)
+@click.option(
+    "--https-origin",
+    "-H",
+    type=bool,
+    help=_("Force the origins to be https URLs."),
+    is_flag=True,
+    default=click.BOOL(os.environ.get(f"{APP_NAME}_HTTPS_ORIGIN", "false")),
+    show_default=True,
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help=_("The number of repositories provisioned concurrently."),
+    default=os.environ.get(f"{APP_NAME}_GITHUB_JOBS", str(PROVISION_JOBS)),
+    show_default=True,
+)
+@click.option(
+    "--push-stall-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help=_(
+        "Abort a push to GitHub when it makes no progress for this number"
+        " of seconds."
+    ),
+    default=push_stall_timeout_default,
+    show_default=True,
+)
+@click.option(
+    "--quiet",
+    "-Q",
+    type=bool,
+    help=_("When set, disable all output."),
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+def provision(**kwargs: Unpack[ProvisionArgsType]) -> None:
+    """Provision the GitHub repositories of generated projects.
+
+    Each DIRECTORY is a project generated by `init` without a GitHub token.
+    Its GitHub repository is created, its labels synchronised, then it is
+    pushed and protected. The repositories are provisioned concurrently,
+    sharing a single GitHub session (and its rate limits).
+    """
+    version_control = importlib.import_module(
+        "whiteprint.version_control",
+        __package__,
+    )
+    repositories = kwargs["repositories"]
+    # Check all the answers before sending any request.
+    logins = [_github_login(destination) for destination in repositories]
+    repository_configuration = RepositoryConfiguration(
+        github_token=kwargs["github_token"],
+        https_origin=kwargs["https_origin"],
+        push_stall_timeout=kwargs["push_stall_timeout"],
+    )
+    with (
+        metrics.step("github") as record,
+        open_session(
+            version_control.GithubUser(
+                login=logins[0],
+                token=importlib.import_module("github.Auth").Token(
+                    kwargs["github_token"],
+                ),
+            ),
+            base_url=kwargs["github_api_url"],
+            jobs=kwargs["jobs"],
+        ) as session,
+        ThreadPoolExecutor(max_workers=kwargs["jobs"]) as executor,
+    ):
+        provisioned = list(
+            executor.map(
+                lambda destination: _try_provision(
+                    destination,
+                    session=session,
+                    repository_configuration=repository_configuration,
+                ),
+                repositories,
+            ),
+        )
+        record.details.update(session.scheduler.counters.details())
+
+    if not kwargs["quiet"]:
+        metrics.report(console.STDERR)
+
+    if not all(provisioned):
+        raise ProvisioningError(
+            [
+                destination
+                for destination, success in zip(
+                    repositories,
+                    provisioned,
+                    strict=True,
+                )
+                if not success
+            ],
+        )
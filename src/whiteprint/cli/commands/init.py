@@ -1,13 +1,17 @@
 """Initialize a new Python project."""
 
+import contextlib
 import importlib
 import logging
+import math
 import os
+import re
 import shutil
 import sys
-from dataclasses import dataclass
+from collections.abc import Generator
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Final, TypedDict, TypeGuard, cast
+from typing import TYPE_CHECKING, Final, TypedDict, TypeGuard, cast
 
 import platformdirs
 import rich_click as click
@@ -15,11 +19,13 @@
 from click.core import Context, Parameter
 from returns.maybe import Maybe
 
+from whiteprint import console, filesystem, log_context, metrics
 from whiteprint.cli import APP_NAME, __app_name__
 from whiteprint.cli.exceptions import (
     InvalidYAMLError,
     UnsupportedTypeInMappingError,
 )
+from whiteprint.config_cache import ConfigCache
 from whiteprint.loc import _
 
 
@@ -28,6 +34,13 @@
 else:
     from typing import Unpack
 
+if TYPE_CHECKING:
+    from pygit2.repository import Repository
+else:
+    # The runtime type checks would otherwise import pygit2 as soon as the
+    # commands are listed.
+    Repository = object
+
 
 __all__: Final = ["init"]
 """Public module attributes."""
@@ -41,6 +54,31 @@
 LABEL_FILE: Final = Path(".github/labels.yml")
 
 
+def _push_stall_timeout() -> float:
+    """The default number of seconds without push progress before aborting.
+
+    Returns:
+        `whiteprint.version_control.PUSH_STALL_TIMEOUT`, the version control
+        module being only imported when needed.
+    """
+    return importlib.import_module(
+        "whiteprint.version_control",
+    ).PUSH_STALL_TIMEOUT
+
+
+def push_stall_timeout_default() -> str:
+    """The default of the `--push-stall-timeout` options.
+
+    Returns:
+        The value of the environment variable if set, the default of the
+        version control module otherwise.
+    """
+    return os.environ.get(
+        f"{APP_NAME}_PUSH_STALL_TIMEOUT",
+        str(_push_stall_timeout()),
+    )
+
+
 @dataclass
 class RepositoryConfiguration:
     """The repository configuration.
@@ -48,16 +86,29 @@ class RepositoryConfiguration:
     Attributes:
         github_token: a github token
         https_origin: use https origin instead of ssh
+        pack: pack the loose objects once the post processing is done
+        shared_objects: a shared object store used as alternate object
+            database. When given, the objects are moved to the store instead
+            of being packed.
+        push_stall_timeout: the number of seconds without progress before
+            aborting the push to GitHub.
+        provision_during_tests: create the GitHub repository while the tests
+            run, then push it once they passed (or delete it if they failed).
     """
 
     github_token: str | None = None
     https_origin: bool = False
+    pack: bool = True
+    shared_objects: Path | None = None
+    push_stall_timeout: float = field(default_factory=_push_stall_timeout)
+    provision_during_tests: bool = False
 
 
-def read_yaml(data: Path) -> Yaml:
-    """Read a yaml file.
+def _parse_yaml(data: Path) -> dict[str, object]:
+    """Parse a yaml file.
 
-    Use PyYAML `safe_load`.
+    Use the libyaml based `CSafeLoader` when PyYAML was built with it, the
+    pure python `SafeLoader` otherwise.
 
     Args:
         data: path to a yaml file.
@@ -65,21 +116,20 @@ def read_yaml(data: Path) -> Yaml:
     Raises:
         InvalidYAMLError: the yaml loaded was invalid (a parsing error
             occured).
-        UnsupportedTypeInMappingError: a type found in the loaded yaml file is
-            not supported.
 
     Returns:
         The content of the YAML file.
     """
-    if not data.is_file():
-        return {}
-
     yaml = importlib.import_module("yaml")
     yaml_parser = importlib.import_module("yaml.parser")
     with data.open("r") as data_file:
         try:
-            copier_data: dict[str, object | None] = (
-                yaml.safe_load(data_file) or {}
+            return (
+                yaml.load(  # nosec B506
+                    data_file,
+                    Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader),
+                )
+                or {}
             )
         except yaml_parser.ParserError as parser_error:
             raise InvalidYAMLError(
@@ -87,12 +137,133 @@ def read_yaml(data: Path) -> Yaml:
                 str(parser_error),
             ) from parser_error
 
-        if _check_dict(copier_data):
-            return copier_data
+
+def _load_yaml(
+    data: Path,
+    *,
+    cache: ConfigCache | None,
+) -> dict[str, object]:
+    """Load a yaml file, from the cache if it is unchanged.
+
+    Only the supported contents are cached.
+
+    Args:
+        data: path to a yaml file.
+        cache: a cache of the parsed files. If None, always parse the file.
+
+    Returns:
+        The content of the YAML file.
+    """
+    if cache is None:
+        return _parse_yaml(data)
+
+    if (cached := cache.load(data)) is not None:
+        return cached
+
+    if _check_dict(parsed := _parse_yaml(data)):
+        cache.store(data, dict(parsed))
+
+    return parsed
+
+
+def read_yaml(data: Path, *, cache: ConfigCache | None = None) -> Yaml:
+    """Read a yaml file.
+
+    Use PyYAML safe loading.
+
+    Args:
+        data: path to a yaml file.
+        cache: a cache of the parsed files. If None, always parse the file.
+
+    Raises:
+        InvalidYAMLError: the yaml loaded was invalid (a parsing error
+            occured).
+        UnsupportedTypeInMappingError: a type found in the loaded yaml file is
+            not supported.
+
+    Returns:
+        The content of the YAML file.
+    """
+    if not data.is_file():
+        return {}
+
+    if _check_dict(copier_data := _load_yaml(data, cache=cache)):
+        return copier_data
 
     raise UnsupportedTypeInMappingError
 
 
+def _config_cache() -> ConfigCache:
+    """The cache of the configuration files reused on every run.
+
+    Returns:
+        A cache in the user cache directory.
+    """
+    return ConfigCache(
+        Path(platformdirs.user_cache_dir(__app_name__)) / "config",
+    )
+
+
+def _template_source(source: str, *, offline: bool) -> str:
+    """The location from which the template is copied.
+
+    A remote template is copied from its local mirror (see `whiteprint cache
+    export --template`) when working offline, or when its repository cannot
+    be reached.
+
+    Args:
+        source: the location of the template.
+        offline: whether to copy a remote template from its mirror without
+            trying to reach its repository.
+
+    Returns:
+        The path of the mirror of the template if it is used, the location
+        of the template otherwise.
+    """
+    cache_bundle = importlib.import_module("whiteprint.cache_bundle")
+    mirror = cache_bundle.template_mirror(source)
+    if mirror is None or not mirror.is_dir():
+        return source
+
+    if not offline and cache_bundle.remote_reachable(source):
+        return source
+
+    logging.getLogger(__name__).info(
+        _("Using the mirror %s of the template %s"),
+        mirror,
+        source,
+    )
+    return str(mirror)
+
+
+def _record_template_source(destination: Path, source: str) -> None:
+    """Record the location of the template in the answers file.
+
+    When the template is copied from its mirror, Copier records the path of
+    the mirror, which is replaced by the location of the template so that
+    `copier update` works on any machine.
+
+    Args:
+        destination: the path of the project.
+        source: the location of the template.
+    """
+    if not (answers_file := destination / COPIER_ANSWER_FILE).is_file():
+        return
+
+    answers_file.write_text(
+        re.sub(
+            r"^_src_path:.*$",
+            importlib.import_module("yaml")
+            .safe_dump({"_src_path": source}, width=math.inf)
+            .rstrip("\n"),
+            answers_file.read_text(encoding="utf-8"),
+            count=1,
+            flags=re.MULTILINE,
+        ),
+        encoding="utf-8",
+    )
+
+
 def _copy_license_to_project_root(destination: Path) -> None:
     """Add the license to the COPYING file.
 
@@ -181,6 +352,107 @@ def _download_licenses(
     _copy_license_to_project_root(destination)
 
 
+def _finalize_repository(
+    repository: "Repository",
+    *,
+    repository_configuration: RepositoryConfiguration,
+) -> None:
+    """Pack or share the loose objects written by the post processing.
+
+    Args:
+        repository: the local repository.
+        repository_configuration: the configuration of the repository.
+    """
+    version_control = importlib.import_module(
+        "whiteprint.version_control",
+        __package__,
+    )
+    git_directory = Path(repository.path)
+    if (shared_objects := repository_configuration.shared_objects) is not None:
+        with metrics.step("share-objects") as record:
+            record.details["objects"] = version_control.share_objects(
+                repository,
+                shared_objects=shared_objects,
+            )
+            record.details["size_after_bytes"] = filesystem.disk_usage(
+                git_directory,
+            )
+        return
+
+    if not repository_configuration.pack:
+        return
+
+    with metrics.step("pack") as record:
+        record.details["size_before_bytes"] = filesystem.disk_usage(
+            git_directory,
+        )
+        record.details["objects"] = version_control.pack_repository(
+            repository,
+        )
+        record.details["size_after_bytes"] = filesystem.disk_usage(
+            git_directory,
+        )
+
+
+@contextlib.contextmanager
+def _github_provisioning(
+    destination: Path,
+    *,
+    repository_configuration: RepositoryConfiguration,
+) -> Generator[None, None, None]:
+    """Provision the GitHub repository of the project around a block.
+
+    The repository is created, pushed and protected after the block (the
+    tests and the finalization of the local repository). When provisioning
+    during the tests, the repository is created while the block runs and
+    only pushed and protected after it, or deleted if the block failed.
+
+    Args:
+        destination: path to the python project.
+        repository_configuration: the configuration of the repository.
+
+    Yields:
+        None
+    """
+    if repository_configuration.github_token is None:
+        yield
+        return
+
+    github = importlib.import_module(
+        "whiteprint.cli.commands.github",
+        __package__,
+    )
+    github_user = importlib.import_module(
+        "whiteprint.version_control",
+        __package__,
+    ).GithubUser(
+        token=importlib.import_module("github.Auth").Token(
+            repository_configuration.github_token,
+        ),
+        login=str(read_yaml(destination / COPIER_ANSWER_FILE)["github_user"]),
+    )
+    with github.open_session(github_user) as session:
+        if repository_configuration.provision_during_tests:
+            with github.remote_created_in_background(
+                destination,
+                session=session,
+            ):
+                yield
+
+            provision = github.publish_repository
+        else:
+            yield
+            provision = github.provision_repository
+
+        with metrics.step("github") as record:
+            provision(
+                destination,
+                session=session,
+                repository_configuration=repository_configuration,
+            )
+            record.details.update(session.scheduler.counters.details())
+
+
 def _post_processing(
     destination: Path,
     *,
@@ -211,26 +483,30 @@ def _post_processing(
     )
 
     # Create lockfile
-    project_manager.lock(destination)
-
-    repository = version_control.init_and_commit(
-        destination,
-        commit_data=version_control.CommitData(
-            message="chore: 🥇 inital commit."
-        ),
-    )
+    with metrics.step("lock"):
+        project_manager.lock(destination)
+
+    with metrics.step("initial-commit"):
+        repository = version_control.init_and_commit(
+            destination,
+            commit_data=version_control.CommitData(
+                message="chore: 🥇 inital commit."
+            ),
+            shared_objects=repository_configuration.shared_objects,
+        )
 
     # Download the required licenses.
-    _download_licenses(
-        destination,
-        python=python,
-    )
-    version_control.add_and_commit(
-        repository,
-        commit_data=version_control.CommitData(
-            message="chore: 📃 download license(s)."
-        ),
-    )
+    with metrics.step("download-licenses"):
+        _download_licenses(
+            destination,
+            python=python,
+        )
+        version_control.add_and_commit(
+            repository,
+            commit_data=version_control.CommitData(
+                message="chore: 📃 download license(s)."
+            ),
+        )
 
     force_python = (
         Maybe.from_optional(python)
@@ -238,61 +514,52 @@ def _post_processing(
         .value_or(())
     )
     # Generate the dependencies table.
-    tox.run(
-        destination=destination,
-        args=[
-            *force_python,
-            "-e",
-            "export-supply-chain-licenses",
-        ],
-    )
-    version_control.add_and_commit(
-        repository,
-        commit_data=version_control.CommitData(
-            message="docs: 📚 add depencencies."
-        ),
-    )
-
-    # Fixes with pre-commit.
-    _format_code(
-        destination,
-        python=python,
-    )
-    version_control.add_and_commit(
-        repository,
-        commit_data=version_control.CommitData(
-            message="chore: 🔨 format code."
-        ),
-    )
-
-    # Check that nox passes.
-    if not skip_tests:
+    with metrics.step("export-supply-chain-licenses"):
         tox.run(
             destination=destination,
             args=[
                 *force_python,
+                "-e",
+                "export-supply-chain-licenses",
             ],
         )
-
-    if repository_configuration.github_token is not None:
-        copier_answers = read_yaml(destination / COPIER_ANSWER_FILE)
-        github_user = version_control.GithubUser(
-            token=importlib.import_module("github.Auth").Auth.Token(
-                repository_configuration.github_token,
+        version_control.add_and_commit(
+            repository,
+            commit_data=version_control.CommitData(
+                message="docs: 📚 add depencencies."
             ),
-            login=str(copier_answers["github_user"]),
         )
-        version_control.setup_github_repository(
+
+    # Fixes with pre-commit.
+    with metrics.step("format-code"):
+        _format_code(
+            destination,
+            python=python,
+        )
+        version_control.add_and_commit(
             repository,
-            project_slug=str(copier_answers["project_slug"]),
-            github_user=github_user,
-            labels=destination / LABEL_FILE,
+            commit_data=version_control.CommitData(
+                message="chore: 🔨 format code."
+            ),
         )
-        version_control.protect_repository(
+
+    with _github_provisioning(
+        destination,
+        repository_configuration=repository_configuration,
+    ):
+        # Check that nox passes.
+        if not skip_tests:
+            with metrics.step("tests"):
+                tox.run(
+                    destination=destination,
+                    args=[
+                        *force_python,
+                    ],
+                )
+
+        _finalize_repository(
             repository,
-            project_slug=str(copier_answers["project_slug"]),
-            github_user=github_user,
-            https_origin=repository_configuration.https_origin,
+            repository_configuration=repository_configuration,
         )
 
 
@@ -382,6 +649,11 @@ class InitArgsType(TypedDict):
     python: str | None
     github_token: str | None
     https_origin: bool
+    no_pack: bool
+    shared_objects: Path | None
+    push_stall_timeout: float
+    provision_during_tests: bool
+    offline: bool
 
 
 @click.command(
@@ -601,6 +873,74 @@ class InitArgsType(TypedDict):
     default=os.environ.get(f"{APP_NAME}_HTTPS_ORIGIN", False),
     show_default=True,
 )
+@click.option(
+    "--no-pack",
+    type=bool,
+    help=_(
+        "Do NOT pack the loose objects of the new repository into a single"
+        " packfile."
+    ),
+    is_flag=True,
+    default=click.BOOL(os.environ.get(f"{APP_NAME}_NO_PACK", "false")),
+    show_default=True,
+)
+@click.option(
+    "--shared-objects",
+    type=ClickPath(
+        file_okay=False,
+        dir_okay=True,
+        writable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    help=_(
+        "A shared object store (created if needed) used as Git alternate by"
+        " the new repository. Objects already in the store are not written"
+        " again, which saves space when generating many projects."
+    ),
+    default=(
+        Maybe.from_optional(os.environ.get(f"{APP_NAME}_SHARED_OBJECTS"))
+        .map(Path)
+        .value_or(None)
+    ),
+    show_default=True,
+)
+@click.option(
+    "--push-stall-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help=_(
+        "Abort the push to GitHub when it makes no progress for this number"
+        " of seconds."
+    ),
+    default=push_stall_timeout_default,
+    show_default=True,
+)
+@click.option(
+    "--provision-during-tests",
+    type=bool,
+    help=_(
+        "Create the GitHub repository while the tests run. It is pushed once"
+        " the tests passed, or deleted if they failed."
+    ),
+    is_flag=True,
+    default=click.BOOL(
+        os.environ.get(f"{APP_NAME}_PROVISION_DURING_TESTS", "false"),
+    ),
+    show_default=True,
+)
+@click.option(
+    "--offline",
+    type=bool,
+    help=_(
+        "Copy a remote template from its local mirror (see `whiteprint cache"
+        " export --template`) without reaching its repository. The mirror is"
+        " also used when the repository cannot be reached."
+    ),
+    is_flag=True,
+    default=click.BOOL(os.environ.get(f"{APP_NAME}_OFFLINE", "false")),
+    show_default=True,
+)
 def init(**kwargs: Unpack[InitArgsType]) -> None:
     """Initalize a new Python project.
 
@@ -610,7 +950,9 @@ def init(**kwargs: Unpack[InitArgsType]) -> None:
         Yaml()
         if kwargs["no_data"]
         else (
-            Maybe.from_optional(kwargs["data"]).map(read_yaml).value_or(Yaml())
+            Maybe.from_optional(kwargs["data"])
+            .map(lambda data: read_yaml(data, cache=_config_cache()))
+            .value_or(Yaml())
         )
     )
     data_dict.update(
@@ -624,37 +966,69 @@ def init(**kwargs: Unpack[InitArgsType]) -> None:
     )
     user_defaults_dict = (
         Maybe.from_optional(kwargs["user_defaults"])
-        .map(read_yaml)
+        .map(
+            lambda user_defaults: read_yaml(
+                user_defaults, cache=_config_cache()
+            )
+        )
         .value_or(Yaml(project_name=kwargs["destination"].name))
     )
-    importlib.import_module("copier.main").Worker(
-        src_path=kwargs["whiteprint_source"],
-        dst_path=kwargs["destination"],
-        answers_file=COPIER_ANSWER_FILE,
-        vcs_ref=kwargs["vcs_ref"],
-        data=data_dict,
-        exclude=Maybe.from_optional(kwargs["exclude"]).value_or(
-            cast(list[str], []),
-        ),
-        use_prereleases=kwargs["use_prereleases"],
-        skip_if_exists=Maybe.from_optional(kwargs["skip_if_exists"]).value_or(
-            cast(list[str], []),
-        ),
-        cleanup_on_error=not kwargs["no_cleanup_on_error"],
-        defaults=kwargs["defaults"],
-        user_defaults=user_defaults_dict,
-        overwrite=kwargs["overwrite"],
-        pretend=kwargs["pretend"],
-        quiet=kwargs["quiet"],
-        unsafe=True,
-    ).run_copy()
-
-    _post_processing(
-        kwargs["destination"],
-        skip_tests=kwargs["skip_tests"],
-        python=kwargs["python"],
-        repository_configuration=RepositoryConfiguration(
-            github_token=kwargs["github_token"],
-            https_origin=kwargs["https_origin"],
-        ),
-    )
+    with log_context.bound(
+        log_context.DESTINATION,
+        str(kwargs["destination"]),
+    ):
+        src_path = _template_source(
+            kwargs["whiteprint_source"],
+            offline=kwargs["offline"],
+        )
+        worker = importlib.import_module("copier.main").Worker(
+            src_path=src_path,
+            dst_path=kwargs["destination"],
+            answers_file=COPIER_ANSWER_FILE,
+            vcs_ref=kwargs["vcs_ref"],
+            data=data_dict,
+            exclude=Maybe.from_optional(kwargs["exclude"]).value_or(
+                cast("list[str]", []),
+            ),
+            use_prereleases=kwargs["use_prereleases"],
+            skip_if_exists=Maybe.from_optional(
+                kwargs["skip_if_exists"]
+            ).value_or(
+                cast("list[str]", []),
+            ),
+            cleanup_on_error=not kwargs["no_cleanup_on_error"],
+            defaults=kwargs["defaults"],
+            user_defaults=user_defaults_dict,
+            overwrite=kwargs["overwrite"],
+            pretend=kwargs["pretend"],
+            quiet=kwargs["quiet"],
+            unsafe=True,
+        )
+        worker.run_copy()
+        if src_path != kwargs["whiteprint_source"]:
+            _record_template_source(
+                kwargs["destination"],
+                kwargs["whiteprint_source"],
+            )
+
+        metrics.LABELS["template"] = "{}@{}".format(
+            kwargs["whiteprint_source"],
+            worker.template.commit or worker.template.ref or "HEAD",
+        )
+
+        _post_processing(
+            kwargs["destination"],
+            skip_tests=kwargs["skip_tests"],
+            python=kwargs["python"],
+            repository_configuration=RepositoryConfiguration(
+                github_token=kwargs["github_token"],
+                https_origin=kwargs["https_origin"],
+                pack=not kwargs["no_pack"],
+                shared_objects=kwargs["shared_objects"],
+                push_stall_timeout=kwargs["push_stall_timeout"],
+                provision_during_tests=kwargs["provision_during_tests"],
+            ),
+        )
+
+    if not kwargs["quiet"]:
+        metrics.report(console.STDERR)
@@ -0,0 +1,280 @@
+"""Statistics of the recorded runs."""
+
+import datetime as dt
+import importlib
+import logging
+import os
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Final
+
+import rich_click as click
+
+from whiteprint import console
+from whiteprint.cli import APP_NAME
+from whiteprint.loc import _
+
+
+if TYPE_CHECKING:
+    import whiteprint.history
+
+
+__all__: Final = ["stats"]
+"""Public module attributes."""
+
+_PERCENTILES: Final = (0.5, 0.9, 0.99)
+"""The percentiles of the durations reported."""
+
+
+def _window_default() -> str:
+    """The default of the `--window` option.
+
+    Returns:
+        The value of the environment variable if set,
+        `whiteprint.history.BASELINE_WINDOW` otherwise.
+    """
+    return os.environ.get(
+        f"{APP_NAME}_STATS_WINDOW",
+        str(importlib.import_module("whiteprint.history").BASELINE_WINDOW),
+    )
+
+
+def _threshold_default() -> str:
+    """The default of the `--threshold` option.
+
+    Returns:
+        The value of the environment variable if set,
+        `whiteprint.history.REGRESSION_THRESHOLD` otherwise.
+    """
+    return os.environ.get(
+        f"{APP_NAME}_STATS_THRESHOLD",
+        str(
+            importlib.import_module("whiteprint.history").REGRESSION_THRESHOLD,
+        ),
+    )
+
+
+def _percentiles_cells(durations: Sequence[float]) -> list[str]:
+    """Format the percentiles of durations.
+
+    Args:
+        durations: durations in seconds.
+
+    Returns:
+        The p50, p90 and p99 of the durations, "-" if there is none.
+    """
+    percentile = importlib.import_module("whiteprint.history").percentile
+    return [
+        f"{percentile(durations, fraction):.3f}" if durations else "-"
+        for fraction in _PERCENTILES
+    ]
+
+
+def _format_ratio(ratio: float | None, *, threshold: float) -> str:
+    """Format a duration ratio, highlighting a slowdown.
+
+    Args:
+        ratio: a ratio of durations, None if unknown.
+        threshold: the ratio above which the slowdown is highlighted.
+
+    Returns:
+        The formatted ratio.
+    """
+    if ratio is None:
+        return "-"
+
+    return (
+        f"[bold red]x{ratio:.2f}[/]" if ratio >= threshold else f"x{ratio:.2f}"
+    )
+
+
+def _report_runs(
+    runs: Sequence["whiteprint.history.RunRecord"],
+    *,
+    window: int,
+    threshold: float,
+) -> None:
+    """Print a table of the durations of the runs, by command.
+
+    Args:
+        runs: the runs, from the oldest to the latest.
+        window: the number of runs compared by the trend.
+        threshold: the trend above which it is highlighted.
+    """
+    history = importlib.import_module("whiteprint.history")
+    table = importlib.import_module("rich.table").Table(
+        title=_("Run durations (s)"),
+    )
+    table.add_column(_("Command"))
+    table.add_column(_("Runs"), justify="right")
+    table.add_column(_("Failures"), justify="right")
+    for fraction in _PERCENTILES:
+        table.add_column(f"p{fraction * 100:g}", justify="right")
+
+    table.add_column(_("Trend"), justify="right")
+    for command in sorted({run.command for run in runs}):
+        durations = [
+            run.duration
+            for run in runs
+            if run.command == command and not run.exit_status
+        ]
+        table.add_row(
+            command,
+            str(sum(run.command == command for run in runs)),
+            str(
+                sum(run.command == command and run.exit_status for run in runs)
+            ),
+            *_percentiles_cells(durations),
+            _format_ratio(
+                history.trend(durations, window=window),
+                threshold=threshold,
+            ),
+        )
+
+    console.STDERR.print(table)
+
+
+def _step_durations(
+    runs: Sequence["whiteprint.history.RunRecord"],
+) -> dict[str, list[float]]:
+    """Collect the durations of the steps of the successful runs.
+
+    Args:
+        runs: the runs.
+
+    Returns:
+        The durations of each step.
+    """
+    durations: defaultdict[str, list[float]] = defaultdict(list)
+    for run in (run for run in runs if not run.exit_status):
+        for name, duration in run.steps.items():
+            durations[name].append(duration)
+
+    return durations
+
+
+def _report_steps(runs: Sequence["whiteprint.history.RunRecord"]) -> None:
+    """Print a table of the durations of the steps of the successful runs.
+
+    Args:
+        runs: the runs.
+    """
+    if not (durations := _step_durations(runs)):
+        return
+
+    table = importlib.import_module("rich.table").Table(
+        title=_("Step durations (s)"),
+    )
+    table.add_column(_("Step"))
+    table.add_column(_("Runs"), justify="right")
+    for fraction in _PERCENTILES:
+        table.add_column(f"p{fraction * 100:g}", justify="right")
+
+    for name, step_durations in sorted(durations.items()):
+        table.add_row(
+            name,
+            str(len(step_durations)),
+            *_percentiles_cells(step_durations),
+        )
+
+    console.STDERR.print(table)
+
+
+def _report_regressions(
+    regressions: Sequence["whiteprint.history.Regression"],
+) -> None:
+    """Print a table of the regressions.
+
+    Args:
+        regressions: the regressions.
+    """
+    table = importlib.import_module("rich.table").Table(
+        title=_("Regressions"),
+    )
+    for column in (_("Started"), _("Command"), _("Version"), _("Template")):
+        table.add_column(column)
+
+    for column in (_("Duration (s)"), _("Baseline (s)"), _("Ratio")):
+        table.add_column(column, justify="right")
+
+    for regression in regressions:
+        table.add_row(
+            dt.datetime.fromtimestamp(
+                regression.run.started,
+                tz=dt.timezone.utc,
+            ).isoformat(timespec="seconds"),
+            regression.run.command,
+            regression.run.version,
+            regression.run.template_ref or "-",
+            f"{regression.run.duration:.3f}",
+            f"{regression.baseline:.3f}",
+            f"[bold red]x{regression.ratio:.2f}[/]",
+        )
+
+    console.STDERR.print(table)
+
+
+@click.command()
+@click.option(
+    "--command",
+    type=str,
+    help=_('Only report the runs of this command (e.g. "tool sync").'),
+    default=None,
+)
+@click.option(
+    "--last",
+    type=click.IntRange(min=1),
+    help=_("The number of latest runs reported."),
+    default=os.environ.get(f"{APP_NAME}_STATS_LAST", "100"),
+    show_default=True,
+)
+@click.option(
+    "--window",
+    type=click.IntRange(min=1),
+    help=_(
+        "The number of previous successful runs forming the baseline of a run."
+    ),
+    default=_window_default,
+    show_default=True,
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=1),
+    help=_("The ratio to the baseline above which a run is a regression."),
+    default=_threshold_default,
+    show_default=True,
+)
+def stats(
+    command: str | None,
+    last: int,
+    window: int,
+    threshold: float,
+) -> None:
+    """Report the durations of the recorded init and tool runs.
+
+    Shows the percentiles of the durations of the runs and of their steps,
+    their trend (the median of the latest runs relative to the previous
+    ones) and the runs slower than `threshold` times their baseline (the
+    median of the previous successful runs).
+    """
+    history = importlib.import_module("whiteprint.history")
+    path = (
+        click.get_current_context().find_root().params.get("history")
+        or history.default_path()
+    )
+    runs = history.RunHistory(path).runs(command=command, limit=last)
+    if not runs:
+        logging.getLogger(__name__).warning(
+            _("No run recorded in %s."),
+            path,
+        )
+        return
+
+    _report_runs(runs, window=window, threshold=threshold)
+    _report_steps(runs)
+    if regressions := history.regressions(
+        runs,
+        window=window,
+        threshold=threshold,
+    ):
+        _report_regressions(regressions)
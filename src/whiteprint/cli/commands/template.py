@@ -0,0 +1,223 @@
+"""Check the releases of a template."""
+
+import importlib
+import logging
+import os
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, TypedDict
+
+import rich_click as click
+
+from whiteprint import console
+from whiteprint.cli import APP_NAME
+from whiteprint.loc import _
+
+
+if sys.version_info < (3, 11):  # pragma: nocover
+    from typing_extensions import Unpack
+else:
+    from typing import Unpack
+
+if TYPE_CHECKING:
+    import whiteprint.template_matrix
+
+
+__all__: Final = ["template"]
+"""Public module attributes."""
+
+_STATUS_STYLES: Final = {
+    "ok": "green",
+    "changed": "bold red",
+    "new": "yellow",
+}
+"""The style of each status of a check."""
+
+
+class CheckArgsType(TypedDict):
+    """The check command arguments types."""
+
+    matrix: Path
+    whiteprint_source: str
+    vcs_ref: str | None
+    golden: Path
+    update: bool
+    sample: int | None
+    seed: int
+    jobs: int | None
+
+
+def _read_matrix(path: Path) -> dict[str, list[object]]:
+    """Read a matrix of answers.
+
+    Args:
+        path: a YAML (or JSON) mapping of the questions of the template to
+            a list of values. A value which is not a list is the only value
+            of its question.
+
+    Raises:
+        BadParameter: the file is not a mapping of questions.
+
+    Returns:
+        The values of each question.
+    """
+    matrix = importlib.import_module("yaml").safe_load(
+        path.read_text(encoding="utf-8"),
+    )
+    if not isinstance(matrix, dict) or not all(
+        isinstance(question, str) for question in matrix
+    ):
+        raise click.BadParameter(
+            _("The matrix must map the questions to their values."),
+            param_hint="MATRIX",
+        )
+
+    return {
+        question: values if isinstance(values, list) else [values]
+        for question, values in matrix.items()
+    }
+
+
+def _report(
+    results: Sequence["whiteprint.template_matrix.CheckResult"],
+) -> None:
+    """Print a table of the checks.
+
+    Args:
+        results: the results of the checks.
+    """
+    template_matrix = importlib.import_module("whiteprint.template_matrix")
+    table = importlib.import_module("rich.table").Table(
+        title=_("Template check"),
+    )
+    for column in (_("Key"), _("Answers"), _("Status"), _("Differences")):
+        table.add_column(column)
+
+    for result in results:
+        table.add_row(
+            template_matrix.answers_key(result.answers),
+            ", ".join(
+                f"{question}={value}"
+                for question, value in sorted(result.answers.items())
+            ),
+            f"[{_STATUS_STYLES[result.status]}]{result.status}[/]",
+            "\n".join(
+                [
+                    *(f"+ {name}" for name in result.added),
+                    *(f"- {name}" for name in result.removed),
+                    *(f"~ {name}" for name in result.modified),
+                ],
+            ),
+        )
+
+    console.STDERR.print(table)
+
+
+@click.group(help=_("Check the releases of a template."))
+def template() -> None:
+    """Check the releases of a template."""
+
+
+@template.command()
+@click.argument(
+    "matrix",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--whiteprint-source",
+    "-w",
+    type=str,
+    help=_("The location of the template to check."),
+    default=os.environ.get(
+        f"{APP_NAME}_REPOSITORY",
+        "gh:whiteprints/whiteprint.git",
+    ),
+    show_default=True,
+)
+@click.option(
+    "--vcs-ref",
+    type=str,
+    help=_(
+        "The VCS tag or commit of the template to check. Defaults to the"
+        " latest tag."
+    ),
+    default=None,
+)
+@click.option(
+    "--golden",
+    type=click.Path(file_okay=False, path_type=Path),
+    help=_("The directory of the golden manifests."),
+    default=os.environ.get(f"{APP_NAME}_TEMPLATE_GOLDEN", "golden"),
+    show_default=True,
+)
+@click.option(
+    "--update/--no-update",
+    help=_("Record the renders as the golden manifests."),
+    default=False,
+    show_default=True,
+)
+@click.option(
+    "--sample",
+    type=click.IntRange(min=1),
+    help=_(
+        "Check a sample of this many combinations instead of the whole"
+        " matrix. Every value of every question is part of the sample."
+    ),
+    default=None,
+)
+@click.option(
+    "--seed",
+    type=int,
+    help=_("The seed of the sample."),
+    default=os.environ.get(f"{APP_NAME}_TEMPLATE_SEED", "0"),
+    show_default=True,
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help=_("The number of parallel renders. Defaults to the number of CPUs."),
+    default=None,
+)
+def check(**kwargs: Unpack[CheckArgsType]) -> None:
+    """Render a matrix of answers and compare them with golden manifests.
+
+    MATRIX is a YAML file mapping the questions of the template to their
+    values (e.g. `license: [MIT, Apache-2.0]`). Every combination is
+    rendered in parallel from the same template reference, the SHA-256
+    digests of the rendered files are compared with the golden manifest of
+    the combination. Use `--update` to record the golden manifests, e.g.
+    when releasing the template.
+    """
+    template_matrix = importlib.import_module("whiteprint.template_matrix")
+    values = _read_matrix(kwargs["matrix"])
+    combinations = (
+        list(template_matrix.combinations(values))
+        if kwargs["sample"] is None
+        else template_matrix.sample(
+            values,
+            kwargs["sample"],
+            seed=kwargs["seed"],
+        )
+    )
+    logging.getLogger(__name__).info(
+        _("Checking %d of the %d combinations of %s"),
+        len(combinations),
+        template_matrix.size(values),
+        kwargs["whiteprint_source"],
+    )
+    results = sorted(
+        template_matrix.TemplateCheck(
+            template=kwargs["whiteprint_source"],
+            vcs_ref=kwargs["vcs_ref"],
+            golden=kwargs["golden"],
+            update=kwargs["update"],
+        ).check_all(combinations, jobs=kwargs["jobs"]),
+        key=lambda result: template_matrix.answers_key(result.answers),
+    )
+    _report(results)
+    if not kwargs["update"] and any(
+        result.status != "ok" for result in results
+    ):
+        raise click.exceptions.Exit(1)
@@ -1,15 +1,25 @@
 """Manage python Whiteprint tools."""
 
+import importlib
+import json
 import logging
+import os
+import re
+import shutil
 import sys
-from dataclasses import dataclass, field
-from logging import Logger
+import time
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
 from subprocess import CalledProcessError  # nosec
 from typing import Final, TypedDict
 
 import rich_click as click
+from click import Path as ClickPath
 
-from whiteprint import start_process
+from whiteprint import console, start_process
+from whiteprint.cli import APP_NAME
 from whiteprint.loc import _
 from whiteprint.project_manager import (
     PROJECT_MANAGER_NAME,
@@ -23,25 +33,6 @@
     from typing import Unpack
 
 
-def which_installed_tools(project_manager: str) -> list[str]:
-    """Find the tools installed.
-
-    Returns:
-        A list of installed tools.
-    """
-    return (
-        str(
-            start_process.start_in_directory(
-                [project_manager, "tool", "list"],
-                capture_output=True,
-                encoding="utf-8",
-            ).stdout,
-        )
-        .strip()
-        .split()
-    )
-
-
 @dataclass
 class Tool:
     """A project tool.
@@ -49,6 +40,7 @@ class Tool:
     Attributes:
         name: the name of the tool
         commands: the commands exposed by the tools
+        extras: the additional packages installed with the tool
     """
 
     name: str
@@ -75,6 +67,308 @@ class Tool:
 )
 
 
+def normalize_name(name: str) -> str:
+    """Normalize the name of a python package (see PEP 503).
+
+    Args:
+        name: the name of a package.
+
+    Returns:
+        The normalized name.
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+@dataclass(frozen=True)
+class InstalledTool:
+    """A tool installed by the project manager.
+
+    Attributes:
+        name: the normalized name of the tool.
+        version: the version of the tool.
+        extras: the normalized names of the additional packages installed
+            with the tool.
+        commands: the commands exposed by the tool.
+    """
+
+    name: str
+    version: str
+    extras: frozenset[str] = frozenset()
+    commands: frozenset[str] = frozenset()
+
+
+_TOOL_LIST_HEADER: Final = re.compile(
+    r"^(?P<name>\S+) v(?P<version>\S+)(?: \[with: (?P<extras>[^\]]*)\])?",
+)
+"""A tool line of `uv tool list --show-with`."""
+
+
+def parse_tool_list(output: str) -> dict[str, InstalledTool]:
+    """Parse the output of `uv tool list --show-with`.
+
+    Each tool is listed on a line `<name> v<version> [with: <extras>]`,
+    followed by one line `- <command>` per exposed command.
+
+    Args:
+        output: the output of the tool list command.
+
+    Returns:
+        The installed tools, by normalized name.
+    """
+    inventory: dict[str, InstalledTool] = {}
+    current: InstalledTool | None = None
+    for line in output.splitlines():
+        if line.startswith("- ") and current is not None:
+            current = inventory[current.name] = InstalledTool(
+                name=current.name,
+                version=current.version,
+                extras=current.extras,
+                commands=current.commands | {line[2:].strip()},
+            )
+        elif match := _TOOL_LIST_HEADER.match(line):
+            current = inventory[normalize_name(match["name"])] = InstalledTool(
+                name=normalize_name(match["name"]),
+                version=match["version"],
+                extras=frozenset(
+                    normalize_name(extra.strip())
+                    for extra in (match["extras"] or "").split(",")
+                    if extra.strip()
+                ),
+            )
+
+    return inventory
+
+
+def installed_tools(project_manager: str) -> dict[str, InstalledTool]:
+    """Build the inventory of the tools installed.
+
+    Args:
+        project_manager: path to the project manager.
+
+    Returns:
+        The installed tools, by normalized name.
+    """
+    return parse_tool_list(
+        str(
+            start_process.start_in_directory(
+                [project_manager, "tool", "list", "--show-with"],
+                capture_output=True,
+                encoding="utf-8",
+            ).stdout,
+        ),
+    )
+
+
+def is_current(tool: Tool, inventory: Mapping[str, InstalledTool]) -> bool:
+    """Check that a tool is installed with its extras and commands.
+
+    Args:
+        tool: a whiteprint tool.
+        inventory: the installed tools, by normalized name.
+
+    Returns:
+        Whether the tool is up to date.
+    """
+    installed = inventory.get(normalize_name(tool.name))
+    return (
+        installed is not None
+        and {normalize_name(extra) for extra in tool.extras}
+        <= installed.extras
+        and set(tool.commands) <= installed.commands
+    )
+
+
+TOOL_JOBS: Final = 4
+"""Default number of tools installed or uninstalled concurrently."""
+
+
+@dataclass(frozen=True)
+class ToolResult:
+    """The result of a command run on a tool.
+
+    Attributes:
+        name: the name of the tool.
+        success: whether the command succeeded.
+        duration: the duration of the command in seconds.
+    """
+
+    name: str
+    success: bool
+    duration: float
+
+
+def _run_tool_command(tool: Tool, command: list[str]) -> ToolResult:
+    """Run a command on a tool.
+
+    Args:
+        tool: the tool.
+        command: the command to run.
+
+    Returns:
+        The result of the command.
+    """
+    start = time.perf_counter()
+    try:
+        start_process.start_in_directory(command)
+    except CalledProcessError:
+        success = False
+    else:
+        success = True
+
+    return ToolResult(
+        name=tool.name,
+        success=success,
+        duration=time.perf_counter() - start,
+    )
+
+
+def _run_tool_commands(
+    commands: Iterable[tuple[Tool, list[str]]],
+    *,
+    jobs: int,
+) -> list[ToolResult]:
+    """Run commands on tools on a bounded worker pool.
+
+    The commands are started in the current directory, which is never
+    changed, so they can safely run concurrently.
+
+    Args:
+        commands: the tools and the commands to run on them.
+        jobs: the maximum number of concurrent commands.
+
+    Returns:
+        The results of the commands, in the order of the commands.
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(
+                lambda command: _run_tool_command(*command), commands
+            ),
+        )
+
+
+def _report(results: list[ToolResult], *, title: str) -> None:
+    """Print a table of the results of the commands run on the tools.
+
+    Args:
+        results: the results of the commands.
+        title: the title of the table.
+    """
+    table = importlib.import_module("rich.table").Table(title=title)
+    table.add_column(_("Tool"))
+    table.add_column(_("Status"))
+    table.add_column(_("Duration (s)"), justify="right")
+    for result in results:
+        table.add_row(
+            result.name,
+            _("ok") if result.success else _("failed"),
+            f"{result.duration:.3f}",
+        )
+
+    console.STDERR.print(table)
+
+
+def _requirements(tool: Tool) -> list[str]:
+    """The packages to install for a tool.
+
+    Args:
+        tool: a whiteprint tool.
+
+    Returns:
+        The name of the tool followed by its extras.
+    """
+    return [tool.name, *tool.extras]
+
+
+def _bundle_arguments(tool: Tool, bundle: Path | None) -> list[str]:
+    """The arguments installing a tool from a bundle, without index access.
+
+    Args:
+        tool: a whiteprint tool.
+        bundle: the bundle built by `whiteprint tool bundle`. If None,
+            install the tool from the package index.
+
+    Returns:
+        The arguments of the install command.
+    """
+    if bundle is None:
+        return []
+
+    return ["--offline", "--no-index", "--find-links", str(bundle / tool.name)]
+
+
+def _install_tools(
+    project_manager: str,
+    tools: Iterable[Tool],
+    *,
+    flags: list[str],
+    jobs: int,
+    bundle: Path | None = None,
+) -> None:
+    """Install tools concurrently and report the results.
+
+    Args:
+        project_manager: path to the project manager.
+        tools: the tools to install.
+        flags: the flags of the install command (without leading dashes).
+        jobs: the maximum number of concurrent installations.
+        bundle: the bundle built by `whiteprint tool bundle`. If None,
+            install the tools from the package index.
+    """
+    command_prefix = [
+        project_manager,
+        "tool",
+        "install",
+        "--quiet",
+        *[f"--{flag}" for flag in flags],
+    ]
+    results = _run_tool_commands(
+        (
+            (
+                tool,
+                [
+                    *command_prefix,
+                    tool.name,
+                    *(
+                        argument
+                        for extra in tool.extras
+                        for argument in ("--with", extra)
+                    ),
+                    *_bundle_arguments(tool, bundle),
+                ],
+            )
+            for tool in tools
+        ),
+        jobs=jobs,
+    )
+
+    logger = logging.getLogger(__name__)
+    for result in results:
+        if result.success:
+            logger.info(_("Installed tool: %s"), result.name)
+        else:
+            logger.warning(
+                _(
+                    "Failed to install tool '%s'. "
+                    "Some functionalities may be missing."
+                ),
+                result.name,
+            )
+
+    _report(results, title=_("Tools installation"))
+
+
+_JOBS_OPTION: Final = click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help=_("The number of tools processed concurrently."),
+    default=os.environ.get(f"{APP_NAME}_TOOL_JOBS", str(TOOL_JOBS)),
+    show_default=True,
+)
+"""The option setting the number of tools processed concurrently."""
+
+
 @click.group(help=_("Manage whiteprint tools."))
 def tool() -> None:
     """Manage whiteprint tools."""
@@ -96,11 +390,17 @@ class InstallArgsType(TypedDict):
         reinstall: reinstall a tool.
         refresh: refresh all the cached data.
         upgrade: upgrade a tool.
+        force: force the installation of a tool.
+        jobs: the number of tools installed concurrently.
+        from_bundle: the bundle to install the tools from.
     """
 
     reinstall: bool
     refresh: bool
     upgrade: bool
+    force: bool
+    jobs: int
+    from_bundle: Path | None
 
 
 @tool.command()
@@ -143,63 +443,330 @@ class InstallArgsType(TypedDict):
     default=False,
     show_default=True,
 )
+@click.option(
+    "--from-bundle",
+    type=ClickPath(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    help=_(
+        "Install the tools from a bundle built by `whiteprint tool bundle`,"
+        " without accessing any package index."
+    ),
+    default=os.environ.get(f"{APP_NAME}_TOOL_BUNDLE"),
+)
+@_JOBS_OPTION
 def install(**kwargs: Unpack[InstallArgsType]) -> None:
     """Install the global tools required by whiteprint projects."""
     project_manager = start_process.which(
         PROJECT_MANAGER_NAME, exception=ProjectManagerNotFoundError
     )
 
-    command_prefix = [
+    _install_tools(
         project_manager,
-        "tool",
-        "install",
-        "--quiet",
-        *[f"--{key}" for key in kwargs],
-    ]
+        WHITEPRINT_TOOLS,
+        flags=[
+            flag
+            for flag in ("upgrade", "reinstall", "refresh", "force")
+            if kwargs[flag]
+        ],
+        jobs=kwargs["jobs"],
+        bundle=kwargs["from_bundle"],
+    )
+
+
+@tool.command()
+@click.argument(
+    "destination",
+    type=ClickPath(
+        file_okay=False,
+        dir_okay=True,
+        writable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+)
+@_JOBS_OPTION
+def bundle(destination: Path, jobs: int) -> None:
+    """Build an offline bundle of the global tools into DESTINATION.
+
+    The wheels of each tool, its extras and their dependencies are built
+    into DESTINATION/<tool>, so that `whiteprint tool install --from-bundle
+    DESTINATION` installs the tools without accessing any package index.
+    The wheels are built for the default python interpreter of the project
+    manager.
+    """
+    project_manager = start_process.which(
+        PROJECT_MANAGER_NAME, exception=ProjectManagerNotFoundError
+    )
+    results = _run_tool_commands(
+        (
+            (
+                tool,
+                [
+                    project_manager,
+                    "tool",
+                    "run",
+                    "--from",
+                    "pip",
+                    "pip",
+                    "wheel",
+                    "--quiet",
+                    "--wheel-dir",
+                    str(destination / tool.name),
+                    *_requirements(tool),
+                ],
+            )
+            for tool in WHITEPRINT_TOOLS
+        ),
+        jobs=jobs,
+    )
 
     logger = logging.getLogger(__name__)
-    for tool in WHITEPRINT_TOOLS:
-        command = [*command_prefix, tool.name]
-        if tool.extras:
-            command += ["--with", *tool.extras]
+    for result in results:
+        if result.success:
+            logger.info(_("Bundled tool: %s"), result.name)
+        else:
+            logger.warning(_("Failed to bundle tool '%s'."), result.name)
+
+    _report(results, title=_("Tools bundle"))
+
+
+DOCTOR_THRESHOLD: Final = 1.0
+"""Default startup latency (in seconds) above which a tool is slow."""
+
+
+@dataclass(frozen=True)
+class CommandHealth:
+    """The health of a command exposed by a tool.
+
+    Attributes:
+        tool: the name of the tool.
+        command: the name of the command.
+        path: the path the command resolves to, None if it is missing.
+        version: the first line printed by `<command> --version`, None if
+            the command is missing or failed.
+        cold: the latency of the first invocation in seconds.
+        warm: the latency of the second invocation in seconds.
+        status: one of "ok", "slow", "failed" or "missing".
+    """
+
+    tool: str
+    command: str
+    path: str | None = None
+    version: str | None = None
+    cold: float | None = None
+    warm: float | None = None
+    status: str = "missing"
+
+
+def _time_version(path: str) -> tuple[str, float]:
+    """Invoke `<path> --version` and measure its latency.
+
+    Args:
+        path: path to the command.
+
+    Returns:
+        The first line of the output and the latency in seconds.
+    """
+    start = time.perf_counter()
+    completed_process = start_process.start_in_directory(
+        [path, "--version"],
+        capture_output=True,
+        encoding="utf-8",
+    )
+    latency = time.perf_counter() - start
+    output = f"{completed_process.stdout}{completed_process.stderr}".strip()
+    return next(iter(output.splitlines()), ""), latency
 
-        _try_install_tool(command, logger=logger)
 
+def diagnose(tool: Tool, command: str, *, threshold: float) -> CommandHealth:
+    """Check that a command resolves and measure its startup latency.
 
-def _try_install_tool(command: list[str], *, logger: Logger) -> None:
-    """Try to install a tool.
+    The command is invoked twice with a cheap `--version`: the first
+    (cold) invocation pays for the first-run caches, the second (warm) one
+    measures the steady startup latency.
 
     Args:
-        command: the command to exectute to instal the tool.
-        logger: a logger instance.
+        tool: the tool exposing the command.
+        command: the name of the command.
+        threshold: the latency in seconds above which the command is slow.
+
+    Returns:
+        The health of the command.
     """
+    if (path := shutil.which(command)) is None:
+        return CommandHealth(tool=tool.name, command=command)
+
     try:
-        start_process.start_in_directory(command)
-    except CalledProcessError:
-        logger.warning(
-            _(
-                "Failed to install tool '%s'. "
-                "Some functionalities may be missing."
-            ),
-            tool.name,
+        version, cold = _time_version(path)
+        _version, warm = _time_version(path)
+    except (CalledProcessError, OSError):
+        return CommandHealth(
+            tool=tool.name,
+            command=command,
+            path=path,
+            status="failed",
         )
+
+    return CommandHealth(
+        tool=tool.name,
+        command=command,
+        path=path,
+        version=version,
+        cold=cold,
+        warm=warm,
+        status="slow" if max(cold, warm) > threshold else "ok",
+    )
+
+
+def _format_latency(latency: float | None) -> str:
+    """Format a latency for the doctor table.
+
+    Args:
+        latency: a latency in seconds, None if unknown.
+
+    Returns:
+        The formatted latency.
+    """
+    return "-" if latency is None else f"{latency:.3f}"
+
+
+def _report_health(health: list[CommandHealth]) -> None:
+    """Print a table of the health of the commands.
+
+    Args:
+        health: the health of the commands.
+    """
+    table = importlib.import_module("rich.table").Table(
+        title=_("Tools doctor"),
+    )
+    for column in (_("Tool"), _("Command"), _("Path"), _("Version")):
+        table.add_column(column)
+
+    table.add_column(_("Cold (s)"), justify="right")
+    table.add_column(_("Warm (s)"), justify="right")
+    table.add_column(_("Status"))
+    for command in health:
+        table.add_row(
+            command.tool,
+            command.command,
+            command.path or "-",
+            command.version or "-",
+            _format_latency(command.cold),
+            _format_latency(command.warm),
+            command.status
+            if command.status == "ok"
+            else f"[bold red]{command.status}[/]",
+        )
+
+    console.STDERR.print(table)
+
+
+@tool.command()
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0, min_open=True),
+    help=_("The startup latency (in seconds) above which a tool is slow."),
+    default=os.environ.get(
+        f"{APP_NAME}_TOOL_DOCTOR_THRESHOLD",
+        str(DOCTOR_THRESHOLD),
+    ),
+    show_default=True,
+)
+@click.option(
+    "--json",
+    "as_json",
+    type=bool,
+    help=_("Print the diagnostic as JSON on the standard output."),
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+def doctor(*, threshold: float, as_json: bool) -> None:
+    """Diagnose the resolution and the startup latency of the tools.
+
+    Each command of each tool is resolved on the PATH and invoked twice
+    with `--version`. The commands which are missing, fail or start slower
+    than the threshold are flagged.
+    """
+    health = [
+        diagnose(tool, command, threshold=threshold)
+        for tool in WHITEPRINT_TOOLS
+        for command in tool.commands
+    ]
+    if as_json:
+        click.echo(json.dumps([asdict(command) for command in health]))
     else:
-        logger.info(_("Installed tool: %s"), tool.name)
+        _report_health(health)
+
+    logger = logging.getLogger(__name__)
+    for command in health:
+        if command.status != "ok":
+            logger.warning(
+                _("Command '%s' of tool '%s' is %s."),
+                command.command,
+                command.tool,
+                command.status,
+            )
 
 
 @tool.command()
-def uninstall() -> None:
+@_JOBS_OPTION
+def sync(jobs: int) -> None:
+    """Install the whiteprint tools which are missing or out of date.
+
+    A tool is out of date when it is installed without one of its extras
+    or without one of its commands. When all the tools are up to date, only
+    the inventory of the installed tools is built.
+    """
+    project_manager = start_process.which(
+        PROJECT_MANAGER_NAME, exception=ProjectManagerNotFoundError
+    )
+    inventory = installed_tools(project_manager)
+    if not (
+        outdated := [
+            tool
+            for tool in WHITEPRINT_TOOLS
+            if not is_current(tool, inventory)
+        ]
+    ):
+        logging.getLogger(__name__).info(_("All tools are up to date."))
+        return
+
+    _install_tools(project_manager, outdated, flags=[], jobs=jobs)
+
+
+@tool.command()
+@_JOBS_OPTION
+def uninstall(jobs: int) -> None:
     """Uninstall the global tools required by whiteprint projects."""
     project_manager = start_process.which(
         PROJECT_MANAGER_NAME, exception=ProjectManagerNotFoundError
     )
-    installed_tools = which_installed_tools(project_manager)
+    inventory = installed_tools(project_manager)
 
     command_prefix = [project_manager, "tool", "uninstall", "--quiet"]
+    results = _run_tool_commands(
+        (
+            (tool, [*command_prefix, tool.name])
+            for tool in WHITEPRINT_TOOLS
+            if normalize_name(tool.name) in inventory
+        ),
+        jobs=jobs,
+    )
+
     logger = logging.getLogger(__name__)
-    for tool in WHITEPRINT_TOOLS:
-        if tool.name in installed_tools:
-            start_process.start_in_directory(
-                [*command_prefix, tool.name],
-            )
-            logger.info(_("Uninstalled tool: %s"), tool)
+    for result in results:
+        if result.success:
+            logger.info(_("Uninstalled tool: %s"), result.name)
+        else:
+            logger.warning(_("Failed to uninstall tool '%s'."), result.name)
+
+    _report(results, title=_("Tools uninstallation"))
@@ -1,11 +1,14 @@
 """Command Line Interface app entrypoint."""
 
+import contextlib
 import importlib
 import os
+import time
+from collections.abc import Generator
 from functools import lru_cache
 from importlib.util import find_spec
 from pathlib import Path
-from typing import Final, TextIO, TypedDict, get_args
+from typing import TYPE_CHECKING, Any, Final, TextIO, TypedDict, get_args
 
 import rich_click as click
 from rich_click import Command, Context, File
@@ -13,13 +16,178 @@
 from typing_extensions import Unpack, override
 
 from whiteprint.cli import APP_NAME, __app_name__
-from whiteprint.cli.logging import LogLevel, configure_logging
+from whiteprint.cli.logging import (
+    LogFormat,
+    LogLevel,
+    LogOutput,
+    LogRotation,
+    configure_logging,
+)
 from whiteprint.loc import _
 
 
+if TYPE_CHECKING:
+    import whiteprint.cli.profiling
+
+
 __all__: Final = ["whiteprint"]
 """Public module attributes."""
 
+_RECORDED_COMMANDS: Final = frozenset({"init", "tool"})
+"""The commands whose runs (and the runs of their subcommands) are recorded
+in the run history and whose metrics are exported."""
+
+
+def _exit_status(error: BaseException) -> int | None:
+    """The exit status of a run interrupted by an exception.
+
+    Args:
+        error: the exception.
+
+    Returns:
+        The exit status, None for an early successful exit (e.g. --help) or
+        a usage error, which did not run the command.
+    """
+    if isinstance(error, click.exceptions.Exit):
+        return error.exit_code or None
+
+    if isinstance(error, click.ClickException):
+        return None if isinstance(error, click.UsageError) else error.exit_code
+
+    return error.code if isinstance(error, SystemExit) else 1
+
+
+def _publish(
+    params: dict[str, Any],
+    command: str,
+    *,
+    started: float,
+    duration: float,
+    exit_status: int,
+) -> None:
+    """Record a run in the run history and export its metrics.
+
+    Args:
+        params: the parameters of the root command.
+        command: the command run.
+        started: the time (since the Epoch) at which the run started.
+        duration: the wall-clock duration of the run in seconds.
+        exit_status: the exit status of the run.
+    """
+    if not params["no_history"]:
+        history = importlib.import_module("whiteprint.history")
+        history.record_run(
+            history.RunHistory(params["history"] or history.default_path()),
+            history.RunRecord.from_metrics(
+                command,
+                started=started,
+                duration=duration,
+                exit_status=exit_status,
+            ),
+        )
+
+    if (metrics_file := params["metrics_file"]) is not None:
+        openmetrics = importlib.import_module("whiteprint.openmetrics")
+        openmetrics.write_textfile(
+            openmetrics.metrics_path(metrics_file, command=command),
+            openmetrics.render(
+                command,
+                duration=duration,
+                exit_status=exit_status,
+            ),
+        )
+
+
+def _subcommand(
+    ctx: Context,
+    args: list[str],
+) -> tuple[str | None, Command | None, list[str]]:
+    """Resolve the subcommand of a group.
+
+    Args:
+        ctx: the context of the group.
+        args: the remaining arguments of the group.
+
+    Returns:
+        The name of the subcommand, the subcommand and its arguments. The
+        name and the subcommand are None if the subcommand is unknown.
+    """
+    try:
+        return ctx.command.resolve_command(ctx, args)
+    except click.UsageError:
+        return None, None, args
+
+
+def _command_path(ctx: Context) -> str | None:
+    """Resolve the path of the command about to be invoked.
+
+    The arguments of the groups are parsed leniently, without invoking the
+    groups, to find their subcommand.
+
+    Args:
+        ctx: the context of the root command.
+
+    Returns:
+        The names of the command and of its subcommands (e.g. "tool sync"),
+        None if a command is unknown.
+    """
+    names: list[str] = []
+    parent, args = ctx, [*ctx.protected_args, *ctx.args]
+    while isinstance(parent.command, click.MultiCommand) and args:
+        name, command, args = _subcommand(parent, args)
+        if name is None or command is None:
+            return None
+
+        names.append(name)
+        if not isinstance(command, click.MultiCommand):
+            break
+
+        parent = command.make_context(
+            name,
+            args,
+            parent=parent,
+            resilient_parsing=True,
+        )
+        args = [*parent.protected_args, *parent.args]
+
+    return " ".join(names)
+
+
+@contextlib.contextmanager
+def _recorded(ctx: Context) -> Generator[None, None, None]:
+    """Record the run of a command and export its metrics.
+
+    Only the runs of the commands in `_RECORDED_COMMANDS` (and of their
+    subcommands) are recorded, under their full path (e.g. "tool sync").
+
+    Args:
+        ctx: the context of the root command.
+
+    Yields:
+        None
+    """
+    command = _command_path(ctx)
+    started, start = time.time(), time.perf_counter()
+    exit_status: int | None = 0
+    try:
+        yield
+    except BaseException as error:
+        exit_status = _exit_status(error)
+        raise
+    finally:
+        if (
+            exit_status is not None
+            and command
+            and command.split()[0] in _RECORDED_COMMANDS
+        ):
+            _publish(
+                ctx.params,
+                command,
+                started=started,
+                duration=time.perf_counter() - start,
+                exit_status=int(exit_status),
+            )
+
 
 class LazyCommandLoader(Group):
     """Lazy commands loader.
@@ -105,12 +273,32 @@ def get_command(self, ctx: Context, cmd_name: str) -> Command | None:
         except (ImportError, AttributeError):
             return None
 
+    @override
+    def invoke(self, ctx: Context) -> object:
+        """Invoke a command, recording its run (see `_recorded`).
+
+        Args:
+            ctx: the click context.
+
+        Returns:
+            The value returned by the command.
+        """
+        with _recorded(ctx):
+            return super().invoke(ctx)
+
 
 class CLIArgsType(TypedDict):
     """The CLI arguments types."""
 
     log_level: LogLevel
     log_file: TextIO
+    log_format: LogFormat
+    log_max_bytes: int
+    log_backup_count: int
+    profile: "whiteprint.cli.profiling.Profiler | None"
+    history: Path | None
+    no_history: bool
+    metrics_file: Path | None
 
 
 @click.command(
@@ -144,10 +332,94 @@ class CLIArgsType(TypedDict):
     default=os.environ.get(f"{APP_NAME}_LOG_FILE", "-"),
     show_default=True,
 )
+@click.option(
+    "--log-format",
+    type=click.Choice(get_args(LogFormat), case_sensitive=False),
+    help=_(
+        "Format of the log records. The json format writes one JSON object"
+        " per record."
+    ),
+    default=os.environ.get(f"{APP_NAME}_LOG_FORMAT", "text"),
+    show_default=True,
+)
+@click.option(
+    "--log-max-bytes",
+    type=click.IntRange(min=0),
+    help=_(
+        "Rotate the log file once it reaches this size (in bytes). 0 disables"
+        " the rotation."
+    ),
+    default=os.environ.get(f"{APP_NAME}_LOG_MAX_BYTES", "0"),
+    show_default=True,
+)
+@click.option(
+    "--log-backup-count",
+    type=click.IntRange(min=0),
+    help=_("The number of rotated log files kept."),
+    default=os.environ.get(f"{APP_NAME}_LOG_BACKUP_COUNT", "3"),
+    show_default=True,
+)
+@click.option(
+    "--profile",
+    type=click.Choice(["cprofile", "scalene", "pyinstrument"]),
+    help=_(
+        "Profile the command and write a report next to the log file (or in"
+        " the current directory when logging to the console)."
+    ),
+    default=os.environ.get(f"{APP_NAME}_PROFILE"),
+    show_default=True,
+)
+@click.option(
+    "--history",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help=_(
+        "The SQLite database recording the init and tool runs (see the stats"
+        " command). Defaults to history.sqlite3 in the user data directory."
+    ),
+    default=os.environ.get(f"{APP_NAME}_HISTORY"),
+)
+@click.option(
+    "--no-history",
+    is_flag=True,
+    help=_("Do not record the run in the run history."),
+    default=click.BOOL(os.environ.get(f"{APP_NAME}_NO_HISTORY", "false")),
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help=_(
+        "Write the metrics of the init and tool runs to this file, in the"
+        " OpenMetrics text format (e.g. for the textfile collector of the"
+        " node_exporter). {command} is replaced by the command run."
+    ),
+    default=os.environ.get(f"{APP_NAME}_METRICS_FILE"),
+)
 @click.version_option()
 def whiteprint(**kwargs: Unpack[CLIArgsType]) -> None:
     """The Whiteprint CLI."""
     configure_logging(
         level=kwargs["log_level"],
         file=kwargs["log_file"],
+        output=LogOutput(
+            output_format=kwargs["log_format"],
+            rotation=(
+                LogRotation(
+                    max_bytes=kwargs["log_max_bytes"],
+                    backup_count=kwargs["log_backup_count"],
+                )
+                if kwargs["log_max_bytes"]
+                else None
+            ),
+        ),
     )
+    if (profiler := kwargs["profile"]) is not None:
+        profiling = importlib.import_module("whiteprint.cli.profiling")
+        click.get_current_context().with_resource(
+            profiling.profiled(
+                profiler,
+                output=profiling.profile_path(
+                    kwargs["log_file"],
+                    profiler=profiler,
+                ),
+            ),
+        )
@@ -5,7 +5,7 @@
 from pathlib import Path
 from typing import Final
 
-from click.exceptions import UsageError
+from click.exceptions import ClickException, UsageError
 
 
 if sys.version_info < (3, 12):  # pragma: nocover
@@ -17,6 +17,7 @@
 __all__: Final = [
     "InvalidAppNameError",
     "InvalidYAMLError",
+    "ProvisioningError",
     "UnsupportedTypeInMappingError",
 ]
 
@@ -62,3 +63,22 @@ def __post_init__(self) -> None:
             "must contain only ASCII alphanumeric characters or underscores "
             "or dashes."
         )
+
+
+@dataclass
+class ProvisioningError(ClickException):
+    """Some GitHub repositories could not be provisioned."""
+
+    repositories: list[Path]
+
+    def __post_init__(self) -> None:
+        """Initialize the exception.
+
+        Args:
+            repositories: paths to the repositories which failed.
+        """
+        super().__init__(
+            f"Failed to provision {len(self.repositories)} repositories: "
+            + ", ".join(map(str, self.repositories))
+            + ".",
+        )
@@ -1,14 +1,37 @@
 """Logging configuration for the CLI."""
 
+import atexit
+import contextlib
 import importlib
+import json
 import logging
+import queue
+import signal
+import sys
+import threading
+from dataclasses import dataclass
+from logging import handlers as logging_handlers
+from types import FrameType
 from typing import Final, Literal, TextIO, TypeAlias
 
-from whiteprint import console
+from whiteprint import console, log_context
 from whiteprint.loc import _
 
 
-__all__: Final = ["LogLevel", "configure_logging"]
+if sys.version_info < (3, 12):  # pragma: nocover
+    from typing_extensions import override
+else:
+    from typing import override
+
+
+__all__: Final = [
+    "JsonFormatter",
+    "LogFormat",
+    "LogLevel",
+    "LogOutput",
+    "LogRotation",
+    "configure_logging",
+]
 
 
 LogLevel: TypeAlias = Literal[
@@ -20,6 +43,252 @@
     "NOTSET",
 ]
 
+LogFormat: TypeAlias = Literal["text", "json"]
+
+LOG_BUFFER_CAPACITY: Final = 256
+"""Number of records buffered before being written to a log file.
+
+The buffer is flushed earlier by records of level ERROR or above.
+"""
+
+_FLUSH_SIGNALS: Final = ("SIGTERM", "SIGHUP")
+"""Signals turned into a clean exit, flushing the logs."""
+
+
+@dataclass(frozen=True)
+class LogRotation:
+    """The size-based rotation of a log file.
+
+    Attributes:
+        max_bytes: the size of the log file above which it is rotated.
+        backup_count: the number of rotated log files kept.
+    """
+
+    max_bytes: int
+    backup_count: int = 3
+
+
+@dataclass(frozen=True)
+class LogOutput:
+    """The output of the log records.
+
+    Attributes:
+        output_format: the format of the records, "text" or "json". The json
+            format writes one JSON object per line (see `JsonFormatter`).
+        rotation: the rotation of the log file. If None, the log file is
+            never rotated. Ignored when logging to the console.
+    """
+
+    output_format: LogFormat = "text"
+    rotation: LogRotation | None = None
+
+
+_CONTEXT_FIELDS: Final = (
+    ("step", log_context.STEP),
+    ("destination", log_context.DESTINATION),
+)
+"""The record attributes set from the log context."""
+
+_STRUCTURED_FIELDS: Final = (
+    "step",
+    "command",
+    "duration",
+    "exit_code",
+    "usage",
+    "details",
+    "destination",
+)
+"""The record attributes (set with `extra` or from the log context) emitted
+by the JSON formatter."""
+
+
+_DEFAULT_OUTPUT: Final = LogOutput()
+"""Text records, without rotation."""
+
+
+class _ContextFilter(logging.Filter):
+    """Attach the log context to the records, on the logging thread."""
+
+    @override
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Set the context attributes not already given with `extra`.
+
+        Args:
+            record: the record to complete.
+
+        Returns:
+            True, the records are never dropped.
+        """
+        for name, variable in _CONTEXT_FIELDS:
+            if getattr(record, name, None) is None:
+                setattr(record, name, variable.get())
+
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format the records as one JSON object per line.
+
+    Only the structured fields which are set are emitted, and the message is
+    not rendered by rich, so that the records are cheap to produce.
+    """
+
+    @override
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record.
+
+        Args:
+            record: the record to format.
+
+        Returns:
+            A JSON object.
+        """
+        fields: dict[str, object] = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "thread": record.thread,
+            "message": record.getMessage(),
+        }
+        fields.update(
+            (name, value)
+            for name in _STRUCTURED_FIELDS
+            if (value := getattr(record, name, None)) is not None
+        )
+        if record.exc_info:
+            fields["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(fields, default=str)
+
+
+class _DeferredQueueHandler(logging_handlers.QueueHandler):
+    """A queue handler leaving the formatting to the listener thread.
+
+    The default `QueueHandler` formats the message on the calling thread, so
+    that the record can be pickled. The records never leave the process
+    here, hence the formatting (including the captured outputs of the
+    subprocesses) is deferred to the background writer.
+    """
+
+    @override
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as is.
+
+        Args:
+            record: the record to enqueue.
+
+        Returns:
+            The record.
+        """
+        return record
+
+
+class _FlushingQueueListener(logging_handlers.QueueListener):
+    """A queue listener flushing its handlers once stopped.
+
+    Stopping the listener more than once (e.g. explicitly, then on exit) is
+    allowed.
+    """
+
+    _running = False
+
+    @override
+    def start(self) -> None:
+        """Start the background writer."""
+        super().start()
+        self._running = True
+
+    @override
+    def stop(self) -> None:
+        """Write the pending records, then flush the handlers."""
+        if not self._running:
+            return
+
+        self._running = False
+        super().stop()
+        for handler in self.handlers:
+            handler.flush()
+
+
+def _writer(
+    file: TextIO,
+    *,
+    formatter: logging.Formatter,
+    rotation: LogRotation | None,
+) -> logging.Handler:
+    """The handler writing the records in the background.
+
+    Args:
+        file: the file in which to log ("-" for the rich console).
+        formatter: the formatter of the records.
+        rotation: the rotation of the log file. If None, never rotate.
+
+    Returns:
+        A rich handler for the console, a buffered handler for a file.
+    """
+    if file.name == "-" and isinstance(formatter, JsonFormatter):
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(formatter)
+        return console_handler
+
+    if file.name == "-":
+        rich_handler = importlib.import_module("rich.logging").RichHandler(
+            console=console.STDERR,
+        )
+        rich_handler.setFormatter(formatter)
+        return rich_handler
+
+    # The log file is (re)opened by the handler, so that it stays open
+    # until the pending records are written on exit.
+    target = (
+        logging.FileHandler(file.name, mode="w", encoding="utf-8", delay=True)
+        if rotation is None
+        else logging_handlers.RotatingFileHandler(
+            file.name,
+            maxBytes=rotation.max_bytes,
+            backupCount=rotation.backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+    )
+    target.setFormatter(formatter)
+    return logging_handlers.MemoryHandler(
+        LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=target,
+    )
+
+
+def _exit_on_signal(signum: int, _frame: FrameType | None) -> None:
+    """Exit cleanly on a signal, so that the exit handlers run.
+
+    Args:
+        signum: the signal received.
+        _frame: the current stack frame (unused).
+    """
+    sys.exit(128 + signum)
+
+
+def _flush_on_exit(listener: logging_handlers.QueueListener) -> None:
+    """Stop the background writer on exit and on termination signals.
+
+    The signals are only handled if they were not already, and only from
+    the main thread.
+
+    Args:
+        listener: the background writer.
+    """
+    atexit.register(listener.stop)
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    for name in _FLUSH_SIGNALS:
+        signum = getattr(signal, name, None)
+        if signum is not None and signal.getsignal(signum) == signal.SIG_DFL:
+            with contextlib.suppress(ValueError, OSError):
+                signal.signal(signum, _exit_on_signal)
+
 
 def configure_logging(
     level: LogLevel,
@@ -29,14 +298,29 @@ def configure_logging(
         "[{process}:{thread}] [{pathname}:{funcName}:{lineno}]\n{message}",
     ),
     date_format: str = _("[%Y-%m-%dT%H:%M:%S]"),
-) -> None:
+    output: LogOutput = _DEFAULT_OUTPUT,
+) -> logging_handlers.QueueListener | None:
     """Configure Rich logging handler.
 
+    The records are put on a queue by the logging threads and written by a
+    background thread, so that the log IO never stalls the workers. The
+    records written to a file are buffered. The pending records are written
+    on exit, including on SIGTERM and SIGHUP.
+
+    With the "json" output format, each record is written as a JSON object
+    on one line (see `JsonFormatter`), on the standard error instead of the
+    rich console when logging to "-".
+
     Args:
         level: The logging verbosity level.
         file: An optional file in which to log.
         log_format: The log message format.
         date_format: The log date format.
+        output: The format and the rotation of the records. The json
+            format ignores `log_format` and `date_format`.
+
+    Returns:
+        The background writer, None if the logging was already configured.
 
     Example:
         >>> from whiteprint.cli.cli_types import LogLevel
@@ -59,19 +343,29 @@ def configure_logging(
         show_locals=True,
         suppress=suppress,
     )
-    handlers = [
-        importlib.import_module("rich.logging").RichHandler(
-            console=console.STDERR,
-        )
-        if file.name == "-"
-        else logging.StreamHandler(file),
-    ]
-
-    logging.basicConfig(
-        format=f"{{asctime}}{log_format}",
-        handlers=handlers,
-        level=level.upper(),
-        datefmt=date_format,
-        style="{",
+    writer = _writer(
+        file,
+        formatter=(
+            JsonFormatter()
+            if output.output_format == "json"
+            else logging.Formatter(
+                f"{{asctime}}{log_format}",
+                datefmt=date_format,
+                style="{",
+            )
+        ),
+        rotation=output.rotation,
     )
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(records)
+    queue_handler.addFilter(_ContextFilter())
+    logging.basicConfig(handlers=[queue_handler], level=level.upper())
     logging.captureWarnings(capture=True)
+    if queue_handler not in logging.getLogger().handlers:
+        writer.close()
+        return None
+
+    listener = _FlushingQueueListener(records, writer)
+    listener.start()
+    _flush_on_exit(listener)
+    return listener
@@ -0,0 +1,248 @@
+"""Whole-run profiling of the CLI."""
+
+import contextlib
+import importlib
+import io
+import logging
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Generator
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Final, Literal, TextIO, TypeAlias
+
+import rich_click as click
+
+from whiteprint import start_process
+from whiteprint.loc import _
+
+
+__all__: Final = ["Profiler", "profile_path", "profiled"]
+"""Public module attributes."""
+
+
+Profiler: TypeAlias = Literal["cprofile", "scalene", "pyinstrument"]
+
+PROFILE_SUFFIX: Final = ".profile.txt"
+"""Suffix of the profile reports."""
+
+_TOP_FUNCTIONS: Final = 50
+"""Number of functions listed in a cProfile report."""
+
+
+def profile_path(log_file: TextIO, *, profiler: Profiler) -> Path:
+    """The path of the profile report, next to the log file.
+
+    Args:
+        log_file: the log file ("-" for the console).
+        profiler: the profiler.
+
+    Returns:
+        `<log file stem>.profile.txt` next to the log file, or
+        `whiteprint-<profiler>.profile.txt` in the current directory when
+        logging to the console.
+    """
+    if log_file.name == "-":
+        return Path(f"whiteprint-{profiler}{PROFILE_SUFFIX}").resolve()
+
+    log_path = Path(log_file.name).resolve()
+    return log_path.with_name(f"{log_path.stem}{PROFILE_SUFFIX}")
+
+
+def _subprocesses_report(
+    processes: list[start_process.ProcessRecord],
+    *,
+    wall_time: float,
+) -> str:
+    """Report the time spent in the subprocesses.
+
+    Args:
+        processes: the subprocesses started during the profiled run.
+        wall_time: the wall-clock duration of the profiled run in seconds.
+
+    Returns:
+        The total time of the subprocesses, per step and per command.
+    """
+    per_step: defaultdict[str, float] = defaultdict(float)
+    for process in processes:
+        per_step[process.step or "-"] += process.duration
+
+    total = sum(process.duration for process in processes)
+    lines = [
+        _("Wall-clock time: {:.3f}s").format(wall_time),
+        _("Subprocesses: {} ({:.3f}s, possibly concurrent)").format(
+            len(processes),
+            total,
+        ),
+        "",
+        _("Subprocess time per step:"),
+        *(
+            f"  {step}: {duration:.3f}s"
+            for step, duration in sorted(
+                per_step.items(),
+                key=lambda item: item[1],
+                reverse=True,
+            )
+        ),
+        "",
+        _("Subprocesses by duration:"),
+        *(
+            f"  {process.duration:.3f}s [{process.exit_code}]"
+            f" {' '.join(process.command)}"
+            for process in sorted(
+                processes,
+                key=lambda process: process.duration,
+                reverse=True,
+            )
+        ),
+    ]
+    return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def _cprofile(report: io.StringIO) -> Generator[None, None, None]:
+    """Profile the calling thread with cProfile.
+
+    Args:
+        report: a buffer receiving the report once the context exits.
+
+    Yields:
+        None
+    """
+    cprofile = importlib.import_module("cProfile")
+    pstats = importlib.import_module("pstats")
+    profile = cprofile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        pstats.Stats(profile, stream=report).sort_stats(
+            "cumulative",
+        ).print_stats(_TOP_FUNCTIONS)
+
+
+@contextlib.contextmanager
+def _pyinstrument(report: io.StringIO) -> Generator[None, None, None]:
+    """Profile the calling thread with pyinstrument.
+
+    Args:
+        report: a buffer receiving the report once the context exits.
+
+    Yields:
+        None
+    """
+    profiler = importlib.import_module("pyinstrument").Profiler()
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        report.write(profiler.output_text(unicode=True, show_all=False))
+
+
+@contextlib.contextmanager
+def _scalene(report: io.StringIO) -> Generator[None, None, None]:
+    """Profile with scalene, restricted to the command.
+
+    Scalene must launch the interpreter, hence the run must be started
+    with `python -m scalene --off`: the profiling is then only switched on
+    during the command. Scalene writes its own report on exit.
+
+    Args:
+        report: a buffer receiving the report once the context exits.
+
+    Yields:
+        None
+    """
+    scalene_profiler = sys.modules["scalene.scalene_profiler"]
+    scalene_profiler.start()
+    try:
+        yield
+    finally:
+        scalene_profiler.stop()
+        report.write(_("See the report written by scalene."))
+
+
+def _check_available(profiler: Profiler) -> None:
+    """Check that a profiler can be used in this run.
+
+    Args:
+        profiler: the profiler.
+
+    Raises:
+        UsageError: pyinstrument is not installed, or scalene did not start
+            the run.
+    """
+    if profiler == "pyinstrument" and find_spec("pyinstrument") is None:
+        raise click.UsageError(
+            _("pyinstrument is not installed: pip install pyinstrument"),
+        )
+
+    if profiler == "scalene" and "scalene.scalene_profiler" not in sys.modules:
+        raise click.UsageError(
+            _(
+                "--profile scalene requires the run to be started with"
+                " `python -m scalene --off --cli --outfile <report> -- $(which"
+                " whiteprint) --profile scalene ...`."
+            ),
+        )
+
+
+_PROFILERS: Final = {
+    "cprofile": _cprofile,
+    "pyinstrument": _pyinstrument,
+    "scalene": _scalene,
+}
+"""The in-process profilers, by name."""
+
+
+@contextlib.contextmanager
+def profiled(
+    profiler: Profiler,
+    *,
+    output: Path,
+) -> Generator[None, None, None]:
+    """Profile a run and write a report.
+
+    The report attributes the time spent in the subprocesses (started with
+    `whiteprint.start_process`) separately from the in-process python time
+    measured by the profiler. cProfile and pyinstrument only profile the
+    calling thread, the subprocesses of all the threads are reported.
+
+    Args:
+        profiler: the profiler.
+        output: the path of the report.
+
+    Yields:
+        None
+
+    Raises:
+        UsageError: the profiler can not be used in this run.
+    """
+    _check_available(profiler)
+    first_process = len(start_process.PROCESSES)
+    report = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with _PROFILERS[profiler](report):
+            yield
+    finally:
+        output.write_text(
+            "\n".join(
+                [
+                    _("Profile of: {}").format(" ".join(sys.argv)),
+                    "",
+                    _subprocesses_report(
+                        start_process.PROCESSES[first_process:],
+                        wall_time=time.perf_counter() - start,
+                    ),
+                    "",
+                    _("In-process python time ({}):").format(profiler),
+                    report.getvalue(),
+                ],
+            ),
+            encoding="utf-8",
+        )
+        logging.getLogger(__name__).info(_("Profile written to %s"), output)
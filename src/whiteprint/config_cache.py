@@ -0,0 +1,109 @@
+"""Persistent cache of parsed configuration files."""
+
+import hashlib
+import json
+import logging
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final
+
+from whiteprint import metrics
+from whiteprint.loc import _
+
+
+__all__: Final = ["ConfigCache"]
+"""Public module attributes."""
+
+
+def _signature(path: Path) -> list[int]:
+    """The signature of a file, changing whenever the file is modified.
+
+    Args:
+        path: path to a file.
+
+    Returns:
+        The size and the modification time (in nanoseconds) of the file.
+    """
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+@dataclass(frozen=True)
+class ConfigCache:
+    """An on-disk cache of parsed configuration files.
+
+    There is one JSON file per configuration file, keyed by its resolved
+    path. An entry is only used while the size and the modification time of
+    the configuration file are unchanged, so that editing the configuration
+    file invalidates it.
+
+    Attributes:
+        directory: the directory of the cache.
+    """
+
+    directory: Path
+
+    def path(self, config: Path) -> Path:
+        """The path of the cache entry of a configuration file.
+
+        Args:
+            config: path to a configuration file.
+
+        Returns:
+            The path of the cache entry.
+        """
+        digest = hashlib.sha256(str(config.resolve()).encode())
+        return self.directory / f"{digest.hexdigest()}.json"
+
+    def load(self, config: Path) -> dict[str, object] | None:
+        """Load the cached content of a configuration file.
+
+        Args:
+            config: path to a configuration file.
+
+        Returns:
+            The cached content, or None if there is none, it is unreadable
+            or the configuration file changed since it was cached.
+        """
+        try:
+            entry = json.loads(self.path(config).read_text(encoding="utf-8"))
+            if entry["signature"] == _signature(config):
+                metrics.CACHE_HITS["config"] += 1
+                return dict(entry["data"])
+        except (OSError, KeyError, TypeError, ValueError) as error:
+            logging.getLogger(__name__).debug(
+                _("No usable configuration cache entry: %s"),
+                error,
+            )
+
+        metrics.CACHE_MISSES["config"] += 1
+        return None
+
+    def store(self, config: Path, data: dict[str, object]) -> None:
+        """Store the parsed content of a configuration file.
+
+        The entry is replaced atomically so that concurrent runs never read a
+        partially written entry.
+
+        Args:
+            config: path to a configuration file.
+            data: the parsed content of the configuration file.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=self.directory,
+            delete=False,
+        ) as temporary_file:
+            json.dump(
+                {"signature": _signature(config), "data": data},
+                temporary_file,
+            )
+
+        temporary_path = Path(temporary_file.name)
+        try:
+            temporary_path.replace(self.path(config))
+        finally:
+            temporary_path.unlink(missing_ok=True)
@@ -1,19 +1,29 @@
 """Filesystem utilities."""
 
 import contextlib
+import importlib
 import logging
 import os
+import shutil
 from collections.abc import Generator
+from importlib.util import find_spec
 from pathlib import Path
 from typing import Final
 
 from whiteprint.loc import _
 
 
-__all__: Final = ["working_directory"]
+__all__: Final = ["copy_tree", "disk_usage", "working_directory"]
 """Public module attributes."""
 
 
+_BLOCK_SIZE: Final = 512
+"""The unit of `os.stat_result.st_blocks`."""
+
+_FICLONE: Final = 0x40049409
+"""The Linux ioctl sharing the extents of a file with another (reflink)."""
+
+
 @contextlib.contextmanager
 def working_directory(path: Path) -> Generator[None, None, None]:
     """Sets the current working directory (cwd) within the context.
@@ -38,3 +48,95 @@ def working_directory(path: Path) -> Generator[None, None, None]:
     finally:
         logger.debug(_("Changing current directory to: %s"), origin)
         os.chdir(origin)
+
+
+def disk_usage(path: Path) -> int:
+    """Compute the disk space used by the files in a directory tree.
+
+    The allocated blocks are counted when the platform reports them, so that
+    many small files weight more than a single file of the same apparent
+    size. Otherwise, the apparent size is used.
+
+    Args:
+        path: the root of the directory tree.
+
+    Returns:
+        The disk space used by the files, in bytes.
+    """
+    return sum(_allocated_size(file) for file in path.rglob("*"))
+
+
+def _allocated_size(path: Path) -> int:
+    """Compute the disk space used by a file.
+
+    Args:
+        path: the path to the file.
+
+    Returns:
+        The disk space used by the file in bytes, 0 if path is not a file.
+    """
+    if not path.is_file():
+        return 0
+
+    stat_result = path.stat()
+    return (
+        getattr(stat_result, "st_blocks", 0) * _BLOCK_SIZE
+        or stat_result.st_size
+    )
+
+
+def _clone_file(source: str, destination: str) -> str:
+    """Copy a file, sharing its blocks when the filesystem supports it.
+
+    The copy is a reflink (copy-on-write) on the filesystems supporting it
+    (e.g. Btrfs, XFS), a regular copy otherwise.
+
+    Args:
+        source: the path of the file to copy.
+        destination: the path of the copy.
+
+    Returns:
+        The path of the copy.
+    """
+    if find_spec("fcntl") is None:  # pragma: no cover
+        return shutil.copy2(source, destination)
+
+    try:
+        with (
+            Path(source).open("rb") as source_file,
+            Path(destination).open("wb") as destination_file,
+        ):
+            importlib.import_module("fcntl").ioctl(
+                destination_file.fileno(),
+                _FICLONE,
+                source_file.fileno(),
+            )
+    except OSError:
+        return shutil.copy2(source, destination)
+
+    shutil.copystat(source, destination)
+    return destination
+
+
+def copy_tree(source: Path, destination: Path) -> Path:
+    """Copy a directory tree, with copy-on-write when possible.
+
+    The files are reflinked on the filesystems supporting it, so that the
+    copy is cheap and only the modified blocks use space. The symbolic
+    links are copied as links.
+
+    Args:
+        source: the root of the directory tree.
+        destination: the root of the copy, which must not exist.
+
+    Returns:
+        The root of the copy.
+    """
+    return Path(
+        shutil.copytree(
+            source,
+            destination,
+            symlinks=True,
+            copy_function=_clone_file,
+        ),
+    )
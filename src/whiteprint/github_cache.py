@@ -0,0 +1,157 @@
+"""Persistent cache of GitHub lookups."""
+
+import hashlib
+import json
+import logging
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Final
+
+from whiteprint.loc import _
+
+
+__all__: Final = [
+    "ENTITY_CACHE_TTL",
+    "EntityCache",
+    "OrganizationsEntry",
+    "token_fingerprint",
+]
+"""Public module attributes."""
+
+ENTITY_CACHE_TTL: Final = 24 * 60 * 60.0
+"""Default number of seconds before a cached lookup is revalidated."""
+
+_FINGERPRINT_LENGTH: Final = 16
+"""Number of hexadecimal digits of a token fingerprint."""
+
+
+def token_fingerprint(token: str, *, base_url: str) -> str:
+    """Fingerprint a GitHub token.
+
+    The fingerprint identifies the token in the cache without the token being
+    stored, nor being recoverable from the cache.
+
+    Args:
+        token: a GitHub token.
+        base_url: the URL of the GitHub API the token is used with.
+
+    Returns:
+        A prefix of the SHA-256 digest of the token and the API URL.
+    """
+    digest = hashlib.sha256(f"{base_url}\0{token}".encode())
+    return digest.hexdigest()[:_FINGERPRINT_LENGTH]
+
+
+@dataclass(frozen=True)
+class OrganizationsEntry:
+    """The cached organizations of an authenticated user.
+
+    Attributes:
+        organizations: the logins of the organizations of the user.
+        etag: the ETag of the GitHub response listing the organizations.
+        expires: the time (since the Epoch) after which the entry must be
+            revalidated.
+    """
+
+    organizations: list[str] = field(default_factory=list)
+    etag: str | None = None
+    expires: float = 0.0
+
+    @property
+    def expired(self) -> bool:
+        """Whether the entry must be revalidated."""
+        return time.time() >= self.expires
+
+    def kind(self, login: str) -> str:
+        """The kind of GitHub entity of a login.
+
+        Args:
+            login: the GitHub login name of a user or an organization.
+
+        Returns:
+            "organization" if the login is one of the organizations of the
+            user, "user" otherwise.
+        """
+        return "organization" if login in self.organizations else "user"
+
+
+@dataclass(frozen=True)
+class EntityCache:
+    """An on-disk cache of the GitHub entities of a token.
+
+    There is one JSON file per token fingerprint, so that the cache can be
+    shared between runs (and processes) using the same token.
+
+    Attributes:
+        directory: the directory of the cache.
+        fingerprint: the fingerprint of the GitHub token.
+        ttl: the number of seconds before an entry is revalidated.
+    """
+
+    directory: Path
+    fingerprint: str
+    ttl: float = ENTITY_CACHE_TTL
+
+    @property
+    def path(self) -> Path:
+        """The path of the cache file."""
+        return self.directory / f"{self.fingerprint}.json"
+
+    def load(self) -> OrganizationsEntry | None:
+        """Load the cached organizations.
+
+        Returns:
+            The cached entry, or None if there is none or it is unreadable.
+        """
+        try:
+            return OrganizationsEntry(
+                **json.loads(self.path.read_text(encoding="utf-8")),
+            )
+        except (OSError, TypeError, ValueError) as error:
+            logging.getLogger(__name__).debug(
+                _("No usable GitHub cache entry: %s"),
+                error,
+            )
+            return None
+
+    def store(
+        self,
+        organizations: list[str],
+        *,
+        etag: str | None,
+    ) -> OrganizationsEntry:
+        """Store the organizations of the user for `ttl` seconds.
+
+        The file is replaced atomically so that concurrent runs never read a
+        partially written entry.
+
+        Args:
+            organizations: the logins of the organizations of the user.
+            etag: the ETag of the GitHub response listing the organizations.
+
+        Returns:
+            The stored entry.
+        """
+        entry = OrganizationsEntry(
+            organizations=organizations,
+            etag=etag,
+            expires=time.time() + self.ttl,
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=self.directory,
+            delete=False,
+        ) as temporary_file:
+            json.dump(asdict(entry), temporary_file)
+
+        temporary_path = Path(temporary_file.name)
+        try:
+            temporary_path.replace(self.path)
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+        return entry
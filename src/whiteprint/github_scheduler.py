@@ -0,0 +1,266 @@
+"""Rate-limit aware scheduling of the GitHub API requests."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Final, TypeVar
+
+from github.GithubException import RateLimitExceededException
+from github.Requester import Requester
+from urllib3.util import Retry
+
+from whiteprint.loc import _
+
+
+__all__: Final = [
+    "MAX_ATTEMPTS",
+    "SECONDARY_RATE_LIMIT_WAIT",
+    "TRANSPORT_RETRY_STATUSES",
+    "WRITE_INTERVAL",
+    "GithubScheduler",
+    "SchedulerCounters",
+    "transport_retry",
+]
+"""Public module attributes."""
+
+WRITE_INTERVAL: Final = 1.0
+"""Default minimal number of seconds between two mutation requests.
+
+GitHub recommends to wait at least one second between mutations to avoid
+its secondary rate limits.
+"""
+
+SECONDARY_RATE_LIMIT_WAIT: Final = 60.0
+"""Number of seconds to wait after hitting a secondary rate limit without
+`retry-after` header. The wait is doubled at each attempt."""
+
+MAX_ATTEMPTS: Final = 3
+"""Default number of attempts of a rate limited request."""
+
+TRANSPORT_RETRY_STATUSES: Final = frozenset({500, 502, 503, 504})
+"""The server errors retried by the HTTP client (see `transport_retry`)."""
+
+T = TypeVar("T")
+
+
+def transport_retry(total: int) -> Retry:
+    """The retries of the HTTP client of a scheduled GitHub client.
+
+    The rate limited requests (403 and 429 responses) are retried by the
+    scheduler only: the HTTP client retries the connection errors and the
+    server errors of the idempotent requests, but not the rate limits, so
+    that both do not back off on top of each other.
+
+    Args:
+        total: the number of retries.
+
+    Returns:
+        The retries to give to the GitHub client.
+    """
+    return Retry(
+        total=total,
+        status_forcelist=TRANSPORT_RETRY_STATUSES,
+        backoff_factor=0.5,
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+
+
+@dataclass
+class SchedulerCounters:
+    """The counters of a scheduler.
+
+    Attributes:
+        requests: the number of requests sent (including the failed ones).
+        writes: the number of mutation requests sent.
+        retries: the number of rate limited requests retried.
+        waits: the number of times a request was held back.
+        waited: the total number of seconds the requests were held back.
+        remaining: the remaining quota of the primary rate limit, as last
+            reported by GitHub (-1 if unknown).
+        limit: the primary rate limit, as last reported by GitHub (-1 if
+            unknown).
+    """
+
+    requests: int = 0
+    writes: int = 0
+    retries: int = 0
+    waits: int = 0
+    waited: float = 0.0
+    remaining: int = -1
+    limit: int = -1
+
+    def details(self) -> dict[str, int | float]:
+        """The counters as step details (see `whiteprint.metrics`).
+
+        Returns:
+            The counters, without the unknown rate limit.
+        """
+        return {
+            key: value
+            for key, value in asdict(self).items()
+            if not (key in {"remaining", "limit"} and value < 0)
+        }
+
+
+def _retry_delay(
+    exception: RateLimitExceededException,
+    *,
+    attempt: int,
+) -> float:
+    """Number of seconds to wait before retrying a rate limited request.
+
+    Args:
+        exception: the rate limit exception raised by the request.
+        attempt: the number of attempts already made.
+
+    Returns:
+        The delay advertised by GitHub if any, an exponential backoff
+        otherwise.
+    """
+    headers = exception.headers or {}
+    if "retry-after" in headers:
+        return float(headers["retry-after"])
+
+    if headers.get("x-ratelimit-remaining") == "0":
+        return max(float(headers["x-ratelimit-reset"]) - time.time(), 0.0)
+
+    return SECONDARY_RATE_LIMIT_WAIT * 2 ** (attempt - 1)
+
+
+class GithubScheduler:
+    """Schedule the GitHub API requests according to the rate limits.
+
+    The primary rate limit is tracked from the `X-RateLimit-*` headers of
+    the responses (as parsed by the requester): once the quota is
+    exhausted, the requests are held back until it is reset. The mutation
+    requests are spaced by `write_interval` seconds, even when sent from
+    several threads, to avoid the secondary rate limits. A request hitting a
+    rate limit anyway is queued and retried after the delay advertised by
+    GitHub instead of failing.
+
+    Attributes:
+        requester: the requester of the GitHub client.
+        write_interval: the minimal number of seconds between two mutations.
+        max_attempts: the number of attempts of a rate limited request.
+        counters: the counters of the requests and waits.
+    """
+
+    def __init__(
+        self,
+        requester: Requester,
+        *,
+        write_interval: float = WRITE_INTERVAL,
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            requester: the requester of the GitHub client.
+            write_interval: the minimal number of seconds between two
+                mutations.
+            max_attempts: the number of attempts of a rate limited request.
+        """
+        self.requester = requester
+        self.write_interval = write_interval
+        self.max_attempts = max_attempts
+        self.counters = SchedulerCounters()
+        self._lock = threading.Lock()
+        self._next_write = 0.0
+
+    def submit(self, request: Callable[[], T], *, write: bool = False) -> T:
+        """Send a request when the rate limits allow it.
+
+        Args:
+            request: a function sending the request.
+            write: whether the request is a mutation.
+
+        Returns:
+            The result of the request.
+
+        Raises:
+            RateLimitExceededException: the request was still rate limited
+                after `max_attempts` attempts.
+        """
+        attempt = 1
+        while True:
+            self._wait(self._delay(write=write))
+            try:
+                return self._send(request, write=write)
+            except RateLimitExceededException as exception:
+                if attempt >= self.max_attempts:
+                    raise
+
+                with self._lock:
+                    self.counters.retries += 1
+
+                self._wait(_retry_delay(exception, attempt=attempt))
+                attempt += 1
+
+    def _delay(self, *, write: bool) -> float:
+        """Number of seconds to wait before sending a request.
+
+        A mutation reserves its time slot, so that concurrent mutations are
+        spaced.
+
+        Args:
+            write: whether the request is a mutation.
+
+        Returns:
+            The delay before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            remaining, _limit = self.requester.rate_limiting
+            delay = (
+                max(self.requester.rate_limiting_resettime - time.time(), 0.0)
+                if remaining == 0
+                else 0.0
+            )
+            if write:
+                start = max(now + delay, self._next_write)
+                self._next_write = start + self.write_interval
+                delay = start - now
+
+            return delay
+
+    def _wait(self, delay: float) -> None:
+        """Hold back the current request.
+
+        Args:
+            delay: the number of seconds to wait.
+        """
+        if delay <= 0:
+            return
+
+        with self._lock:
+            self.counters.waits += 1
+            self.counters.waited += delay
+
+        logging.getLogger(__name__).debug(
+            _("Waiting %.3fs before the next GitHub request"),
+            delay,
+        )
+        time.sleep(delay)
+
+    def _send(self, request: Callable[[], T], *, write: bool) -> T:
+        """Send a request and update the counters.
+
+        Args:
+            request: a function sending the request.
+            write: whether the request is a mutation.
+
+        Returns:
+            The result of the request.
+        """
+        try:
+            return request()
+        finally:
+            with self._lock:
+                self.counters.requests += 1
+                self.counters.writes += int(write)
+                self.counters.remaining, self.counters.limit = (
+                    self.requester.rate_limiting
+                )
@@ -0,0 +1,425 @@
+"""Local history of the runs, to follow their performance over time."""
+
+import contextlib
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+from collections.abc import Generator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Final
+
+import platformdirs
+
+from whiteprint import metrics
+from whiteprint.cli import __app_name__
+from whiteprint.loc import _
+from whiteprint.version import __version__
+
+
+__all__: Final = [
+    "BASELINE_WINDOW",
+    "REGRESSION_THRESHOLD",
+    "Regression",
+    "RunHistory",
+    "RunRecord",
+    "default_path",
+    "host_info",
+    "percentile",
+    "record_run",
+    "regressions",
+    "trend",
+]
+"""Public module attributes."""
+
+BASELINE_WINDOW: Final = 10
+"""Number of previous successful runs forming the baseline of a run."""
+
+REGRESSION_THRESHOLD: Final = 2.0
+"""Ratio to the baseline above which a run is a regression."""
+
+_MIN_BASELINE: Final = 3
+"""Number of previous successful runs required to compute a baseline."""
+
+_SCHEMA_VERSION: Final = 1
+"""Version of the database schema, stored in `PRAGMA user_version`."""
+
+_SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    command TEXT NOT NULL,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    exit_status INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    template_ref TEXT,
+    steps TEXT NOT NULL,
+    cache_hits TEXT NOT NULL,
+    host TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_command_started ON runs (command, started);
+"""
+"""Schema of the history database."""
+
+_COLUMNS: Final = (
+    "command",
+    "started",
+    "duration",
+    "exit_status",
+    "version",
+    "template_ref",
+    "steps",
+    "cache_hits",
+    "host",
+)
+"""Columns of the runs table, in the order of the `RunRecord` fields."""
+
+_JSON_COLUMNS: Final = frozenset({"steps", "cache_hits", "host"})
+"""Columns of the runs table stored as JSON objects."""
+
+
+def default_path() -> Path:
+    """The default path of the history database.
+
+    Returns:
+        `history.sqlite3` in the user data directory.
+    """
+    return Path(platformdirs.user_data_dir(__app_name__)) / "history.sqlite3"
+
+
+def host_info() -> dict[str, str | int]:
+    """Describe the host of the run.
+
+    Returns:
+        The operating system, the architecture, the Python implementation
+        and version, and the number of CPUs.
+    """
+    return {
+        "system": platform.system(),
+        "release": platform.release(),
+        "machine": platform.machine(),
+        "python": (
+            f"{platform.python_implementation()} {platform.python_version()}"
+        ),
+        "cpus": os.cpu_count() or 1,
+    }
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    """The record of a run.
+
+    Attributes:
+        command: the path of the command run (e.g. "init" or "tool sync").
+        started: the time (since the Epoch) at which the run started.
+        duration: the wall-clock duration of the run in seconds.
+        exit_status: the exit status of the run.
+        version: the version of whiteprint.
+        template_ref: the template (and its VCS reference) used, if any.
+        steps: the duration of the steps (see `whiteprint.metrics`) in
+            seconds, by step.
+        cache_hits: the number of hits of the persistent caches, by cache.
+        host: the description of the host (see `host_info`).
+    """
+
+    command: str
+    started: float
+    duration: float
+    exit_status: int
+    version: str = __version__
+    template_ref: str | None = None
+    steps: dict[str, float] = field(default_factory=dict)
+    cache_hits: dict[str, int] = field(default_factory=dict)
+    host: dict[str, str | int] = field(default_factory=host_info)
+
+    @classmethod
+    def from_metrics(
+        cls,
+        command: str,
+        *,
+        started: float,
+        duration: float,
+        exit_status: int,
+    ) -> "RunRecord":
+        """Record a run from the metrics collected during the run.
+
+        Args:
+            command: the command run.
+            started: the time (since the Epoch) at which the run started.
+            duration: the wall-clock duration of the run in seconds.
+            exit_status: the exit status of the run.
+
+        Returns:
+            The record of the run.
+        """
+        steps: dict[str, float] = {}
+        for step in metrics.STEPS:
+            steps[step.name] = steps.get(step.name, 0.0) + step.duration
+
+        return cls(
+            command=command,
+            started=started,
+            duration=duration,
+            exit_status=exit_status,
+            template_ref=metrics.LABELS.get("template"),
+            steps=steps,
+            cache_hits=dict(metrics.CACHE_HITS),
+        )
+
+
+@dataclass(frozen=True)
+class RunHistory:
+    """A SQLite database of the runs.
+
+    Attributes:
+        path: the path of the database.
+    """
+
+    path: Path
+
+    @contextlib.contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        """Open the database, creating it if needed.
+
+        Yields:
+            A connection to the database, committed on success.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10.0)
+        try:
+            with connection:
+                if (
+                    connection.execute("PRAGMA user_version").fetchone()[0]
+                    != _SCHEMA_VERSION
+                ):
+                    connection.executescript(_SCHEMA)
+                    connection.execute(
+                        f"PRAGMA user_version = {_SCHEMA_VERSION}",
+                    )
+
+                yield connection
+        finally:
+            connection.close()
+
+    def record(self, run: RunRecord) -> None:
+        """Add a run to the history.
+
+        Args:
+            run: the record of the run.
+        """
+        values = [
+            json.dumps(value) if column in _JSON_COLUMNS else value
+            for column, value in zip(
+                _COLUMNS,
+                (getattr(run, column) for column in _COLUMNS),
+                strict=True,
+            )
+        ]
+        with self._connect() as connection:
+            connection.execute(
+                f"INSERT INTO runs ({', '.join(_COLUMNS)})"  # nosec B608
+                f" VALUES ({', '.join('?' * len(_COLUMNS))})",
+                values,
+            )
+
+    def runs(
+        self,
+        *,
+        command: str | None = None,
+        limit: int | None = None,
+        successful: bool = False,
+    ) -> list[RunRecord]:
+        """List the recorded runs.
+
+        Args:
+            command: only list the runs of this command (e.g. "tool sync").
+                If None, list the runs of all the commands.
+            limit: only list the latest `limit` runs. If None, list all the
+                runs.
+            successful: only list the successful runs.
+
+        Returns:
+            The runs, from the oldest to the latest.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM runs"  # nosec B608
+                " WHERE (?1 IS NULL OR command = ?1)"
+                " AND (NOT ?3 OR exit_status = 0)"
+                " ORDER BY started DESC, id DESC LIMIT ?2",
+                (command, -1 if limit is None else limit, successful),
+            ).fetchall()
+
+        return [
+            RunRecord(
+                **{
+                    column: json.loads(value)
+                    if column in _JSON_COLUMNS
+                    else value
+                    for column, value in zip(_COLUMNS, row, strict=True)
+                },
+            )
+            for row in reversed(rows)
+        ]
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Compute a percentile, interpolating linearly between the values.
+
+    Args:
+        values: the values, not necessarily sorted.
+        fraction: the percentile, between 0 and 1 (e.g. 0.9 for p90).
+
+    Returns:
+        The percentile of the values.
+
+    Raises:
+        ValueError: there is no value.
+    """
+    if not values:
+        raise ValueError(_("No value to compute a percentile of."))
+
+    ordered = sorted(values)
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (
+        position - lower
+    )
+
+
+@dataclass(frozen=True)
+class Regression:
+    """A run much slower than the previous ones.
+
+    Attributes:
+        run: the slow run.
+        baseline: the median duration of the previous successful runs of the
+            same command, in seconds.
+    """
+
+    run: RunRecord
+    baseline: float
+
+    @property
+    def ratio(self) -> float:
+        """The duration of the run relative to the baseline."""
+        return self.run.duration / self.baseline
+
+
+def regressions(
+    runs: Sequence[RunRecord],
+    *,
+    window: int = BASELINE_WINDOW,
+    threshold: float = REGRESSION_THRESHOLD,
+) -> list[Regression]:
+    """Find the successful runs much slower than their baseline.
+
+    The baseline of a run is the median duration of the `window` previous
+    successful runs of the same command. Runs with fewer than 3 previous
+    successful runs have no baseline.
+
+    Args:
+        runs: the runs, from the oldest to the latest.
+        window: the number of previous successful runs forming a baseline.
+        threshold: the ratio to the baseline above which a run is a
+            regression.
+
+    Returns:
+        The regressions, from the oldest to the latest.
+    """
+    previous: dict[str, list[float]] = {}
+    found = []
+    for run in runs:
+        if run.exit_status:
+            continue
+
+        durations = previous.setdefault(run.command, [])
+        if len(durations) >= _MIN_BASELINE and run.duration >= threshold * (
+            baseline := statistics.median(durations[-window:])
+        ):
+            found.append(Regression(run, baseline))
+
+        durations.append(run.duration)
+
+    return found
+
+
+def trend(
+    durations: Sequence[float],
+    *,
+    window: int = BASELINE_WINDOW,
+) -> float | None:
+    """Compare the latest durations to the previous ones.
+
+    Args:
+        durations: the durations, from the oldest to the latest.
+        window: the number of durations in the latest and previous windows.
+
+    Returns:
+        The median of the latest durations relative to the median of the
+        previous ones, None if there are fewer than 6 durations. With fewer
+        than `2 * window` durations, each half is compared.
+    """
+    size = min(window, len(durations) // 2)
+    if size < _MIN_BASELINE:
+        return None
+
+    latest, previous = durations[-size:], durations[-2 * size : -size]
+    return statistics.median(latest) / statistics.median(previous)
+
+
+def record_run(
+    history: RunHistory,
+    run: RunRecord,
+    *,
+    window: int = BASELINE_WINDOW,
+    threshold: float = REGRESSION_THRESHOLD,
+) -> Regression | None:
+    """Add a run to the history and warn if it is a regression.
+
+    The history is best effort: failing to update it is only logged.
+
+    Args:
+        history: the history of the runs.
+        run: the record of the run.
+        window: the number of previous successful runs forming a baseline.
+        threshold: the ratio to the baseline above which a run is a
+            regression.
+
+    Returns:
+        The regression, if the run is one.
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        history.record(run)
+        found = regressions(
+            history.runs(
+                command=run.command,
+                limit=window + 1,
+                successful=True,
+            ),
+            window=window,
+            threshold=threshold,
+        )
+    except (OSError, sqlite3.Error) as error:
+        logger.warning(_("Could not update the run history: %s"), error)
+        return None
+
+    if found and found[-1].run == run:
+        logger.warning(
+            _(
+                "This %s run took %.1fs, %.1fx the median of the previous"
+                " runs (%.1fs). See `whiteprint stats`."
+            ),
+            run.command,
+            run.duration,
+            found[-1].ratio,
+            found[-1].baseline,
+        )
+        return found[-1]
+
+    return None
@@ -0,0 +1,42 @@
+"""Context attached to the log records."""
+
+import contextlib
+from collections.abc import Generator
+from contextvars import ContextVar
+from typing import Final, TypeVar
+
+
+__all__: Final = ["DESTINATION", "STEP", "bound"]
+"""Public module attributes."""
+
+T = TypeVar("T")
+
+STEP: Final[ContextVar[str | None]] = ContextVar(
+    "whiteprint_step",
+    default=None,
+)
+"""The name of the step (see `whiteprint.metrics`) being run."""
+
+DESTINATION: Final[ContextVar[str | None]] = ContextVar(
+    "whiteprint_destination",
+    default=None,
+)
+"""The destination of the project being generated or provisioned."""
+
+
+@contextlib.contextmanager
+def bound(variable: ContextVar[T], value: T) -> Generator[None, None, None]:
+    """Set a context variable within a context.
+
+    Args:
+        variable: the context variable.
+        value: the value of the variable within the context.
+
+    Yields:
+        None
+    """
+    token = variable.set(value)
+    try:
+        yield
+    finally:
+        variable.reset(token)
@@ -0,0 +1,217 @@
+"""Run metrics."""
+
+import contextlib
+import importlib
+import logging
+import time
+from collections import Counter
+from collections.abc import Generator
+from dataclasses import dataclass, field
+from typing import Final
+
+from rich.console import Console
+
+from whiteprint import log_context, start_process
+from whiteprint.loc import _
+
+
+__all__: Final = [
+    "CACHE_HITS",
+    "CACHE_MISSES",
+    "LABELS",
+    "STEPS",
+    "StepRecord",
+    "report",
+    "reset",
+    "step",
+]
+"""Public module attributes."""
+
+
+@dataclass
+class StepRecord:
+    """The record of a step.
+
+    Attributes:
+        name: the name of the step.
+        duration: the wall-clock duration of the step in seconds.
+        details: additional measurements of the step. Keys ending with
+            `_bytes` are reported as file sizes and keys ending with
+            `_bytes_per_second` as transfer rates.
+        failed: whether the step raised an exception.
+    """
+
+    name: str
+    duration: float = 0.0
+    details: dict[str, int | float] = field(default_factory=dict)
+    failed: bool = False
+
+
+STEPS: Final[list[StepRecord]] = []
+"""The steps recorded during the run, in completion order."""
+
+CACHE_HITS: Final[Counter[str]] = Counter()
+"""The number of hits of the persistent caches during the run, by cache."""
+
+CACHE_MISSES: Final[Counter[str]] = Counter()
+"""The number of misses of the persistent caches during the run, by cache."""
+
+LABELS: Final[dict[str, str]] = {}
+"""Labels describing the run (e.g. the template used)."""
+
+
+def reset() -> None:
+    """Forget the metrics recorded so far, e.g. between two runs.
+
+    The steps, the cache counters, the labels and the subprocesses (see
+    `whiteprint.start_process.PROCESSES`) are cleared.
+    """
+    STEPS.clear()
+    CACHE_HITS.clear()
+    CACHE_MISSES.clear()
+    LABELS.clear()
+    start_process.reset()
+
+
+@contextlib.contextmanager
+def step(name: str) -> Generator[StepRecord, None, None]:
+    """Time a step and record it in `STEPS`.
+
+    The name of the step is attached to the records logged within the step
+    (see `whiteprint.log_context`). The resources used by the subprocesses
+    started within the step (see `whiteprint.start_process`) are added to
+    its details.
+
+    Args:
+        name: the name of the step.
+
+    Yields:
+        The record of the step, whose details can be completed within the
+        context.
+    """
+    record = StepRecord(name)
+    logger = logging.getLogger(__name__)
+    logger.debug(_("Starting step: %s"), name)
+    first_process = len(start_process.PROCESSES)
+    start = time.perf_counter()
+    try:
+        with log_context.bound(log_context.STEP, name):
+            yield record
+    except BaseException:
+        record.failed = True
+        raise
+    finally:
+        record.duration = time.perf_counter() - start
+        record.details.update(
+            _processes_usage(
+                [
+                    process
+                    for process in start_process.PROCESSES[first_process:]
+                    if process.step == name
+                ],
+            ),
+        )
+        STEPS.append(record)
+        logger.info(
+            _("Step %s took %.3fs"),
+            name,
+            record.duration,
+            extra={
+                "step": name,
+                "duration": record.duration,
+                "details": record.details,
+            },
+        )
+
+
+def _processes_usage(
+    processes: list[start_process.ProcessRecord],
+) -> dict[str, int | float]:
+    """Aggregate the resources used by subprocesses.
+
+    Args:
+        processes: the subprocesses.
+
+    Returns:
+        The number of subprocesses, their total CPU times and block IO, and
+        their largest peak resident set size. Empty if no resource usage was
+        recorded.
+    """
+    usages = [
+        process.usage for process in processes if process.usage is not None
+    ]
+    if not usages:
+        return {}
+
+    return {
+        "processes": len(usages),
+        "user_time": sum(usage.user_time for usage in usages),
+        "system_time": sum(usage.system_time for usage in usages),
+        "max_rss_bytes": max(usage.max_rss_bytes for usage in usages),
+        "block_input": sum(usage.block_input for usage in usages),
+        "block_output": sum(usage.block_output for usage in usages),
+    }
+
+
+def _format_details(details: dict[str, int | float]) -> str:
+    """Format the details of a step.
+
+    Args:
+        details: the details of a step.
+
+    Returns:
+        A human readable representation of the details.
+    """
+    return ", ".join(
+        _format_detail(key, value) for key, value in details.items()
+    )
+
+
+def _format_detail(key: str, value: int | float) -> str:  # noqa: PYI041
+    """Format a detail of a step.
+
+    Args:
+        key: the name of the detail.
+        value: the value of the detail.
+
+    Returns:
+        A human readable representation of the detail.
+    """
+    filesize = importlib.import_module("rich.filesize")
+    if key.endswith("_bytes_per_second"):
+        return (
+            f"{key.removesuffix('_bytes_per_second')}="
+            f"{filesize.decimal(int(value))}/s"
+        )
+
+    if key.endswith("_bytes"):
+        return f"{key.removesuffix('_bytes')}={filesize.decimal(int(value))}"
+
+    return (
+        f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+    )
+
+
+def report(console: Console) -> None:
+    """Print a table of the recorded steps.
+
+    Args:
+        console: the console on which to print the table.
+    """
+    if not STEPS:
+        return
+
+    table = importlib.import_module("rich.table").Table(
+        title=_("Steps timing"),
+    )
+    table.add_column(_("Step"))
+    table.add_column(_("Duration (s)"), justify="right")
+    table.add_column(_("Details"))
+    for record in STEPS:
+        table.add_row(
+            record.name,
+            f"{record.duration:.3f}",
+            _format_details(record.details),
+        )
+
+    console.print(table)
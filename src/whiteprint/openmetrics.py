@@ -0,0 +1,363 @@
+"""Export of the run metrics in the OpenMetrics text format.
+
+The exposition is meant for the textfile collector of the Prometheus
+node_exporter: it describes the last run of a command and is replaced
+atomically at the end of each run.
+
+See Also:
+    https://prometheus.io/docs/specs/om/open_metrics_spec/
+"""
+
+import logging
+import math
+import tempfile
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Final
+
+from whiteprint import metrics, start_process
+from whiteprint.loc import _
+
+
+__all__: Final = [
+    "STEP_DURATION_BUCKETS",
+    "metrics_path",
+    "render",
+    "write_textfile",
+]
+"""Public module attributes."""
+
+STEP_DURATION_BUCKETS: Final = (
+    0.1,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+    math.inf,
+)
+"""Upper bounds (in seconds) of the buckets of the step durations."""
+
+_GITHUB_COUNTERS: Final = ("requests", "retries", "writes", "waits")
+"""The counters of the GitHub scheduler found in the step details (see
+`whiteprint.github_scheduler.SchedulerCounters`)."""
+
+_TEXTFILE_MODE: Final = 0o644
+"""Permissions of the textfile, readable by the node_exporter."""
+
+
+def _escape(value: str) -> str:
+    """Escape a label value.
+
+    Args:
+        value: the value of a label.
+
+    Returns:
+        The value with the backslashes, double quotes and line feeds
+        escaped.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: int | float) -> str:  # noqa: PYI041
+    """Format a number.
+
+    Args:
+        value: a number.
+
+    Returns:
+        The number, "+Inf" for the infinity.
+    """
+    return "+Inf" if math.isinf(value) else f"{value:g}"
+
+
+def _sample(
+    name: str,
+    labels: Mapping[str, str],
+    value: int | float,  # noqa: PYI041
+) -> str:
+    """Format a sample.
+
+    Args:
+        name: the name of the sample.
+        labels: the labels of the sample.
+        value: the value of the sample.
+
+    Returns:
+        A line of the exposition.
+    """
+    label_set = ",".join(
+        f'{label}="{_escape(label_value)}"'
+        for label, label_value in labels.items()
+    )
+    return f"{name}{{{label_set}}} {_number(value)}"
+
+
+def _family(
+    name: str,
+    kind: str,
+    description: str,
+    samples: Iterable[str],
+) -> list[str]:
+    """Format a metric family.
+
+    Args:
+        name: the name of the metric family.
+        kind: the type of the metric family (e.g. "gauge").
+        description: the help of the metric family.
+        samples: the samples of the metric family.
+
+    Returns:
+        The lines of the metric family.
+    """
+    return [
+        f"# TYPE {name} {kind}",
+        f"# HELP {name} {description}",
+        *samples,
+    ]
+
+
+def _step_durations(command: str) -> list[str]:
+    """The histogram of the step durations.
+
+    Args:
+        command: the command run.
+
+    Returns:
+        The samples of the histogram, by step.
+    """
+    durations: dict[str, list[float]] = {}
+    for step in metrics.STEPS:
+        durations.setdefault(step.name, []).append(step.duration)
+
+    samples = []
+    for name, step_durations in durations.items():
+        labels = {"command": command, "step": name}
+        samples.extend(
+            _sample(
+                "whiteprint_step_duration_seconds_bucket",
+                {**labels, "le": "+Inf" if math.isinf(bound) else str(bound)},
+                sum(duration <= bound for duration in step_durations),
+            )
+            for bound in STEP_DURATION_BUCKETS
+        )
+        samples.append(
+            _sample(
+                "whiteprint_step_duration_seconds_count",
+                labels,
+                len(step_durations),
+            ),
+        )
+        samples.append(
+            _sample(
+                "whiteprint_step_duration_seconds_sum",
+                labels,
+                sum(step_durations),
+            ),
+        )
+
+    return samples
+
+
+def _per_step(
+    name: str,
+    counts: Mapping[str, int],
+    *,
+    command: str,
+) -> list[str]:
+    """Samples by step.
+
+    Args:
+        name: the name of the samples.
+        counts: values by step.
+        command: the command run.
+
+    Returns:
+        The samples.
+    """
+    return [
+        _sample(name, {"command": command, "step": step}, value)
+        for step, value in counts.items()
+    ]
+
+
+def _cache_samples(
+    name: str,
+    values: Mapping[str, int | float],
+    *,
+    command: str,
+) -> list[str]:
+    """Samples by cache.
+
+    Args:
+        name: the name of the samples.
+        values: values by cache.
+        command: the command run.
+
+    Returns:
+        The samples.
+    """
+    return [
+        _sample(name, {"command": command, "cache": cache}, value)
+        for cache, value in sorted(values.items())
+    ]
+
+
+def render(command: str, *, duration: float, exit_status: int) -> str:
+    """Render the metrics of the current run.
+
+    Args:
+        command: the path of the command run (e.g. "init" or "tool sync"),
+            the value of the `command` label.
+        duration: the wall-clock duration of the run in seconds.
+        exit_status: the exit status of the run.
+
+    Returns:
+        The OpenMetrics exposition of the run.
+    """
+    run = {"command": command}
+    processes = Counter(
+        process.step or "-" for process in start_process.PROCESSES
+    )
+    failures = Counter(step.name for step in metrics.STEPS if step.failed)
+    github = Counter[str]()
+    for step in metrics.STEPS:
+        github.update(
+            {
+                counter: int(step.details.get(counter, 0))
+                for counter in _GITHUB_COUNTERS
+            },
+        )
+
+    lookups = metrics.CACHE_HITS + metrics.CACHE_MISSES
+    lines = [
+        *_family(
+            "whiteprint_run_duration_seconds",
+            "gauge",
+            "Wall-clock duration of the last run.",
+            [_sample("whiteprint_run_duration_seconds", run, duration)],
+        ),
+        *_family(
+            "whiteprint_run_exit_status",
+            "gauge",
+            "Exit status of the last run.",
+            [_sample("whiteprint_run_exit_status", run, exit_status)],
+        ),
+        *_family(
+            "whiteprint_step_duration_seconds",
+            "histogram",
+            "Duration of the steps of the last run.",
+            _step_durations(command),
+        ),
+        *_family(
+            "whiteprint_step_failures",
+            "gauge",
+            "Number of failed steps in the last run.",
+            _per_step("whiteprint_step_failures", failures, command=command),
+        ),
+        *_family(
+            "whiteprint_subprocesses",
+            "gauge",
+            "Number of subprocesses started in the last run, by step.",
+            _per_step("whiteprint_subprocesses", processes, command=command),
+        ),
+        *(
+            line
+            for counter in _GITHUB_COUNTERS
+            for line in _family(
+                f"whiteprint_github_{counter}",
+                "gauge",
+                f"Number of GitHub API {counter} in the last run.",
+                [
+                    _sample(
+                        f"whiteprint_github_{counter}", run, github[counter]
+                    )
+                ],
+            )
+        ),
+        *_family(
+            "whiteprint_cache_lookups",
+            "gauge",
+            "Number of lookups of the persistent caches in the last run.",
+            _cache_samples(
+                "whiteprint_cache_lookups",
+                lookups,
+                command=command,
+            ),
+        ),
+        *_family(
+            "whiteprint_cache_hit_ratio",
+            "gauge",
+            "Ratio of the lookups of the persistent caches which hit.",
+            _cache_samples(
+                "whiteprint_cache_hit_ratio",
+                {
+                    cache: metrics.CACHE_HITS[cache] / count
+                    for cache, count in lookups.items()
+                },
+                command=command,
+            ),
+        ),
+        "# EOF",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def metrics_path(template: Path, *, command: str) -> Path:
+    """The path of the textfile of a command.
+
+    Example:
+        >>> metrics_path(Path("{command}.prom"), command="tool sync").name
+        'tool_sync.prom'
+
+    Args:
+        template: the path of the textfile, in which `{command}` is replaced
+            by the path of the command run, its names joined by "_".
+        command: the path of the command run (e.g. "tool sync").
+
+    Returns:
+        The path of the textfile.
+    """
+    return Path(str(template).replace("{command}", "_".join(command.split())))
+
+
+def write_textfile(path: Path, exposition: str) -> None:
+    """Write an exposition atomically.
+
+    The exposition is written in a temporary file of the same directory,
+    then renamed, so that the collector never reads a partial file. The
+    write is best effort: failing to write is only logged.
+
+    Args:
+        path: the path of the textfile.
+        exposition: the OpenMetrics exposition.
+    """
+    temporary_path: Path | None = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=path.parent,
+            prefix=f".{path.name}.",
+            delete=False,
+        ) as temporary_file:
+            temporary_path = Path(temporary_file.name)
+            temporary_file.write(exposition)
+
+        temporary_path.chmod(_TEXTFILE_MODE)
+        temporary_path.replace(path)
+    except OSError as error:
+        logging.getLogger(__name__).warning(
+            _("Could not write the metrics to %s: %s"),
+            path,
+            error,
+        )
+    finally:
+        if temporary_path is not None:
+            temporary_path.unlink(missing_ok=True)
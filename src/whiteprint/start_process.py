@@ -1,15 +1,25 @@
 """Subprocess related functionalities."""
 
 import logging
+import os
 import shutil
 import subprocess  # nosec
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from subprocess import CompletedProcess  # nosec
+from typing import TYPE_CHECKING, Final
 
-from whiteprint import filesystem
+from whiteprint import log_context
 from whiteprint.loc import _
 
 
+if TYPE_CHECKING:
+    import resource
+
+
 def which(tool: str, *, exception: type[Exception]) -> str:
     """Find a ressource on the system.
 
@@ -26,6 +36,164 @@ def which(tool: str, *, exception: type[Exception]) -> str:
     return tool_path
 
 
+@dataclass(frozen=True)
+class ProcessUsage:
+    """The resources used by a subprocess (see getrusage(2)).
+
+    Attributes:
+        user_time: the CPU time spent in user mode in seconds.
+        system_time: the CPU time spent in kernel mode in seconds.
+        max_rss_bytes: the peak resident set size in bytes.
+        block_input: the number of block input operations.
+        block_output: the number of block output operations.
+    """
+
+    user_time: float
+    system_time: float
+    max_rss_bytes: int
+    block_input: int
+    block_output: int
+
+    @classmethod
+    def from_rusage(cls, rusage: "resource.struct_rusage") -> "ProcessUsage":
+        """Read the resources used from a rusage structure.
+
+        Args:
+            rusage: the rusage structure of a subprocess.
+
+        Returns:
+            The resources used.
+        """
+        return cls(
+            user_time=rusage.ru_utime,
+            system_time=rusage.ru_stime,
+            # ru_maxrss is in bytes on macOS, in kilobytes elsewhere.
+            max_rss_bytes=(
+                rusage.ru_maxrss
+                if sys.platform == "darwin"
+                else rusage.ru_maxrss * 1024
+            ),
+            block_input=rusage.ru_inblock,
+            block_output=rusage.ru_oublock,
+        )
+
+
+def _communicate(
+    process: "subprocess.Popen[bytes]",
+) -> tuple[bytes | str | None, bytes | str | None, ProcessUsage | None]:
+    """Read the outputs of a subprocess, then reap it with wait4.
+
+    The subprocess is reaped by its pid, so that its resource usage is its
+    own even when other subprocesses are reaped concurrently. On the
+    platforms without wait4, the resource usage is not available.
+
+    Args:
+        process: a started subprocess.
+
+    Returns:
+        The captured stdout and stderr, and the resources used.
+    """
+    if not hasattr(os, "wait4"):  # pragma: no cover
+        stdout, stderr = process.communicate()
+        return stdout, stderr, None
+
+    streams = (process.stdout, process.stderr)
+    if any(streams):
+        # Both pipes are read concurrently, so that a subprocess filling
+        # one of them does not block.
+        with ThreadPoolExecutor(max_workers=len(streams)) as executor:
+            reads = [
+                None if stream is None else executor.submit(stream.read)
+                for stream in streams
+            ]
+            stdout, stderr = (
+                None if read is None else read.result() for read in reads
+            )
+    else:
+        stdout = stderr = None
+
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:  # pragma: no cover
+        # The process was already reaped (e.g. SIGCLD is ignored).
+        process.wait()
+        return stdout, stderr, None
+
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return stdout, stderr, ProcessUsage.from_rusage(rusage)
+
+
+@dataclass(frozen=True)
+class ProcessRecord:
+    """The record of a subprocess.
+
+    Attributes:
+        command: the command executed in the subprocess.
+        exit_code: the exit code of the subprocess.
+        duration: the wall-clock duration of the subprocess in seconds.
+        step: the step (see `whiteprint.metrics`) which started the
+            subprocess, if any.
+        usage: the resources used by the subprocess, if available.
+    """
+
+    command: list[str]
+    exit_code: int
+    duration: float
+    step: str | None = None
+    usage: ProcessUsage | None = None
+
+    def extra(self) -> dict[str, object]:
+        """The record as attributes of a log record.
+
+        Returns:
+            The command, the exit code, the duration and the resource usage.
+        """
+        return {
+            "command": self.command,
+            "exit_code": self.exit_code,
+            "duration": self.duration,
+            "usage": None if self.usage is None else asdict(self.usage),
+        }
+
+
+PROCESSES: Final[list[ProcessRecord]] = []
+"""The subprocesses completed during the run, in completion order."""
+
+
+def reset() -> None:
+    """Forget the subprocesses completed so far (see `PROCESSES`)."""
+    PROCESSES.clear()
+
+
+def _record(
+    command: list[str],
+    *,
+    process: "subprocess.Popen[bytes]",
+    start: float,
+    usage: ProcessUsage | None,
+) -> ProcessRecord:
+    """Record a completed subprocess in `PROCESSES`.
+
+    Args:
+        command: the command executed in the subprocess.
+        process: the completed subprocess.
+        start: the `time.perf_counter` value when the subprocess started.
+        usage: the resources used by the subprocess, if available.
+
+    Returns:
+        The record of the subprocess.
+    """
+    record = ProcessRecord(
+        command=command,
+        exit_code=process.returncode,
+        duration=time.perf_counter() - start,
+        step=log_context.STEP.get(),
+        usage=usage,
+    )
+    PROCESSES.append(record)
+    return record
+
+
 def start_in_directory(
     command: list[str],
     *,
@@ -35,6 +203,10 @@ def start_in_directory(
 ) -> CompletedProcess[bytes]:
     """Start a subprocess in a working directory.
 
+    The working directory is given to the subprocess only: the current
+    directory of the caller is not changed, so that processes can be
+    started concurrently from several threads.
+
     Args:
         command: the command to execute in the subprocess.
         capture_output: capture the output of the command.
@@ -46,15 +218,42 @@ def start_in_directory(
     """
     logger = logging.getLogger(__name__)
     logger.debug(_("Starting process: '%s'"), " ".join(command))
-    with filesystem.working_directory(working_directory):
-        completed_process = subprocess.run(  # nosec
-            command,
-            shell=False,
-            check=True,
-            capture_output=capture_output,
-            encoding=encoding,
+    start = time.perf_counter()
+    with subprocess.Popen(  # nosec
+        command,
+        shell=False,
+        stdout=subprocess.PIPE if capture_output else None,
+        stderr=subprocess.PIPE if capture_output else None,
+        encoding=encoding,
+        cwd=working_directory,
+    ) as process:
+        try:
+            stdout, stderr, usage = _communicate(process)
+        except BaseException:
+            process.kill()
+            raise
+
+    record = _record(command, process=process, start=start, usage=usage)
+    if process.returncode:
+        logger.debug(
+            _("Failed process: '%s' with return code %d."),
+            process.args,
+            process.returncode,
+            extra=record.extra(),
+        )
+        raise subprocess.CalledProcessError(
+            process.returncode,
+            process.args,
+            output=stdout,
+            stderr=stderr,
         )
 
+    completed_process = CompletedProcess(
+        process.args,
+        process.returncode,
+        stdout,
+        stderr,
+    )
     logger.debug(
         _(
             "Completed process: '%s' with return code %d."
@@ -65,5 +264,6 @@ def start_in_directory(
         completed_process.returncode,
         completed_process.stdout,
         completed_process.stderr,
+        extra=record.extra(),
     )
     return completed_process
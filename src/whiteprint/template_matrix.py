@@ -0,0 +1,321 @@
+"""Regression checks of a template over a matrix of answers."""
+
+import concurrent.futures
+import dataclasses
+import hashlib
+import importlib
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import tempfile
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Final, Literal, TypeAlias
+
+
+__all__: Final = [
+    "CheckResult",
+    "Matrix",
+    "TemplateCheck",
+    "answers_key",
+    "combinations",
+    "golden_path",
+    "render_manifest",
+    "sample",
+    "size",
+    "tree_manifest",
+]
+"""Public module attributes."""
+
+Matrix: TypeAlias = Mapping[str, Sequence[object]]
+"""The values of each question of a template."""
+
+Answers: TypeAlias = Mapping[str, object]
+"""The answers to the questions of a template."""
+
+CheckStatus: TypeAlias = Literal["ok", "changed", "new"]
+
+_KEY_LENGTH: Final = 16
+"""Number of hexadecimal digits of the key of a set of answers."""
+
+_UNHASHED_FILES: Final = frozenset({".copier-answers.yml"})
+"""Files depending on the template location and commit, not on the
+answers."""
+
+
+def size(matrix: Matrix) -> int:
+    """The number of combinations of a matrix.
+
+    Args:
+        matrix: the values of each question.
+
+    Returns:
+        The number of combinations.
+    """
+    return math.prod(len(values) for values in matrix.values())
+
+
+def combinations(matrix: Matrix) -> Iterator[dict[str, object]]:
+    """Enumerate the combinations of a matrix.
+
+    Args:
+        matrix: the values of each question.
+
+    Yields:
+        Every set of answers.
+    """
+    questions = sorted(matrix)
+    for values in itertools.product(*(matrix[key] for key in questions)):
+        yield dict(zip(questions, values, strict=True))
+
+
+def sample(
+    matrix: Matrix, count: int, *, seed: int
+) -> list[dict[str, object]]:
+    """Sample the combinations of a matrix, covering every value.
+
+    The first combinations are chosen so that every value of every question
+    is used at least once; the others are drawn at random, without
+    enumerating the matrix. The sample only depends on the matrix, the count
+    and the seed.
+
+    Args:
+        matrix: the values of each question.
+        count: the number of combinations to sample. Raised to the largest
+            number of values of a question, so that every value is covered.
+        seed: the seed of the random draws.
+
+    Returns:
+        Distinct combinations, all of them if there are at most `count`.
+    """
+    if size(matrix) <= count:
+        return list(combinations(matrix))
+
+    questions = sorted(matrix)
+    generator = random.Random(seed)  # nosec B311
+    shuffled = {
+        key: generator.sample(list(matrix[key]), len(matrix[key]))
+        for key in questions
+    }
+    chosen: dict[str, dict[str, object]] = {}
+    for index in range(max(len(values) for values in shuffled.values())):
+        answers = {
+            key: shuffled[key][index % len(shuffled[key])] for key in questions
+        }
+        chosen.setdefault(answers_key(answers), answers)
+
+    while len(chosen) < count:
+        answers = {key: generator.choice(shuffled[key]) for key in questions}
+        chosen.setdefault(answers_key(answers), answers)
+
+    return list(chosen.values())
+
+
+def answers_key(answers: Answers) -> str:
+    """The key of a set of answers.
+
+    Args:
+        answers: the answers to the questions of a template.
+
+    Returns:
+        A digest of the answers.
+    """
+    return hashlib.sha256(
+        json.dumps(answers, sort_keys=True, default=str).encode(),
+    ).hexdigest()[:_KEY_LENGTH]
+
+
+def golden_path(golden: Path, answers: Answers) -> Path:
+    """The path of the golden manifest of a set of answers.
+
+    Args:
+        golden: the directory of the golden manifests.
+        answers: the answers to the questions of a template.
+
+    Returns:
+        The path of the manifest.
+    """
+    return golden / f"{answers_key(answers)}.json"
+
+
+def tree_manifest(root: Path) -> dict[str, str]:
+    """Hash the files of a directory tree.
+
+    Args:
+        root: the root of the directory tree.
+
+    Returns:
+        The SHA-256 digest of each file (or the target of each link), by
+        relative POSIX path.
+    """
+    return {
+        path.relative_to(root).as_posix(): (
+            hashlib.sha256(str(path.readlink()).encode()).hexdigest()
+            if path.is_symlink()
+            else hashlib.sha256(path.read_bytes()).hexdigest()
+        )
+        for path in sorted(root.rglob("*"))
+        if (path.is_file() or path.is_symlink())
+        and path.name not in _UNHASHED_FILES
+    }
+
+
+def render_manifest(
+    template: str,
+    answers: Answers,
+    *,
+    vcs_ref: str | None,
+) -> dict[str, str]:
+    """Render a template in a temporary directory and hash the files.
+
+    Args:
+        template: the location of the template.
+        answers: the answers to the questions of the template.
+        vcs_ref: the VCS tag or commit of the template. If None, the latest
+            tag.
+
+    Returns:
+        The manifest of the rendered project (see `tree_manifest`).
+    """
+    with tempfile.TemporaryDirectory(prefix="whiteprint-check-") as directory:
+        importlib.import_module("copier.main").Worker(
+            src_path=template,
+            dst_path=directory,
+            vcs_ref=vcs_ref,
+            data=dict(answers),
+            defaults=True,
+            quiet=True,
+            unsafe=True,
+        ).run_copy()
+        return tree_manifest(Path(directory))
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """The comparison of a render with its golden manifest.
+
+    Attributes:
+        answers: the answers to the questions of the template.
+        status: "ok" if the render matches the golden manifest, "changed"
+            if it does not, "new" if there is no golden manifest.
+        added: the files which are not in the golden manifest.
+        removed: the files of the golden manifest which are missing.
+        modified: the files whose content changed.
+    """
+
+    answers: dict[str, object]
+    status: CheckStatus
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class TemplateCheck:
+    """Compare the renders of a template with golden manifests.
+
+    Attributes:
+        template: the location of the template.
+        vcs_ref: the VCS tag or commit of the template. If None, the latest
+            tag.
+        golden: the directory of the golden manifests.
+        update: whether to record the renders as the golden manifests.
+    """
+
+    template: str
+    vcs_ref: str | None
+    golden: Path
+    update: bool = False
+
+    def check(self, answers: dict[str, object]) -> CheckResult:
+        """Compare the render of a set of answers with its golden manifest.
+
+        Args:
+            answers: the answers to the questions of the template.
+
+        Returns:
+            The result of the comparison, before the update.
+        """
+        manifest = render_manifest(
+            self.template,
+            answers,
+            vcs_ref=self.vcs_ref,
+        )
+        path = golden_path(self.golden, answers)
+        expected: dict[str, str] | None = (
+            json.loads(path.read_text(encoding="utf-8"))["files"]
+            if path.is_file()
+            else None
+        )
+        if self.update:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                json.dumps(
+                    {"answers": answers, "files": manifest},
+                    indent=2,
+                    sort_keys=True,
+                    default=str,
+                ),
+                encoding="utf-8",
+            )
+
+        if expected is None:
+            return CheckResult(answers, "new")
+
+        added = sorted(manifest.keys() - expected.keys())
+        removed = sorted(expected.keys() - manifest.keys())
+        modified = sorted(
+            name
+            for name in manifest.keys() & expected.keys()
+            if manifest[name] != expected[name]
+        )
+        return CheckResult(
+            answers,
+            "changed" if added or removed or modified else "ok",
+            added=added,
+            removed=removed,
+            modified=modified,
+        )
+
+    def check_all(
+        self,
+        matrix: Iterable[dict[str, object]],
+        *,
+        jobs: int | None = None,
+    ) -> Iterator[CheckResult]:
+        """Compare the renders of sets of answers with their golden manifests.
+
+        The renders run in parallel processes, Jinja rendering being bound
+        by the CPU. A remote template is mirrored once beforehand (see
+        `whiteprint.cache_bundle.mirror_template`), so that every render
+        uses the same clone instead of fetching the template again.
+
+        Args:
+            matrix: the sets of answers to check.
+            jobs: the number of parallel renders. Defaults to the number of
+                CPUs.
+
+        Yields:
+            The result of each comparison, as soon as it is available.
+        """
+        cache_bundle = importlib.import_module("whiteprint.cache_bundle")
+        local = dataclasses.replace(
+            self,
+            template=str(
+                cache_bundle.mirror_template(self.template) or self.template,
+            ),
+        )
+        # Forking would copy the threads of the logging listener in a
+        # possibly locked state: spawn fresh interpreters instead.
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            futures = [
+                executor.submit(local.check, answers) for answers in matrix
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
@@ -0,0 +1,311 @@
+"""A pytest plugin to test whiteprint templates and their extensions.
+
+The plugin renders a template once per set of answers and caches the
+render on disk, across the test sessions and the xdist workers. Each test
+gets its own copy of the render, copy-on-write when the filesystem
+supports it.
+
+The plugin is registered by the `pytest11` entry point of whiteprint. The
+template is given by the `--whiteprint-template` option (or the
+`whiteprint_template` ini option), the renders are cached in the pytest
+cache directory unless the `whiteprint_cache_dir` ini option is set.
+
+Example:
+    >>> import pytest
+    >>>
+    >>> @pytest.mark.parametrize(
+    ...     "whiteprint_project",
+    ...     [{"project_name": "demo"}],
+    ...     indirect=True,
+    ... )
+    ... def test_readme(whiteprint_project):
+    ...     assert (whiteprint_project / "README.md").is_file()
+"""
+
+import hashlib
+import importlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Final, TypeAlias
+
+import pytest
+
+from whiteprint import filesystem
+from whiteprint.loc import _
+from whiteprint.version import __version__
+
+
+__all__: Final = [
+    "ProjectRenderer",
+    "template_fingerprint",
+    "whiteprint_project",
+    "whiteprint_renderer",
+]
+"""Public module attributes."""
+
+Answers: TypeAlias = Mapping[str, object]
+
+_KEY_LENGTH: Final = 32
+"""Number of hexadecimal digits of the key of a render."""
+
+_IGNORED_DIRECTORIES: Final = frozenset({".git", ".tox", "__pycache__"})
+"""Directories of a local template not taken into account in its
+fingerprint."""
+
+
+def _tree_digest(root: Path) -> str:
+    """Digest the files of a local template.
+
+    Args:
+        root: the root of the template.
+
+    Returns:
+        A digest of the path, size and modification time of the files.
+    """
+    digest = hashlib.sha256(str(root.resolve()).encode())
+    for directory, directories, files in os.walk(root):
+        directories[:] = sorted(set(directories) - _IGNORED_DIRECTORIES)
+        for name in sorted(files):
+            stat = (path := Path(directory) / name).stat()
+            digest.update(
+                f"{path.relative_to(root)}\0{stat.st_size}"
+                f"\0{stat.st_mtime_ns}\0".encode(),
+            )
+
+    return digest.hexdigest()
+
+
+def template_fingerprint(source: str, *, vcs_ref: str | None = None) -> str:
+    """Fingerprint a template, changing whenever the template changes.
+
+    The references of a template under version control are resolved to
+    their commit, so that a new release of the template (a new tag, when
+    rendering the latest tag) changes the fingerprint.
+
+    Args:
+        source: the location of the template.
+        vcs_ref: the VCS tag or commit of the template. If None, the latest
+            tag.
+
+    Returns:
+        A digest of the commits of the references of the template and, for
+        a local template, of the path, size and modification time of its
+        files.
+    """
+    root = Path(source)
+    digest = hashlib.sha256(source.encode())
+    if root.is_dir():
+        digest.update(_tree_digest(root).encode())
+
+    if not root.is_dir() or (root / ".git").exists():
+        digest.update(
+            importlib.import_module("whiteprint.cache_bundle")
+            .template_refs(source, vcs_ref=vcs_ref)
+            .encode(),
+        )
+
+    return digest.hexdigest()
+
+
+@dataclass
+class ProjectRenderer:
+    """Render projects from a template, caching the renders on disk.
+
+    The renders are keyed by the template fingerprint (resolved once per
+    renderer), the VCS reference, the answers and the version of
+    whiteprint. A render is written in a
+    temporary directory then renamed, so that concurrent sessions (e.g.
+    xdist workers) never see a partial render: the first to finish wins.
+
+    Attributes:
+        template: the location of the template (local or remote).
+        directory: the directory of the cached renders.
+        vcs_ref: the VCS tag or commit of the template to render. If None,
+            the latest tag (or the working tree of a local template).
+    """
+
+    template: str
+    directory: Path
+    vcs_ref: str | None = None
+    _fingerprint: str | None = field(default=None, init=False, repr=False)
+
+    def key(self, answers: Answers) -> str:
+        """The key of the render of a set of answers.
+
+        Args:
+            answers: the answers to the questions of the template.
+
+        Returns:
+            A digest identifying the render.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = template_fingerprint(
+                self.template,
+                vcs_ref=self.vcs_ref,
+            )
+
+        return hashlib.sha256(
+            json.dumps(
+                [__version__, self._fingerprint, self.vcs_ref, answers],
+                sort_keys=True,
+                default=str,
+            ).encode(),
+        ).hexdigest()[:_KEY_LENGTH]
+
+    def render(self, answers: Answers) -> Path:
+        """Render a project, or reuse its cached render.
+
+        The render is shared and must not be modified, see `copy`.
+
+        Args:
+            answers: the answers to the questions of the template.
+
+        Returns:
+            The path of the render.
+        """
+        if (render := self.directory / self.key(answers)).is_dir():
+            return render
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(
+            tempfile.mkdtemp(prefix=f".{render.name}.", dir=self.directory),
+        )
+        logging.getLogger(__name__).info(
+            _("Rendering %s with %s"),
+            self.template,
+            answers,
+        )
+        try:
+            importlib.import_module("copier.main").Worker(
+                src_path=self.template,
+                dst_path=staging,
+                vcs_ref=self.vcs_ref,
+                data=dict(answers),
+                defaults=True,
+                quiet=True,
+                unsafe=True,
+            ).run_copy()
+            staging.rename(render)
+        except OSError:
+            # Another session renamed its render first.
+            if not render.is_dir():
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return render
+
+    def copy(self, answers: Answers, destination: Path) -> Path:
+        """Render a project and copy it (copy-on-write when possible).
+
+        Args:
+            answers: the answers to the questions of the template.
+            destination: the path of the copy, which must not exist.
+
+        Returns:
+            The path of the copy.
+        """
+        return filesystem.copy_tree(self.render(answers), destination)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the options of the plugin.
+
+    Args:
+        parser: the parser of the pytest options.
+    """
+    group = parser.getgroup("whiteprint")
+    group.addoption(
+        "--whiteprint-template",
+        help=_("The location of the whiteprint template to render."),
+    )
+    parser.addini(
+        "whiteprint_template",
+        help=_("The location of the whiteprint template to render."),
+        default=os.environ.get(
+            "WHITEPRINT_REPOSITORY",
+            "gh:whiteprints/whiteprint.git",
+        ),
+    )
+    parser.addini(
+        "whiteprint_vcs_ref",
+        help=_("The VCS tag or commit of the template to render."),
+    )
+    parser.addini(
+        "whiteprint_cache_dir",
+        help=_(
+            "The directory of the cached renders. Defaults to the pytest"
+            " cache directory."
+        ),
+    )
+
+
+def _cache_directory(config: pytest.Config) -> Path:
+    """The directory of the cached renders.
+
+    Args:
+        config: the pytest configuration.
+
+    Returns:
+        The `whiteprint_cache_dir` ini option if set, a directory of the
+        pytest cache otherwise.
+    """
+    if cache_dir := config.getini("whiteprint_cache_dir"):
+        return Path(cache_dir)
+
+    if config.cache is None:  # pragma: no cover
+        return Path(tempfile.gettempdir()) / "whiteprint-renders"
+
+    return Path(config.cache.mkdir("whiteprint"))
+
+
+@pytest.fixture(scope="session")
+def whiteprint_renderer(request: pytest.FixtureRequest) -> ProjectRenderer:
+    """The renderer of the projects, shared by the session.
+
+    Args:
+        request: the pytest request.
+
+    Returns:
+        A renderer caching the renders on disk.
+    """
+    config = request.config
+    return ProjectRenderer(
+        template=(
+            config.getoption("whiteprint_template")
+            or config.getini("whiteprint_template")
+        ),
+        directory=_cache_directory(config),
+        vcs_ref=config.getini("whiteprint_vcs_ref") or None,
+    )
+
+
+@pytest.fixture
+def whiteprint_project(
+    request: pytest.FixtureRequest,
+    whiteprint_renderer: ProjectRenderer,
+    tmp_path: Path,
+) -> Path:
+    """A project rendered for the test, which the test may modify.
+
+    The answers are given with an indirect parametrization of the fixture,
+    the default answers of the template are used otherwise.
+
+    Args:
+        request: the pytest request.
+        whiteprint_renderer: the renderer of the projects.
+        tmp_path: the temporary directory of the test.
+
+    Returns:
+        The path of the copy of the render.
+    """
+    return whiteprint_renderer.copy(
+        getattr(request, "param", {}),
+        tmp_path / "project",
+    )
@@ -1,14 +1,23 @@
 """Git related functionalities."""
 
+import contextlib
+import copy
 import logging
-from collections.abc import Iterable
+import shutil
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
+from logging import Logger
 from pathlib import Path
-from typing import Final, cast
+from types import TracebackType
+from typing import Final, Self, cast
 
 import pygit2
 import yaml
-from github import Github
+from github import Consts, Github
 from github.Auth import (
     Token as GithubToken,
 )
@@ -16,25 +25,47 @@
     AuthenticatedUser as GithubAuthenticatedUser,
 )
 from github.GithubException import GithubException
+from github.Label import Label as GithubLabel
 from github.Organization import Organization as GithubOrganization
-from pygit2 import Oid, Signature
+from github.Repository import Repository as GithubRepository
+from pygit2 import Oid, PackBuilder, Signature
 from pygit2.repository import Repository
 from returns.maybe import Maybe
+from rich.progress import Progress, TaskID
 
+from whiteprint import console, github_cache, github_scheduler, metrics
 from whiteprint.loc import _
 
 
+if sys.version_info < (3, 12):  # pragma: nocover
+    from typing_extensions import override
+else:
+    from typing import override
+
+
 __all__: Final = [
     "HEAD",
     "INITIAL_HEAD_NAME",
+    "LABELS_MAX_WORKERS",
+    "PUSH_STALL_TIMEOUT",
     "WHITEPRINT_SIGNATURE",
+    "GithubSession",
     "add_and_commit",
+    "create_empty_github_repository",
+    "create_github_repository",
     "delete_github_repository",
+    "detach_repository",
     "git_add_all",
     "init_and_commit",
     "init_repository",
+    "labels_delta",
+    "object_store",
+    "pack_repository",
     "protect_repository",
+    "push_repository",
     "setup_github_repository",
+    "share_objects",
+    "sync_labels",
 ]
 """Public module attributes."""
 
@@ -55,10 +86,43 @@
 """
 
 
+LABELS_MAX_WORKERS: Final = 4
+"""Default number of concurrent label requests.
+
+Kept low so that the label synchronisation does not trigger GitHub's
+secondary rate limits.
+"""
+
+_ORGANIZATIONS_PER_PAGE: Final = 100
+"""The maximum number of organizations listed in a single request."""
+
+PUSH_STALL_TIMEOUT: Final = 120.0
+"""Default number of seconds without push progress before aborting."""
+
+
 class FailedAuthenticationError(RuntimeError):
     """Authentication failed."""
 
 
+@dataclass
+class PushStalledError(RuntimeError):
+    """The push made no progress for too long.
+
+    Attributes:
+        stall_timeout: the number of seconds without progress.
+    """
+
+    stall_timeout: float
+
+    def __post_init__(self) -> None:
+        """Initialize the exception."""
+        super().__init__(
+            _("The push made no progress for {} seconds.").format(
+                self.stall_timeout,
+            ),
+        )
+
+
 @dataclass(frozen=True)
 class GithubUser:
     """A Github user.
@@ -88,24 +152,58 @@ class CommitData:
     committer: Signature = field(default_factory=lambda: WHITEPRINT_SIGNATURE)
 
 
-def init_repository(destination: Path) -> Repository:
+_ALTERNATES: Final = Path("objects") / "info" / "alternates"
+"""Path of the alternates file, relative to the Git directory."""
+
+
+def object_store(path: Path) -> Repository:
+    """Run git init --bare if needed.
+
+    The bare repository is used as a shared object store: the repositories
+    created with this store as alternate only write the objects it does not
+    already contain.
+
+    Args:
+        path: the path of the shared object store.
+
+    Returns:
+        the bare repository holding the shared objects.
+    """
+    return cast("Repository", pygit2.init_repository(path, bare=True))
+
+
+def init_repository(
+    destination: Path,
+    *,
+    shared_objects: Path | None = None,
+) -> Repository:
     """Run git init.
 
     The default branch is named "main".
 
     Args:
         destination: the path of the Git repository.
+        shared_objects: an optional path to a shared object store used as
+            alternate object database by the repository.
 
     Returns:
         an empty Git repository.
     """
-    return cast(
-        Repository,
+    repo = cast(
+        "Repository",
         pygit2.init_repository(
             destination,
             initial_head=INITIAL_HEAD_NAME,
         ),
     )
+    if shared_objects is not None:
+        store_objects = Path(object_store(shared_objects).path) / "objects"
+        alternates = Path(repo.path) / _ALTERNATES
+        alternates.parent.mkdir(parents=True, exist_ok=True)
+        alternates.write_text(f"{store_objects}\n", encoding="utf-8")
+        repo.odb.add_disk_alternate(str(store_objects))
+
+    return repo
 
 
 def git_add_all(repo: Repository) -> Oid:
@@ -154,17 +252,20 @@ def init_and_commit(
     destination: Path,
     *,
     commit_data: CommitData,
+    shared_objects: Path | None = None,
 ) -> Repository:
     """Run git init && git commmit -m `message`.
 
     Args:
         destination: the path of the Git repository.
         commit_data: the commit data.
+        shared_objects: an optional path to a shared object store used as
+            alternate object database by the repository.
 
     Returns:
         a Git repository.
     """
-    repo = init_repository(destination)
+    repo = init_repository(destination, shared_objects=shared_objects)
     add_and_commit(
         repo,
         commit_data=commit_data,
@@ -175,168 +276,1035 @@ def init_and_commit(
     return repo
 
 
-def _find_entity(
-    authenticated_user: GithubAuthenticatedUser,
+def pack_repository(repo: Repository) -> int:
+    """Run git repack -a -d.
+
+    Write all the objects of the repository in a single packfile with the
+    libgit2 packbuilder, then remove the loose objects.
+
+    Args:
+        repo: a Git repository.
+
+    Returns:
+        the number of objects written to the packfile.
+    """
+    written_objects = repo.pack()
+
+    objects_directory = Path(repo.path) / "objects"
+    _prune_loose_objects(objects_directory)
+    logging.getLogger(__name__).debug(
+        _("Packed %d objects in %s"),
+        written_objects,
+        objects_directory,
+    )
+    return written_objects
+
+
+def _prune_loose_objects(objects_directory: Path) -> None:
+    """Remove the loose objects of an object database.
+
+    Args:
+        objects_directory: the path of the object database.
+    """
+    for fan_out_directory in objects_directory.glob("[0-9a-f][0-9a-f]"):
+        for loose_object in fan_out_directory.iterdir():
+            loose_object.unlink()
+
+        fan_out_directory.rmdir()
+
+
+def share_objects(repo: Repository, *, shared_objects: Path) -> int:
+    """Move the loose objects of a repository to a shared object store.
+
+    The objects are moved rather than copied, so that sharing them does not
+    write any file when the store lives on the same filesystem. The
+    repository must use the store as alternate (see `init_repository`).
+
+    Args:
+        repo: a Git repository.
+        shared_objects: the path of the shared object store.
+
+    Returns:
+        the number of objects added to the shared object store.
+    """
+    objects_directory = Path(repo.path) / "objects"
+    store_objects = Path(object_store(shared_objects).path) / "objects"
+    shared = 0
+    for loose_object in objects_directory.glob("[0-9a-f][0-9a-f]/*"):
+        target = store_objects / loose_object.parent.name / loose_object.name
+        if not target.exists():
+            target.parent.mkdir(exist_ok=True)
+            shutil.move(loose_object, target)
+            shared += 1
+
+    _prune_loose_objects(objects_directory)
+    logging.getLogger(__name__).debug(
+        _("Shared %d new objects in %s"),
+        shared,
+        store_objects,
+    )
+    return shared
+
+
+def detach_repository(repo: Repository) -> int:
+    """Run git repack -a -d and drop the alternates.
+
+    The objects reachable from the references of the repository are written
+    in a single packfile, after what the repository no longer depends on the
+    shared object store.
+
+    Args:
+        repo: a Git repository using a shared object store.
+
+    Returns:
+        the number of objects written to the packfile.
+    """
+
+    def _add_reachable_objects(pack_builder: PackBuilder) -> None:
+        for reference in repo.references.objects:
+            for commit in repo.walk(reference.resolve().target):
+                pack_builder.add_recur(commit.id)
+
+    written_objects = repo.pack(pack_delegate=_add_reachable_objects)
+
+    (Path(repo.path) / _ALTERNATES).unlink(missing_ok=True)
+    _prune_loose_objects(Path(repo.path) / "objects")
+    return written_objects
+
+
+class _SessionCaches:
+    """The lookups of a GitHub session, shared by its views.
+
+    Attributes:
+        lock: the lock guarding the lookups.
+        authenticated_user: the authenticated user, once looked up.
+        entities: the organizations and users, by login.
+        organizations: the organizations of the user, once listed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the lookups, none being made yet."""
+        self.lock = threading.Lock()
+        self.authenticated_user: GithubAuthenticatedUser | None = None
+        self.entities: dict[
+            str,
+            GithubAuthenticatedUser | GithubOrganization,
+        ] = {}
+        self.organizations: github_cache.OrganizationsEntry | None = None
+
+
+class GithubSession:
+    """A GitHub session shared by all the steps interacting with GitHub.
+
+    A single client is used, so that the HTTP connections are kept alive
+    and pooled, and the authenticated user and the entities (user or
+    organization) are looked up once per session.
+
+    The organizations of the user, which tell whether a login is an
+    organization, can also be cached on disk between sessions. Once the
+    cache expires, it is revalidated with a conditional request, which does
+    not count against the rate limit when the organizations did not change.
+
+    Every request of the session goes through a rate-limit aware scheduler
+    (see `whiteprint.github_scheduler`), which replaces the fixed throttling
+    of the GitHub client.
+
+    Attributes:
+        github_user: the Github user of the session.
+        github: the GitHub client.
+        scheduler: the scheduler of the GitHub requests.
+    """
+
+    def __init__(
+        self,
+        github_user: GithubUser,
+        *,
+        base_url: str = Consts.DEFAULT_BASE_URL,
+        retry: int = 3,
+        pool_size: int = LABELS_MAX_WORKERS,
+        cache_directory: Path | None = None,
+    ) -> None:
+        """Initialize the session.
+
+        Args:
+            github_user: a Github user.
+            base_url: the URL of the GitHub API.
+            retry: number of retries of the GitHub requests failing on a
+                connection or a server error. The rate limited requests are
+                retried by the scheduler only.
+            pool_size: the number of HTTP connections kept alive.
+            cache_directory: the directory of the on-disk cache of the
+                organizations. If None, the organizations are not cached
+                between sessions.
+        """
+        self.github_user = github_user
+        self.github = Github(
+            auth=github_user.token,
+            base_url=base_url,
+            retry=github_scheduler.transport_retry(retry),
+            pool_size=pool_size,
+            seconds_between_requests=None,
+            seconds_between_writes=None,
+        )
+        self.scheduler = github_scheduler.GithubScheduler(
+            self.github.requester,
+        )
+        self._caches = _SessionCaches()
+        self._cache = (
+            None
+            if cache_directory is None
+            else github_cache.EntityCache(
+                cache_directory,
+                github_cache.token_fingerprint(
+                    github_user.token.token,
+                    base_url=base_url,
+                ),
+            )
+        )
+
+    def __enter__(self) -> Self:
+        """Enter the session context.
+
+        Returns:
+            The session.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the HTTP connections of the session.
+
+        Args:
+            exc_type: unused.
+            exc_value: unused.
+            traceback: unused.
+        """
+        self.github.close()
+
+    @property
+    def authenticated_user(self) -> GithubAuthenticatedUser:
+        """The authenticated user, looked up once per session.
+
+        Raises:
+            FailedAuthenticationError: the autentication to GitHub failed.
+        """
+        with self._caches.lock:
+            if self._caches.authenticated_user is None:
+                # The user is lazy: it is fetched by the scheduled requests
+                # reading its attributes, not here.
+                # We ignore covering the case of a failed authentication
+                # **yet** as it is difficult to test for little benefits.
+                if not isinstance(
+                    authenticated_user := self.github.get_user(),
+                    GithubAuthenticatedUser,
+                ):  # pragma: no cover
+                    raise FailedAuthenticationError
+
+                self._caches.authenticated_user = authenticated_user
+
+            return self._caches.authenticated_user
+
+    def entity(
+        self,
+        login: str | None = None,
+    ) -> GithubAuthenticatedUser | GithubOrganization:
+        """Find an organization or user, looked up once per session.
+
+        Args:
+            login: the GitHub login name of the user or the organization. If
+                None, use the login of the session's Github user.
+
+        Returns:
+            The organization or user depending on the login name.
+        """
+        login = Maybe.from_optional(login).value_or(self.github_user.login)
+        authenticated_user = self.authenticated_user
+        with self._caches.lock:
+            if login not in self._caches.entities:
+                self._caches.entities[login] = (
+                    self.scheduler.submit(
+                        lambda: self.github.get_organization(login),
+                    )
+                    if self._organizations_entry().kind(login)
+                    == "organization"
+                    else authenticated_user
+                )
+
+            return self._caches.entities[login]
+
+    def with_login(self, login: str) -> Self:
+        """A view of the session acting on behalf of another login.
+
+        The view shares the client, the scheduler and the lookups of the
+        session (held by a single `_SessionCaches`, including the lookups
+        made after the view is created), so that several owners can be
+        served by a single session.
+        Only the session itself must be used as a context manager.
+
+        Args:
+            login: the GitHub login name of the user or the organization.
+
+        Returns:
+            A session whose Github user has the given login.
+        """
+        view = copy.copy(self)
+        view.github_user = GithubUser(
+            login=login,
+            token=self.github_user.token,
+        )
+        return view
+
+    def _organizations_entry(self) -> github_cache.OrganizationsEntry:
+        """The organizations of the user, from the cache if still valid.
+
+        Returns:
+            The organizations of the user.
+        """
+        if self._caches.organizations is None:
+            cached = None if self._cache is None else self._cache.load()
+            if cached is not None and not cached.expired:
+                metrics.CACHE_HITS["github"] += 1
+                self._caches.organizations = cached
+            else:
+                metrics.CACHE_MISSES["github"] += 1
+                self._caches.organizations = self._fetch_organizations(cached)
+
+        return self._caches.organizations
+
+    def _fetch_organizations(
+        self,
+        cached: github_cache.OrganizationsEntry | None,
+    ) -> github_cache.OrganizationsEntry:
+        """List the organizations of the user and cache them.
+
+        Args:
+            cached: the expired cache entry, if any, revalidated with its
+                ETag.
+
+        Returns:
+            The organizations of the user.
+        """
+        headers, data = self.scheduler.submit(
+            lambda: self.github.requester.requestJsonAndCheck(
+                "GET",
+                "/user/orgs",
+                parameters={"per_page": _ORGANIZATIONS_PER_PAGE},
+                headers=Maybe.from_optional(cached)
+                .bind_optional(lambda entry: entry.etag)
+                .map(lambda etag: {"If-None-Match": etag})
+                .value_or({}),
+            ),
+        )
+        # A 304 (Not Modified) response has no body.
+        if data is None and cached is not None:
+            organizations = cached.organizations
+        elif 'rel="next"' in headers.get("link", ""):
+            organizations = self.scheduler.submit(
+                lambda: [
+                    organization.login
+                    for organization in self.github.get_user().get_orgs()
+                ],
+            )
+        else:
+            organizations = [organization["login"] for organization in data]
+
+        if self._cache is None:
+            return github_cache.OrganizationsEntry(organizations)
+
+        return self._cache.store(organizations, etag=headers.get("etag"))
+
+
+def create_empty_github_repository(
+    repo: Repository,
     *,
-    login: str,
-) -> GithubAuthenticatedUser | GithubOrganization:
-    """Find and return an organization or user from the GitHub loging name.
+    project_slug: str,
+    session: GithubSession,
+) -> GithubRepository:
+    """Create a repository on GitHub and set it as the origin.
 
     Args:
-        authenticated_user: an authenticated GitHub user.
-        login: the GitHub login name of the user or the organization
-            login.
+        repo: the local repository.
+        project_slug: a slug of the project name.
+        session: a GitHub session.
 
     Returns:
-        THe organization or user depending on the loging name.
+        The GitHub repository.
     """
-    organizations = [
-        organization
-        for organization in authenticated_user.get_orgs()
-        if organization.login == login
-    ]
-    return organizations[0] if len(organizations) == 1 else authenticated_user
+    # The entity is looked up beforehand, so that the mutation only sends
+    # the creation request.
+    entity = session.entity()
+    github_repository = session.scheduler.submit(
+        lambda: entity.create_repo(project_slug),
+        write=True,
+    )
+
+    repo.remotes.set_url(
+        "origin",
+        github_repository.clone_url,
+    )
+    repo.remotes.add_fetch("origin", "+refs/heads/*:refs/remotes/origin/*")
+    return github_repository
+
+
+def create_github_repository(
+    repo: Repository,
+    *,
+    project_slug: str,
+    session: GithubSession,
+    labels: Path,
+) -> GithubRepository:
+    """Create a repository on GitHub, without pushing the local one.
+
+    The GitHub repository is set as the origin of the local one and its
+    labels are synchronised.
+
+    Args:
+        repo: the local repository.
+        project_slug: a slug of the project name.
+        session: a GitHub session.
+        labels: a path to a yaml file containing a list of labels with their
+            descriptions.
+
+    Returns:
+        The GitHub repository.
+    """
+    github_repository = create_empty_github_repository(
+        repo,
+        project_slug=project_slug,
+        session=session,
+    )
+    sync_labels(
+        github_repository,
+        labels=labels,
+        scheduler=session.scheduler,
+    )
+    return github_repository
 
 
 def setup_github_repository(
     repo: Repository,
     *,
     project_slug: str,
-    github_user: GithubUser,
+    session: GithubSession,
     labels: Path,
-    retry: int = 3,
+    stall_timeout: float = PUSH_STALL_TIMEOUT,
 ) -> None:
     """Create a repository on GitHub and push the local one.
 
     Args:
         repo: the local repository.
         project_slug: a slug of the project name.
-        github_user: a Github user.
+        session: a GitHub session.
         labels: a path to a yaml file containing a list of labels with their
             descriptions.
-        retry: number of retries to obtain the Github user.
+        stall_timeout: the number of seconds without progress before
+            aborting the push.
+    """
+    create_github_repository(
+        repo,
+        project_slug=project_slug,
+        session=session,
+        labels=labels,
+    )
+    push_repository(
+        repo,
+        github_user=session.github_user,
+        stall_timeout=stall_timeout,
+    )
+
+
+Label = dict[str, str]
+"""A label as described in a labels file (name, color and description)."""
 
-    Raises:
-        FailedAuthenticationError: the autentication to GitHub failed.
+
+@dataclass(frozen=True)
+class LabelsDelta:
+    """The changes bringing the labels of a repository to the wanted ones.
+
+    Attributes:
+        create: the labels to create.
+        update: the existing labels to edit, with their wanted values.
+        delete: the existing labels to delete.
     """
-    # We ignore covering the case of a failed authentication **yet** as it is
-    # difficult to test for little benefits.
-    with Github(auth=github_user.token, retry=retry) as github:
-        if not isinstance(
-            authenticated_user := github.get_user(),
-            GithubAuthenticatedUser,
-        ):  # pragma: no cover
-            raise FailedAuthenticationError
-
-        github_repository = _find_entity(
-            authenticated_user,
-            login=github_user.login,
-        ).create_repo(project_slug)
-
-        repo.remotes.set_url(
-            "origin",
-            github_repository.clone_url,
+
+    create: list[Label] = field(default_factory=list)
+    update: list[tuple[GithubLabel, Label]] = field(default_factory=list)
+    delete: list[GithubLabel] = field(default_factory=list)
+
+
+def _label_differs(existing: GithubLabel, wanted: Label) -> bool:
+    """Check whether an existing label differs from the wanted one.
+
+    Args:
+        existing: the existing label.
+        wanted: the wanted label.
+
+    Returns:
+        True if the label must be edited.
+    """
+    return (
+        existing.name,
+        existing.color.lower(),
+        existing.description or "",
+    ) != (
+        wanted["name"],
+        wanted["color"].lower(),
+        wanted.get("description") or "",
+    )
+
+
+def labels_delta(
+    existing: Iterable[GithubLabel],
+    wanted: Iterable[Label],
+) -> LabelsDelta:
+    """Compute the changes bringing existing labels to the wanted ones.
+
+    Label names are compared case-insensitively, like GitHub does.
+
+    Args:
+        existing: the labels of the repository.
+        wanted: the wanted labels.
+
+    Returns:
+        The labels to create, update and delete.
+    """
+    existing_labels = {label.name.casefold(): label for label in existing}
+    wanted_labels = {label["name"].casefold(): label for label in wanted}
+    return LabelsDelta(
+        create=[
+            label
+            for name, label in wanted_labels.items()
+            if name not in existing_labels
+        ],
+        update=[
+            (existing_labels[name], label)
+            for name, label in wanted_labels.items()
+            if name in existing_labels
+            and _label_differs(existing_labels[name], label)
+        ],
+        delete=[
+            label
+            for name, label in existing_labels.items()
+            if name not in wanted_labels
+        ],
+    )
+
+
+def _label_requests(
+    github_repository: GithubRepository,
+    delta: LabelsDelta,
+) -> list[Callable[[], object]]:
+    """List the requests applying a labels delta.
+
+    Args:
+        github_repository: the GitHub repository.
+        delta: the labels delta to apply.
+
+    Returns:
+        A list of functions, each sending one request.
+    """
+    return [
+        *(
+            lambda label=label: github_repository.create_label(**label)
+            for label in delta.create
+        ),
+        *(
+            lambda label=label, wanted=wanted: label.edit(**wanted)
+            for label, wanted in delta.update
+        ),
+        *(label.delete for label in delta.delete),
+    ]
+
+
+def _try_request(
+    request: Callable[[], object],
+    *,
+    scheduler: github_scheduler.GithubScheduler,
+    logger: Logger,
+) -> None:
+    """Send a GitHub mutation request, logging its failure.
+
+    Args:
+        request: a function sending the request.
+        scheduler: the scheduler of the request.
+        logger: a logger instance.
+    """
+    try:
+        scheduler.submit(request, write=True)
+    except GithubException as github_exception:
+        logger.debug(github_exception)
+
+
+def sync_labels(
+    github_repository: GithubRepository,
+    *,
+    labels: Path,
+    scheduler: github_scheduler.GithubScheduler,
+    max_workers: int = LABELS_MAX_WORKERS,
+) -> LabelsDelta:
+    """Synchronise the labels of a GitHub repository with a labels file.
+
+    The existing labels are fetched once, then only the labels to create,
+    edit or delete are sent, on a bounded thread pool. A failed request is
+    logged and does not prevent the others to be sent.
+
+    Args:
+        github_repository: the GitHub repository.
+        labels: a path to a yaml file containing a list of labels with their
+            descriptions.
+        scheduler: the scheduler of the GitHub requests. It spaces the
+            mutations, so the pool mostly overlaps their network latency.
+        max_workers: the maximum number of concurrent requests.
+
+    Returns:
+        The labels delta applied.
+    """
+    logger = logging.getLogger(__name__)
+    with metrics.step("labels") as record:
+        delta = labels_delta(
+            scheduler.submit(lambda: list(github_repository.get_labels())),
+            yaml.safe_load(labels.read_text()),
         )
-        repo.remotes.add_fetch("origin", "+refs/heads/*:refs/remotes/origin/*")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for future in as_completed(
+                executor.submit(
+                    _try_request,
+                    request,
+                    scheduler=scheduler,
+                    logger=logger,
+                )
+                for request in _label_requests(github_repository, delta)
+            ):
+                future.result()
 
-        logger = logging.getLogger(__name__)
-        for label in yaml.safe_load(labels.read_text()):
-            try:
-                github_repository.create_label(**label)
-                continue
-            except GithubException as github_exception:
-                logger.debug(github_exception)
+        record.details["created"] = len(delta.create)
+        record.details["updated"] = len(delta.update)
+        record.details["deleted"] = len(delta.delete)
 
-    logger.debug(_("Pushing ref %s"), repo.head.target)
-    repo.remotes["origin"].push(
-        [f"refs/heads/{INITIAL_HEAD_NAME}"],
-        callbacks=pygit2.callbacks.RemoteCallbacks(
+    return delta
+
+
+class _PushCallbacks(pygit2.RemoteCallbacks):
+    """Remote callbacks reporting the transfer progress.
+
+    The progress is displayed on the standard error and the push is aborted
+    when no progress is reported for `stall_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        github_user: GithubUser,
+        progress: Progress,
+        stall_timeout: float,
+    ) -> None:
+        """Initialize the callbacks.
+
+        Args:
+            github_user: a Github user.
+            progress: the progress display.
+            stall_timeout: the number of seconds without progress before
+                aborting the push.
+        """
+        super().__init__(
             credentials=pygit2.UserPass(
                 "x-access-token",
                 github_user.token.token,
             ),
-        ),
-    )
+        )
+        self.progress = progress
+        self.task: TaskID = progress.add_task(_("Pushing"), total=None)
+        self.stall_timeout = stall_timeout
+        self.start = self.last_progress = time.monotonic()
+        self.objects = 0
+        self.transferred_bytes = 0
 
+    def _update(
+        self,
+        *,
+        objects: int,
+        transferred: int,
+        total: int | None = None,
+    ) -> None:
+        """Update the progress and abort if the push is stalled.
 
-def protect_repository(
+        Args:
+            objects: the number of objects transferred.
+            transferred: the number of bytes transferred.
+            total: the total number of objects to transfer, if known.
+
+        Raises:
+            PushStalledError: no progress since `stall_timeout` seconds.
+        """
+        now = time.monotonic()
+        if (objects, transferred) != (self.objects, self.transferred_bytes):
+            self.objects, self.transferred_bytes = objects, transferred
+            self.last_progress = now
+        elif now - self.last_progress > self.stall_timeout:
+            raise PushStalledError(self.stall_timeout)
+
+        self.progress.update(self.task, completed=objects, total=total)
+
+    @property
+    def throughput(self) -> float:
+        """The average throughput of the transfer in bytes per second."""
+        return self.transferred_bytes / max(
+            time.monotonic() - self.start,
+            time.get_clock_info("monotonic").resolution,
+        )
+
+    @override
+    def transfer_progress(
+        self, stats: pygit2.remotes.TransferProgress
+    ) -> None:
+        """Report the progress of the objects received.
+
+        Args:
+            stats: the transfer statistics.
+        """
+        self._update(
+            objects=stats.received_objects,
+            total=stats.total_objects,
+            transferred=stats.received_bytes,
+        )
+
+    @override
+    def push_transfer_progress(
+        self,
+        objects_pushed: int,
+        total_objects: int,
+        bytes_pushed: int,
+    ) -> None:
+        """Report the progress of the objects pushed.
+
+        Args:
+            objects_pushed: the number of objects pushed.
+            total_objects: the total number of objects to push.
+            bytes_pushed: the number of bytes pushed.
+        """
+        self._update(
+            objects=objects_pushed,
+            total=total_objects,
+            transferred=bytes_pushed,
+        )
+
+    @override
+    def sideband_progress(self, string: str) -> None:
+        """Check for stalls when the remote reports its progress.
+
+        Args:
+            string: the progress message sent by the remote.
+        """
+        self._update(
+            objects=self.objects,
+            transferred=self.transferred_bytes,
+        )
+
+
+class _SharedProgress:
+    """A progress display shared by the concurrent pushes.
+
+    Rich allows a single live display at once, so the pushes running in
+    parallel add their task to the same display, which is started by the
+    first push and stopped by the last one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the shared progress display."""
+        self._lock = threading.Lock()
+        self._users = 0
+        self._progress = Progress(console=console.STDERR, transient=True)
+
+    def __enter__(self) -> Progress:
+        """Start the display if needed.
+
+        Returns:
+            The progress display.
+        """
+        with self._lock:
+            if self._users == 0:
+                self._progress = Progress(
+                    console=console.STDERR,
+                    transient=True,
+                )
+                self._progress.start()
+
+            self._users += 1
+            return self._progress
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the display once no push uses it.
+
+        Args:
+            exc_type: unused.
+            exc_value: unused.
+            traceback: unused.
+        """
+        with self._lock:
+            self._users -= 1
+            if self._users == 0:
+                self._progress.stop()
+
+
+_PUSH_PROGRESS: Final = _SharedProgress()
+"""The progress display of the pushes."""
+
+
+class _SharedServerTimeout:
+    """The libgit2 server timeout shared by the concurrent pushes.
+
+    The timeout is a setting of the whole process: it is set by the first
+    push and the previous value is restored by the last one, so that the
+    other network operations do not inherit the push stall timeout.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the shared server timeout."""
+        self._lock = threading.Lock()
+        self._users = 0
+        self._previous = 0
+
+    @contextlib.contextmanager
+    def apply(self, stall_timeout: float) -> Iterator[None]:
+        """Set the server timeout during a push.
+
+        Args:
+            stall_timeout: the number of seconds without server response
+                before aborting.
+
+        Yields:
+            Nothing, the previous timeout being restored by the last push.
+        """
+        with self._lock:
+            if self._users == 0:
+                self._previous = pygit2.option(
+                    pygit2.enums.Option.GET_SERVER_TIMEOUT,
+                )
+
+            pygit2.option(
+                pygit2.enums.Option.SET_SERVER_TIMEOUT,
+                int(stall_timeout * 1000),
+            )
+            self._users += 1
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._users -= 1
+                if self._users == 0:
+                    pygit2.option(
+                        pygit2.enums.Option.SET_SERVER_TIMEOUT,
+                        self._previous,
+                    )
+
+
+_PUSH_SERVER_TIMEOUT: Final = _SharedServerTimeout()
+"""The libgit2 server timeout of the pushes."""
+
+
+def push_repository(
     repo: Repository,
     *,
-    project_slug: str,
     github_user: GithubUser,
-    https_origin: bool,
-    retry: int = 3,
+    stall_timeout: float = PUSH_STALL_TIMEOUT,
 ) -> None:
-    """Protect a Github repository.
+    """Push the default branch to the origin.
+
+    The progress is displayed on the standard error, and the number of
+    objects, bytes and the throughput are logged and recorded in the step
+    metrics.
 
     Args:
         repo: the local repository.
-        project_slug: a slug of the project name (Repository to delete).
         github_user: a Github user.
-        https_origin: force the origin to be an HTTPS URL.
-        retry: number of retries to obtain the Github user.
-
-    Raises:
-        FailedAuthenticationError: the autentication to GitHub failed.
+        stall_timeout: the number of seconds without progress before
+            aborting the push. It is also used as libgit2 server timeout so
+            that a silent connection is aborted as well.
     """
-    # We ignore covering the case of a failed authentication **yet** as it is
-    # difficult to test for little benefits.
-    with Github(auth=github_user.token, retry=retry) as github:
-        authenticated_user = github.get_user()
-        if not isinstance(
-            authenticated_user := github.get_user(),
-            GithubAuthenticatedUser,
-        ):  # pragma: no cover
-            raise FailedAuthenticationError
-
-        github_repository = _find_entity(
-            authenticated_user,
-            login=github_user.login,
-        ).get_repo(
-            project_slug,
+    logger = logging.getLogger(__name__)
+    logger.debug(_("Pushing ref %s"), repo.head.target)
+    with (
+        metrics.step("push") as record,
+        _PUSH_PROGRESS as progress,
+        _PUSH_SERVER_TIMEOUT.apply(stall_timeout),
+    ):
+        callbacks = _PushCallbacks(
+            github_user=github_user,
+            progress=progress,
+            stall_timeout=stall_timeout,
         )
+        try:
+            repo.remotes["origin"].push(
+                [f"refs/heads/{INITIAL_HEAD_NAME}"],
+                callbacks=callbacks,
+            )
+        finally:
+            progress.remove_task(callbacks.task)
+
+        record.details["objects"] = callbacks.objects
+        record.details["pushed_bytes"] = callbacks.transferred_bytes
+        record.details["throughput_bytes_per_second"] = callbacks.throughput
+
+    logger.info(
+        _("Pushed %d objects (%d bytes) at %.0f bytes/s"),
+        callbacks.objects,
+        callbacks.transferred_bytes,
+        callbacks.throughput,
+    )
+
+
+_PROTECTION_MUTATION: Final = """
+mutation($input: CreateBranchProtectionRuleInput!) {
+  createBranchProtectionRule(input: $input) {
+    branchProtectionRule { id }
+  }
+}
+"""
+"""GraphQL mutation creating a branch protection rule."""
+
+
+def _protect_with_graphql(
+    github_repository: GithubRepository,
+    *,
+    scheduler: github_scheduler.GithubScheduler,
+) -> None:
+    """Protect the default branch with a single GraphQL mutation.
+
+    Args:
+        github_repository: the GitHub repository.
+        scheduler: the scheduler of the GitHub requests.
+    """
+    scheduler.submit(
+        lambda: github_repository.requester.graphql_query(
+            _PROTECTION_MUTATION,
+            {
+                "input": {
+                    "repositoryId": github_repository.node_id,
+                    "pattern": INITIAL_HEAD_NAME,
+                    "isAdminEnforced": True,
+                    "lockBranch": True,
+                    "requiresApprovingReviews": True,
+                    "requiresCodeOwnerReviews": True,
+                    "requiresStatusChecks": True,
+                    "requiresStrictStatusChecks": True,
+                },
+            },
+        ),
+        write=True,
+    )
+
+
+def _protect_with_rest(
+    github_repository: GithubRepository,
+    *,
+    scheduler: github_scheduler.GithubScheduler,
+) -> None:
+    """Protect the default branch with sequential REST requests.
 
-        branch = github_repository.get_branch(INITIAL_HEAD_NAME)
-        branch.edit_protection(
+    Args:
+        github_repository: the GitHub repository.
+        scheduler: the scheduler of the GitHub requests.
+    """
+    branch = scheduler.submit(
+        lambda: github_repository.get_branch(INITIAL_HEAD_NAME),
+    )
+    scheduler.submit(
+        lambda: branch.edit_protection(
             strict=True,
             enforce_admins=True,
             lock_branch=True,
-        )
-        branch.edit_required_pull_request_reviews(
+        ),
+        write=True,
+    )
+    scheduler.submit(
+        lambda: branch.edit_required_pull_request_reviews(
             require_code_owner_reviews=True,
+        ),
+        write=True,
+    )
+    scheduler.submit(
+        lambda: branch.edit_required_status_checks(strict=True),
+        write=True,
+    )
+
+
+def protect_repository(
+    repo: Repository,
+    *,
+    project_slug: str,
+    session: GithubSession,
+    https_origin: bool,
+) -> None:
+    """Protect a Github repository.
+
+    The protection rule of the default branch is applied with a single
+    GraphQL request. If the GraphQL API is not available (e.g. on some
+    GitHub Enterprise Server instances) or rejects the mutation, the REST
+    API is used instead.
+
+    Args:
+        repo: the local repository.
+        project_slug: a slug of the project name (Repository to protect).
+        session: a GitHub session.
+        https_origin: force the origin to be an HTTPS URL.
+    """
+    github_repository = session.scheduler.submit(
+        lambda: session.entity().get_repo(project_slug),
+    )
+
+    try:
+        _protect_with_graphql(github_repository, scheduler=session.scheduler)
+    except GithubException as github_exception:
+        logging.getLogger(__name__).debug(
+            _("GraphQL branch protection failed, using REST: %s"),
+            github_exception,
         )
-        branch.edit_required_status_checks(strict=True)
+        _protect_with_rest(github_repository, scheduler=session.scheduler)
 
-        # We do not test coverage here as it is too complex for little gains
-        # (e.g. it requires the creation of an SSH key for the test session).
-        if not https_origin:  # pragma: no cover
-            repo.remotes.set_url("origin", github_repository.ssh_url)
+    # We do not test coverage here as it is too complex for little gains
+    # (e.g. it requires the creation of an SSH key for the test session).
+    if not https_origin:  # pragma: no cover
+        repo.remotes.set_url("origin", github_repository.ssh_url)
 
 
 def delete_github_repository(
     project_slug: str,
     *,
-    token: GithubToken,
-    retry: int = 3,
+    session: GithubSession,
+    owner: str | None = None,
 ) -> None:
     """Delete a GitHub repository.
 
+    The deletion is submitted to the scheduler of the session.
+
     Args:
         project_slug: a slug of the project name (Repository to delete).
-        token: a GitHub token with repository writing authorization.
-        retry: number of retries to obtain the Github user.
+        session: a GitHub session with repository writing authorization.
+        owner: the GitHub login name of the user or the organization owning
+            the repository. If None, the login of the session's GitHub user.
     """
-    with Github(auth=token, retry=retry) as github:
-        github_user = github.get_user()
+    full_name = (
+        Maybe.from_optional(owner).value_or(session.github_user.login)
+        + f"/{project_slug}"
+    )
 
-        # We ignore covering the case of a failed repository creation **yet**
-        # as it is difficult to test for little benefits.
-        try:
-            github_repository = github_user.get_repo(
-                project_slug,
-            )
-        except GithubException as github_exception:  # pragma: no cover
-            logger = logging.getLogger(__name__)
-            logger.debug(github_exception)
-        else:
-            github_repository.delete()
+    # We ignore covering the case of a failed repository creation **yet**
+    # as it is difficult to test for little benefits.
+    try:
+        github_repository = session.scheduler.submit(
+            lambda: session.github.get_repo(full_name),
+        )
+    except GithubException as github_exception:  # pragma: no cover
+        logging.getLogger(__name__).debug(github_exception)
+    else:
+        session.scheduler.submit(github_repository.delete, write=True)
@@ -2,13 +2,18 @@
 
 import pathlib
 import platform
+from collections.abc import Iterator
 
+import platformdirs
 import pygit2
 import pytest
 from beartype import beartype
 from beartype.typing import List, TypedDict
 from click import testing
 
+from tests import github_api as github_api_stand_in
+from whiteprint import metrics
+
 
 @pytest.fixture
 @beartype
@@ -81,3 +86,47 @@ def autocomplete_dir_yaml(tmp_path: pathlib.Path) -> YAMLAutocomplete:
         (autocomplete["path"] / file).touch()
 
     return autocomplete
+
+
+@pytest.fixture
+def github_api() -> Iterator[github_api_stand_in.GithubAPI]:
+    """Serve a local stand-in for the GitHub API.
+
+    Yields:
+        The state of the stand-in, whose `base_url` is the API URL.
+    """
+    yield from github_api_stand_in.serve()
+
+
+@pytest.fixture(autouse=True)
+def user_data_dir(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> pathlib.Path:
+    """Keep the user data directory (e.g. the run history) out of the tests.
+
+    Args:
+        tmp_path: a temporary directory used as user data directory.
+        monkeypatch: the pytest monkeypatch fixture.
+
+    Returns:
+        The user data directory of the tests.
+    """
+    data_dir = tmp_path / "data"
+    monkeypatch.setattr(
+        platformdirs,
+        "user_data_dir",
+        lambda *_args, **_kwargs: str(data_dir),
+    )
+    return data_dir
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics() -> Iterator[None]:
+    """Isolate the metrics recorded by each test.
+
+    Yields:
+        Nothing, the metrics being forgotten after the test.
+    """
+    yield
+    metrics.reset()
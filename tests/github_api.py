@@ -0,0 +1,386 @@
+"""A local stand-in for the GitHub API."""
+
+import hashlib
+import json
+import re
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from socketserver import ThreadingMixIn
+from typing import Any, Final
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+
+OWNER: Final = "whiteprint"
+"""The login of the authenticated user."""
+
+REPOSITORY: Final = "test-repository"
+"""The name of the repository served by the stand-in."""
+
+RATE_LIMIT: Final = 5000
+"""The primary rate limit advertised by the stand-in."""
+
+Response = tuple[int, object]
+"""An HTTP status and a JSON serializable body."""
+
+StartResponse = Callable[[str, list[tuple[str, str]]], object]
+"""The WSGI start_response callable."""
+
+WSGIApplication = Callable[[dict[str, Any], StartResponse], list[bytes]]
+"""A WSGI application."""
+
+Route = Callable[["GithubAPI", re.Match[str], dict[str, Any]], Response]
+"""A function answering a request matched by a regex."""
+
+
+@dataclass
+class GithubAPI:
+    """In-memory state of the GitHub API stand-in.
+
+    Attributes:
+        base_url: the URL of the stand-in, set once it is served.
+        clone_url: the URL the repository is pushed to. Defaults to a URL of
+            the stand-in, which does not serve Git.
+        organizations: the logins of the organizations of the user.
+        labels: the labels of the repository by name.
+        graphql: whether the GraphQL API is available.
+        protection: the protection settings received, by API.
+        requests: the method and path of every request received.
+        not_modified: the number of 304 (Not Modified) responses sent.
+        rate_limit_remaining: the remaining quota advertised by the
+            stand-in, decremented by each request but the 304 responses.
+        lock: a lock serializing the requests.
+    """
+
+    base_url: str = ""
+    clone_url: str = ""
+    organizations: list[str] = field(default_factory=list)
+    labels: dict[str, dict[str, str]] = field(default_factory=dict)
+    graphql: bool = True
+    protection: dict[str, object] = field(default_factory=dict)
+    requests: list[tuple[str, str]] = field(default_factory=list)
+    not_modified: int = 0
+    rate_limit_remaining: int = RATE_LIMIT
+    lock: AbstractContextManager[bool] = field(
+        default_factory=threading.Lock,
+    )
+
+    def repository(self) -> dict[str, object]:
+        """The JSON representation of the repository."""
+        url = f"{self.base_url}/repos/{OWNER}/{REPOSITORY}"
+        return {
+            "id": 1,
+            "node_id": "R_1",
+            "name": REPOSITORY,
+            "full_name": f"{OWNER}/{REPOSITORY}",
+            "url": url,
+            "clone_url": (
+                self.clone_url or f"{self.base_url}/{OWNER}/{REPOSITORY}.git"
+            ),
+            "ssh_url": f"git@localhost:{OWNER}/{REPOSITORY}.git",
+            "owner": {"login": OWNER, "type": "User"},
+        }
+
+    def label(self, name: str) -> dict[str, str]:
+        """The JSON representation of a label.
+
+        Args:
+            name: the name of the label.
+
+        Returns:
+            The label with its URL.
+        """
+        return {
+            **self.labels[name],
+            "url": (
+                f"{self.base_url}/repos/{OWNER}/{REPOSITORY}/labels/"
+                f"{urllib.parse.quote(name)}"
+            ),
+        }
+
+
+def _get_user(
+    api: GithubAPI,
+    _match: re.Match[str],
+    _body: dict[str, str],
+) -> Response:
+    """GET /user."""
+    return 200, {
+        "login": OWNER,
+        "type": "User",
+        "url": f"{api.base_url}/users/{OWNER}",
+    }
+
+
+def _list_organizations(
+    api: GithubAPI,
+    _match: re.Match[str],
+    _body: dict[str, str],
+) -> Response:
+    """GET /user/orgs."""
+    return 200, [
+        {"login": login, "url": f"{api.base_url}/orgs/{login}"}
+        for login in api.organizations
+    ]
+
+
+def _get_organization(
+    api: GithubAPI,
+    match: re.Match[str],
+    _body: dict[str, str],
+) -> Response:
+    """GET /orgs/{org}."""
+    if match["login"] not in api.organizations:
+        return 404, {"message": "Not Found"}
+
+    return 200, {
+        "login": match["login"],
+        "url": f"{api.base_url}/orgs/{match['login']}",
+    }
+
+
+def _create_repository(
+    api: GithubAPI,
+    _match: re.Match[str],
+    body: dict[str, Any],
+) -> Response:
+    """POST /user/repos (the repository served is always created)."""
+    if body["name"] != REPOSITORY:
+        return 422, {"message": "Validation Failed"}
+
+    return 201, api.repository()
+
+
+def _get_repository(
+    api: GithubAPI,
+    _match: re.Match[str],
+    _body: dict[str, str],
+) -> Response:
+    """GET /repos/{owner}/{repo}."""
+    return 200, api.repository()
+
+
+def _delete_repository(
+    api: GithubAPI,
+    _match: re.Match[str],
+    _body: dict[str, str],
+) -> Response:
+    """DELETE /repos/{owner}/{repo}."""
+    api.labels.clear()
+    api.protection.clear()
+    return 204, None
+
+
+def _list_labels(
+    api: GithubAPI,
+    _match: re.Match[str],
+    _body: dict[str, str],
+) -> Response:
+    """GET /repos/{owner}/{repo}/labels."""
+    return 200, [api.label(name) for name in api.labels]
+
+
+def _create_label(
+    api: GithubAPI,
+    _match: re.Match[str],
+    body: dict[str, str],
+) -> Response:
+    """POST /repos/{owner}/{repo}/labels."""
+    if body["name"] in api.labels:
+        return 422, {"message": "Validation Failed"}
+
+    api.labels[body["name"]] = body
+    return 201, api.label(body["name"])
+
+
+def _edit_label(
+    api: GithubAPI,
+    match: re.Match[str],
+    body: dict[str, str],
+) -> Response:
+    """PATCH /repos/{owner}/{repo}/labels/{name}."""
+    name = urllib.parse.unquote(match["name"])
+    del api.labels[name]
+    api.labels[body["new_name"]] = {
+        "name": body["new_name"],
+        "color": body["color"],
+        "description": body.get("description", ""),
+    }
+    return 200, api.label(body["new_name"])
+
+
+def _delete_label(
+    api: GithubAPI,
+    match: re.Match[str],
+    _body: dict[str, str],
+) -> Response:
+    """DELETE /repos/{owner}/{repo}/labels/{name}."""
+    del api.labels[urllib.parse.unquote(match["name"])]
+    return 204, None
+
+
+def _graphql(
+    api: GithubAPI,
+    _match: re.Match[str],
+    body: dict[str, Any],
+) -> Response:
+    """POST /graphql (branch protection mutation only)."""
+    if not api.graphql:
+        return 404, {"message": "Not Found"}
+
+    api.protection["graphql"] = body["variables"]["input"]
+    return 200, {
+        "data": {
+            "createBranchProtectionRule": {
+                "branchProtectionRule": {"id": "BPR_1"},
+            },
+        },
+    }
+
+
+def _get_branch(
+    api: GithubAPI,
+    match: re.Match[str],
+    _body: dict[str, str],
+) -> Response:
+    """GET /repos/{owner}/{repo}/branches/{branch}."""
+    url = f"{api.base_url}{_REPOSITORY_PATH}/branches/{match['branch']}"
+    return 200, {
+        "name": match["branch"],
+        "protection_url": f"{url}/protection",
+    }
+
+
+def _edit_protection(
+    api: GithubAPI,
+    match: re.Match[str],
+    body: dict[str, Any],
+) -> Response:
+    """PUT or PATCH /repos/{owner}/{repo}/branches/{branch}/protection/*."""
+    api.protection[match["setting"] or "protection"] = body
+    return 200, {"url": f"{api.base_url}{match[0]}"}
+
+
+_REPOSITORY_PATH: Final = f"/repos/{OWNER}/{REPOSITORY}"
+
+_PROTECTION_PATH: Final = (
+    rf"{_REPOSITORY_PATH}/branches/(?P<branch>[^/]+)/protection"
+    r"(?:/(?P<setting>\w+))?"
+)
+
+ROUTES: Final[dict[tuple[str, str], Route]] = {
+    ("GET", r"/user"): _get_user,
+    ("GET", r"/user/orgs"): _list_organizations,
+    ("GET", r"/orgs/(?P<login>[^/]+)"): _get_organization,
+    ("POST", r"/user/repos"): _create_repository,
+    ("GET", rf"{_REPOSITORY_PATH}"): _get_repository,
+    ("DELETE", rf"{_REPOSITORY_PATH}"): _delete_repository,
+    ("GET", rf"{_REPOSITORY_PATH}/labels"): _list_labels,
+    ("POST", rf"{_REPOSITORY_PATH}/labels"): _create_label,
+    ("PATCH", rf"{_REPOSITORY_PATH}/labels/(?P<name>[^/]+)"): _edit_label,
+    ("DELETE", rf"{_REPOSITORY_PATH}/labels/(?P<name>[^/]+)"): _delete_label,
+    ("GET", rf"{_REPOSITORY_PATH}/branches/(?P<branch>[^/]+)"): _get_branch,
+    ("PUT", _PROTECTION_PATH): _edit_protection,
+    ("PATCH", _PROTECTION_PATH): _edit_protection,
+    ("POST", r"/graphql"): _graphql,
+}
+"""The routes of the stand-in, by method and path regex."""
+
+
+def _application(api: GithubAPI) -> WSGIApplication:
+    """Create a WSGI application bound to a GitHub API state.
+
+    Args:
+        api: the state of the stand-in.
+
+    Returns:
+        A WSGI application dispatching the requests to the routes.
+    """
+
+    def application(
+        environ: dict[str, Any],
+        start_response: StartResponse,
+    ) -> list[bytes]:
+        """Answer a request with the first matching route."""
+        method, path = environ["REQUEST_METHOD"], environ["PATH_INFO"]
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        body = json.loads(environ["wsgi.input"].read(length)) if length else {}
+        with api.lock:
+            api.requests.append((method, path))
+            status, payload = next(
+                (
+                    route(api, match, body)
+                    for (route_method, pattern), route in ROUTES.items()
+                    if route_method == method
+                    and (match := re.fullmatch(pattern, path))
+                ),
+                (404, {"message": "Not Found"}),
+            )
+
+        content = b"" if payload is None else json.dumps(payload).encode()
+        etag = f'"{hashlib.sha256(content).hexdigest()}"'
+        if method == "GET" and environ.get("HTTP_IF_NONE_MATCH") == etag:
+            status, content = HTTPStatus.NOT_MODIFIED, b""
+            with api.lock:
+                api.not_modified += 1
+
+        with api.lock:
+            # Conditional requests answered by a 304 are free.
+            api.rate_limit_remaining -= int(status != HTTPStatus.NOT_MODIFIED)
+            remaining = api.rate_limit_remaining
+
+        start_response(
+            f"{status} {HTTPStatus(status).phrase}",
+            [
+                ("Content-Type", "application/json"),
+                ("Content-Length", str(len(content))),
+                ("ETag", etag),
+                ("X-RateLimit-Limit", str(RATE_LIMIT)),
+                ("X-RateLimit-Remaining", str(remaining)),
+                ("X-RateLimit-Reset", str(int(time.time()) + 3600)),
+            ],
+        )
+        return [content]
+
+    return application
+
+
+class _Server(ThreadingMixIn, WSGIServer):
+    """A WSGI server handling each request in a thread."""
+
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    """A WSGI request handler which does not log the requests."""
+
+    def log_message(self, *_args: object) -> None:
+        """Do not log the requests on the standard error."""
+
+
+def serve() -> Iterator[GithubAPI]:
+    """Serve a GitHub API stand-in on a free local port.
+
+    Yields:
+        The state of the stand-in.
+    """
+    api = GithubAPI()
+    server = make_server(
+        "127.0.0.1",
+        0,
+        _application(api),
+        server_class=_Server,
+        handler_class=_QuietHandler,
+    )
+    api.base_url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield api
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,179 @@
+"""Test the cache command."""
+
+import pathlib
+import tarfile
+
+import platformdirs
+import pytest
+from click import testing
+
+from whiteprint import cache_bundle
+from whiteprint.cli import entrypoint
+from whiteprint.cli.commands import init
+
+
+@pytest.fixture
+def user_cache_dir(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> pathlib.Path:
+    """Use a temporary user cache directory and pre-commit home.
+
+    Args:
+        tmp_path: a temporary directory.
+        monkeypatch: the pytest monkeypatch fixture.
+
+    Returns:
+        The user cache directory of the tests.
+    """
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(
+        platformdirs,
+        "user_cache_dir",
+        lambda *_args, **_kwargs: str(cache_dir / "whiteprint"),
+    )
+    monkeypatch.setenv("PRE_COMMIT_HOME", str(cache_dir / "pre-commit"))
+    return cache_dir
+
+
+class TestCache:
+    """Test the export and the import of the caches."""
+
+    @staticmethod
+    def test_round_trip(
+        cli_runner: testing.CliRunner,
+        tmp_path: pathlib.Path,
+        user_cache_dir: pathlib.Path,
+    ) -> None:
+        """Check that the exported caches are imported back."""
+        hook = user_cache_dir / "pre-commit" / "repo" / "hook.py"
+        hook.parent.mkdir(parents=True)
+        hook.write_text("hook")
+        (hook.parent / "link").symlink_to(hook.name)
+        archive = tmp_path / "caches.tar.gz"
+
+        result = cli_runner.invoke(
+            entrypoint.whiteprint,
+            [
+                "--no-history",
+                "cache",
+                "export",
+                str(archive),
+                "--cache",
+                "whiteprint",
+                "--cache",
+                "pre-commit",
+                "--template",
+                str(tmp_path),
+            ],
+        )
+        assert result.exit_code == 0, result.stderr
+
+        hook.parent.rename(tmp_path / "removed")
+        result = cli_runner.invoke(
+            entrypoint.whiteprint,
+            [
+                "--no-history",
+                "cache",
+                "import",
+                str(archive),
+                "--cache",
+                "pre-commit",
+            ],
+        )
+        assert result.exit_code == 0, result.stderr
+        assert hook.read_text() == "hook", "The cache was not imported."
+        assert (hook.parent / "link").is_symlink(), "The link was not kept."
+
+    @staticmethod
+    def test_config_not_bundled(
+        tmp_path: pathlib.Path,
+        user_cache_dir: pathlib.Path,
+    ) -> None:
+        """Check that the parsed configuration files are not exported."""
+        whiteprint_cache = user_cache_dir / "whiteprint"
+        for path in ("config/defaults.json", "github/organizations.json"):
+            (whiteprint_cache / path).parent.mkdir(parents=True)
+            (whiteprint_cache / path).write_text("{}")
+        archive = tmp_path / "caches.tar"
+
+        cache_bundle.export_bundle(archive, {"whiteprint": whiteprint_cache})
+
+        with tarfile.open(archive) as tarball:
+            names = tarball.getnames()
+        assert "whiteprint/github/organizations.json" in names, (
+            "The cache was not exported."
+        )
+        assert not any(
+            name.startswith("whiteprint/config") for name in names
+        ), "The parsed configuration files must not be exported."
+
+    @staticmethod
+    def test_template_mirror(user_cache_dir: pathlib.Path) -> None:
+        """Check that only the remote templates are mirrored."""
+        mirror = cache_bundle.template_mirror("gh:whiteprints/whiteprint.git")
+
+        assert mirror is not None, "A remote template must be mirrored."
+        assert mirror.is_relative_to(user_cache_dir), "Wrong mirror location."
+        assert mirror == cache_bundle.template_mirror(
+            "https://github.com/whiteprints/whiteprint.git",
+        ), "The shortcut must be expanded."
+        assert cache_bundle.template_mirror("/local/template") is None, (
+            "A local template must not be mirrored."
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("offline", "reachable", "mirrored"),
+        [
+            (False, True, False),
+            (False, False, True),
+            (True, True, True),
+        ],
+    )
+    def test_mirror_use(
+        *,
+        offline: bool,
+        reachable: bool,
+        mirrored: bool,
+        user_cache_dir: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Check that the mirror is used offline or without network only."""
+        source = "gh:whiteprints/whiteprint.git"
+        mirror = cache_bundle.template_mirror(source)
+        assert mirror is not None, "A remote template must be mirrored."
+        assert mirror.is_relative_to(user_cache_dir), "Wrong mirror location."
+        mirror.mkdir(parents=True)
+        monkeypatch.setattr(
+            cache_bundle,
+            "remote_reachable",
+            lambda _source: reachable,
+        )
+
+        assert init._template_source(source, offline=offline) == (  # noqa: SLF001
+            str(mirror) if mirrored else source
+        ), "Wrong template source."
+
+    @staticmethod
+    def test_record_template_source(tmp_path: pathlib.Path) -> None:
+        """Check that the answers file records the location of the template."""
+        answers_file = tmp_path / init.COPIER_ANSWER_FILE
+        answers_file.write_text(
+            "# Changes here will be overwritten by Copier\n"
+            "_commit: v1.0.0\n"
+            "_src_path: /home/user/.cache/whiteprint/templates/0123\n"
+            "project_name: demo\n",
+        )
+
+        init._record_template_source(  # noqa: SLF001
+            tmp_path,
+            "gh:whiteprints/whiteprint.git",
+        )
+
+        assert answers_file.read_text() == (
+            "# Changes here will be overwritten by Copier\n"
+            "_commit: v1.0.0\n"
+            "_src_path: gh:whiteprints/whiteprint.git\n"
+            "project_name: demo\n"
+        ), "Wrong answers file."
@@ -1,11 +1,35 @@
 """Test the main CLI."""
 
+import subprocess  # nosec
+import sys
+from typing import Final
+
 from click import testing
 
 from whiteprint import version
 from whiteprint.cli import entrypoint
 
 
+LAZY_MODULES: Final = frozenset(
+    {
+        "github",
+        "pygit2",
+        "whiteprint.cache_bundle",
+        "whiteprint.version_control",
+    },
+)
+"""Modules only imported when a command using them runs."""
+
+_HELP_MODULES: Final = """
+import sys
+from click.testing import CliRunner
+from whiteprint.cli import entrypoint
+CliRunner().invoke(entrypoint.whiteprint, ["--help"])
+print(*sys.modules)
+"""
+"""Print the modules imported by `whiteprint --help`."""
+
+
 class TestCLI:
     """Test the CLI."""
 
@@ -31,6 +55,20 @@ def test_help_flag_exists(cli_runner: testing.CliRunner) -> None:
         )
         assert result.exit_code == 0, "The CLI did not exit properly."
 
+    @staticmethod
+    def test_help_is_lazy() -> None:
+        """Check that listing the commands does not import their modules."""
+        imported = subprocess.run(  # nosec
+            [sys.executable, "-c", _HELP_MODULES],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.split()
+
+        assert not LAZY_MODULES.intersection(imported), (
+            "The help must not import the modules of the commands."
+        )
+
     @staticmethod
     def test_default(cli_runner: testing.CliRunner) -> None:
         """Check if the CLI called with default arguments return prpperly.
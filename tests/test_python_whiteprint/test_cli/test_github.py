@@ -0,0 +1,244 @@
+"""Test the github command."""
+
+import logging
+import pathlib
+from typing import Final
+
+import pygit2
+import pytest
+import yaml
+from click import testing
+from github import Auth
+
+from tests import github_api as github_api_stand_in
+from tests.github_api import GithubAPI
+from whiteprint import log_context, version_control
+from whiteprint.cli import entrypoint
+from whiteprint.cli.commands import github, init
+
+
+USAGE_ERROR: Final = 2
+"""Exit code of a command called with invalid parameters."""
+
+
+def _project(
+    destination: pathlib.Path,
+    *,
+    answers: dict[str, str],
+) -> pathlib.Path:
+    """Create a generated project, committed but not provisioned."""
+    destination.mkdir()
+    (destination / init.COPIER_ANSWER_FILE).write_text(yaml.safe_dump(answers))
+    (labels := destination / init.LABEL_FILE).parent.mkdir()
+    labels.write_text(
+        yaml.safe_dump([{"name": "bug", "color": "d73a4a"}]),
+    )
+    version_control.init_and_commit(
+        destination,
+        commit_data=version_control.CommitData(message="test"),
+    )
+    return destination
+
+
+class TestProvision:
+    """Test the provision command."""
+
+    @staticmethod
+    def _provision(
+        cli_runner: testing.CliRunner,
+        github_api: GithubAPI,
+        *repositories: pathlib.Path,
+    ) -> testing.Result:
+        """Provision repositories on the GitHub API stand-in."""
+        return cli_runner.invoke(
+            entrypoint.whiteprint,
+            [
+                "github",
+                "provision",
+                *map(str, repositories),
+                "--github-token",
+                "test",
+                "--github-api-url",
+                github_api.base_url,
+                "--https-origin",
+                "--quiet",
+            ],
+        )
+
+    @staticmethod
+    def test_provision(
+        *,
+        cli_runner: testing.CliRunner,
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Check that a repository is created, pushed and protected."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        remote = pygit2.init_repository(tmp_path / "remote.git", bare=True)
+        github_api.clone_url = remote.path
+        project = _project(
+            tmp_path / "project",
+            answers={
+                "github_user": github_api_stand_in.OWNER,
+                "project_slug": github_api_stand_in.REPOSITORY,
+            },
+        )
+
+        result = TestProvision._provision(cli_runner, github_api, project)
+
+        assert result.exit_code == 0, result.stderr
+        assert remote.branches[version_control.INITIAL_HEAD_NAME], (
+            "The default branch was not pushed."
+        )
+        assert set(github_api.labels) == {"bug"}, "Labels not synchronised."
+        assert "graphql" in github_api.protection, "Branch not protected."
+
+    @staticmethod
+    def test_failure_is_reported(
+        *,
+        cli_runner: testing.CliRunner,
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Check that the repositories which failed are reported."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        project = _project(
+            tmp_path / "project",
+            answers={
+                "github_user": github_api_stand_in.OWNER,
+                "project_slug": "unknown-repository",
+            },
+        )
+
+        with caplog.at_level(logging.ERROR):
+            result = TestProvision._provision(cli_runner, github_api, project)
+
+        assert result.exit_code == 1, "The failure was not reported."
+        assert str(project) in caplog.text, "The failure was not logged."
+
+    @staticmethod
+    def test_missing_answers(
+        *,
+        cli_runner: testing.CliRunner,
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that no request is sent when an answer is missing."""
+        project = _project(tmp_path / "project", answers={})
+
+        result = TestProvision._provision(cli_runner, github_api, project)
+
+        assert result.exit_code == USAGE_ERROR, (
+            "The missing answer was not reported."
+        )
+        assert not github_api.requests, "No request must be sent."
+
+
+class TestRemoteCreatedInBackground:
+    """Test the creation of the GitHub repository during the tests."""
+
+    @staticmethod
+    def _create(
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+        *,
+        fail: bool,
+    ) -> None:
+        """Create the repository while running a (failing) block."""
+        project = _project(
+            tmp_path / "project",
+            answers={
+                "github_user": github_api_stand_in.OWNER,
+                "project_slug": github_api_stand_in.REPOSITORY,
+            },
+        )
+        github_user = version_control.GithubUser(
+            login=github_api_stand_in.OWNER,
+            token=Auth.Token("test"),
+        )
+        with (
+            github.open_session(
+                github_user,
+                base_url=github_api.base_url,
+            ) as session,
+            github.remote_created_in_background(project, session=session),
+        ):
+            if fail:
+                raise RuntimeError
+
+    @staticmethod
+    def test_created(
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Check that the repository is created but not pushed."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        TestRemoteCreatedInBackground._create(
+            github_api,
+            tmp_path,
+            fail=False,
+        )
+
+        assert ("POST", "/user/repos") in github_api.requests, (
+            "The repository was not created."
+        )
+        assert set(github_api.labels) == {"bug"}, "Labels not synchronised."
+
+    @staticmethod
+    def test_deleted_on_failure(
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Check that the repository is deleted if the block fails."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        with pytest.raises(RuntimeError):
+            TestRemoteCreatedInBackground._create(
+                github_api,
+                tmp_path,
+                fail=True,
+            )
+
+        owner, name = github_api_stand_in.OWNER, github_api_stand_in.REPOSITORY
+        repository_path = f"/repos/{owner}/{name}"
+        assert ("DELETE", repository_path) in github_api.requests, (
+            "The repository was not deleted."
+        )
+
+    @staticmethod
+    def test_deleted_on_labels_failure(
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Check that the repository is deleted if its labels fail."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        destinations = []
+
+        def failing_sync_labels(*_args: object, **_kwargs: object) -> None:
+            """Fail to synchronise the labels, recording the context."""
+            destinations.append(log_context.DESTINATION.get())
+            raise RuntimeError
+
+        monkeypatch.setattr(
+            version_control, "sync_labels", failing_sync_labels
+        )
+        with (
+            log_context.bound(log_context.DESTINATION, "project"),
+            pytest.raises(RuntimeError),
+        ):
+            TestRemoteCreatedInBackground._create(
+                github_api,
+                tmp_path,
+                fail=False,
+            )
+
+        owner, name = github_api_stand_in.OWNER, github_api_stand_in.REPOSITORY
+        assert ("DELETE", f"/repos/{owner}/{name}") in github_api.requests, (
+            "The repository was not deleted."
+        )
+        assert destinations == ["project"], "The context was not propagated."
@@ -9,7 +9,7 @@
 import pytest
 import yaml
 from click import testing
-from github import Auth
+from github import Auth, Github
 
 from tests.conftest import YAMLAutocomplete
 from whiteprint import git
@@ -229,10 +229,14 @@ def test_github(
                 ],
             },
         )
-        git.delete_github_repository(
-            project_slug,
-            token=Auth.Token(os.environ["WHITEPRINT_TEST_GITHUB_TOKEN"]),
-        )
+        token = Auth.Token(os.environ["WHITEPRINT_TEST_GITHUB_TOKEN"])
+        with git.GithubSession(
+            git.GithubUser(
+                login=Github(auth=token).get_user().login,
+                token=token,
+            ),
+        ) as session:
+            git.delete_github_repository(project_slug, session=session)
 
         assert (
             result.exit_code == 0
@@ -0,0 +1,153 @@
+"""Test the logging configuration of the CLI."""
+
+import contextlib
+import json
+import logging
+import pathlib
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Final
+
+import pytest
+
+from whiteprint import log_context, metrics
+from whiteprint.cli import logging as cli_logging
+
+
+RECORDS: Final = 64
+"""Number of records logged in the tests."""
+
+
+@contextlib.contextmanager
+def _unconfigured_root_logger() -> Generator[None, None, None]:
+    """Give an unconfigured root logger, restored afterwards.
+
+    The handlers of pytest are installed on the root logger during the
+    tests, hence they are removed in the test itself.
+
+    Yields:
+        None
+    """
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    try:
+        yield
+    finally:
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+
+        for handler in handlers:
+            root.addHandler(handler)
+
+        root.setLevel(level)
+
+
+@pytest.fixture(autouse=True)
+def _no_signal_handlers(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Do not install signal handlers in the test process."""
+    monkeypatch.setattr(cli_logging, "_FLUSH_SIGNALS", ())
+
+
+class TestConfigureLogging:
+    """Test the queue based logging pipeline."""
+
+    @staticmethod
+    def test_records_are_written(tmp_path: pathlib.Path) -> None:
+        """Check that the records of all the threads are written on stop."""
+        with (
+            _unconfigured_root_logger(),
+            (log := tmp_path / "whiteprint.log").open("w") as log_file,
+        ):
+            listener = cli_logging.configure_logging(
+                "DEBUG",
+                file=log_file,
+                log_format="{message}",
+            )
+            assert listener is not None, "The logging was not configured."
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                executor.map(
+                    lambda index: logging.getLogger(__name__).debug(
+                        "record %d",
+                        index,
+                    ),
+                    range(RECORDS),
+                )
+
+            listener.stop()
+            listener.stop()
+
+        assert log.read_text().count("record") == RECORDS, "Records lost."
+
+    @staticmethod
+    def test_rotation(tmp_path: pathlib.Path) -> None:
+        """Check that the log file is rotated."""
+        with (
+            _unconfigured_root_logger(),
+            (log := tmp_path / "whiteprint.log").open("w") as log_file,
+        ):
+            listener = cli_logging.configure_logging(
+                "INFO",
+                file=log_file,
+                log_format="{message}",
+                output=cli_logging.LogOutput(
+                    rotation=cli_logging.LogRotation(
+                        max_bytes=256,
+                        backup_count=2,
+                    ),
+                ),
+            )
+            assert listener is not None, "The logging was not configured."
+            for index in range(RECORDS):
+                logging.getLogger(__name__).info("record %d", index)
+
+            listener.stop()
+
+        assert (tmp_path / "whiteprint.log.2").is_file(), "Log not rotated."
+        assert not (tmp_path / "whiteprint.log.3").is_file(), (
+            "Too many backups."
+        )
+        assert log.stat().st_size <= 256, "Log file too large."  # noqa: PLR2004
+
+    @staticmethod
+    def test_json(tmp_path: pathlib.Path) -> None:
+        """Check that the records carry the context as JSON fields."""
+        with (
+            _unconfigured_root_logger(),
+            (log := tmp_path / "whiteprint.log").open("w") as log_file,
+        ):
+            listener = cli_logging.configure_logging(
+                "DEBUG",
+                file=log_file,
+                output=cli_logging.LogOutput(output_format="json"),
+            )
+            assert listener is not None, "The logging was not configured."
+            with (
+                log_context.bound(log_context.DESTINATION, "project"),
+                metrics.step("lock"),
+            ):
+                logging.getLogger(__name__).debug(
+                    "[bold]locked[/]",
+                    extra={"command": ["uv", "lock"], "exit_code": 0},
+                )
+
+            listener.stop()
+
+        locked, step = map(json.loads, log.read_text().splitlines()[-2:])
+        assert locked["message"] == "[bold]locked[/]", "Wrong message."
+        assert locked["step"] == "lock", "The step was not attached."
+        assert locked["destination"] == "project", "No destination."
+        assert locked["command"] == ["uv", "lock"], "No command."
+        assert locked["exit_code"] == 0, "No exit code."
+        assert step["duration"] >= 0, "No duration."
+
+    @staticmethod
+    def test_already_configured(tmp_path: pathlib.Path) -> None:
+        """Check that an already configured logging is left untouched."""
+        with (tmp_path / "whiteprint.log").open("w") as log_file:
+            assert (
+                cli_logging.configure_logging("INFO", file=log_file) is None
+            ), "The logging must not be configured twice."
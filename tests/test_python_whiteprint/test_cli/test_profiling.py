@@ -0,0 +1,32 @@
+"""Test the profiling of the CLI."""
+
+import pathlib
+import sys
+
+from whiteprint import start_process
+from whiteprint.cli import profiling
+
+
+class TestProfiled:
+    """Test the profiling of a run."""
+
+    @staticmethod
+    def test_report(tmp_path: pathlib.Path) -> None:
+        """Check that the subprocesses are reported apart from python."""
+        report = tmp_path / f"whiteprint{profiling.PROFILE_SUFFIX}"
+        with profiling.profiled("cprofile", output=report):
+            start_process.start_in_directory([sys.executable, "-c", "pass"])
+
+        content = report.read_text(encoding="utf-8")
+        assert "Subprocesses: 1" in content, "The subprocess was not reported."
+        assert "function calls" in content, "No cProfile statistics."
+
+    @staticmethod
+    def test_profile_path(tmp_path: pathlib.Path) -> None:
+        """Check that the report is written next to the log file."""
+        with (tmp_path / "whiteprint.log").open("w") as log_file:
+            path = profiling.profile_path(log_file, profiler="cprofile")
+
+        assert path == tmp_path / f"whiteprint{profiling.PROFILE_SUFFIX}", (
+            "The report must be next to the log file."
+        )
@@ -0,0 +1,86 @@
+"""Test the stats command."""
+
+import pathlib
+
+import pytest
+from click import testing
+
+from whiteprint import history, start_process
+from whiteprint.cli import entrypoint
+from whiteprint.project_manager import ProjectManagerNotFoundError
+
+
+def _missing(*_args: object, **_kwargs: object) -> str:
+    """Fail to find an executable.
+
+    Raises:
+        ProjectManagerNotFoundError: always.
+    """
+    raise ProjectManagerNotFoundError
+
+
+class TestStats:
+    """Test the report of the recorded runs."""
+
+    @staticmethod
+    def test_stats(
+        cli_runner: testing.CliRunner,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Check that the runs are recorded and reported."""
+        monkeypatch.setattr(start_process, "which", _missing)
+        database = tmp_path / "history.sqlite3"
+        for _run in range(2):
+            result = cli_runner.invoke(
+                entrypoint.whiteprint,
+                ["--history", str(database), "tool", "sync"],
+            )
+            assert result.exit_code, "The command must fail."
+
+        runs = history.RunHistory(database).runs()
+        assert [run.command for run in runs] == ["tool sync", "tool sync"], (
+            "Runs not recorded under the path of the command."
+        )
+        assert all(run.exit_status for run in runs), "Wrong exit status."
+
+        result = cli_runner.invoke(
+            entrypoint.whiteprint,
+            ["--history", str(database), "stats"],
+        )
+        assert result.exit_code == 0, result.stderr
+        assert "tool sync" in result.stderr, "Runs not reported."
+
+    @staticmethod
+    def test_usage_error_not_recorded(
+        cli_runner: testing.CliRunner,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that a usage error is not recorded."""
+        database = tmp_path / "history.sqlite3"
+        for arguments in (["unknown-command"], ["--unknown-option"]):
+            result = cli_runner.invoke(
+                entrypoint.whiteprint,
+                ["--history", str(database), "tool", *arguments],
+            )
+            assert result.exit_code == 2, result.stderr  # noqa: PLR2004
+
+        assert not history.RunHistory(database).runs(), (
+            "A usage error must not be recorded."
+        )
+
+    @staticmethod
+    def test_help_not_recorded(
+        cli_runner: testing.CliRunner,
+        user_data_dir: pathlib.Path,
+    ) -> None:
+        """Check that an early exit (e.g. --help) is not recorded."""
+        result = cli_runner.invoke(entrypoint.whiteprint, ["tool", "--help"])
+
+        assert result.exit_code == 0, result.stderr
+        assert not history.RunHistory(history.default_path()).runs(), (
+            "The help must not be recorded."
+        )
+        assert history.default_path().is_relative_to(user_data_dir), (
+            "Wrong data directory."
+        )
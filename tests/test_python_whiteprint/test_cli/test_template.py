@@ -0,0 +1,97 @@
+"""Test the template command."""
+
+import pathlib
+
+import pytest
+from click import testing
+
+from whiteprint.cli import entrypoint
+
+
+@pytest.fixture
+def template(tmp_path: pathlib.Path) -> pathlib.Path:
+    """A minimal Copier template.
+
+    Args:
+        tmp_path: a temporary directory.
+
+    Returns:
+        The path of the template.
+    """
+    template = tmp_path / "template"
+    template.mkdir()
+    (template / "copier.yml").write_text(
+        "project_name:\n  type: str\n  default: demo\n"
+        "license:\n  type: str\n  default: MIT\n",
+    )
+    (template / "{{ project_name }}.txt.jinja").write_text(
+        "{{ project_name }}\n",
+    )
+    (template / "LICENSE.jinja").write_text("{{ license }}\n")
+    return template
+
+
+class TestTemplateCheck:
+    """Test the check of a template over a matrix of answers."""
+
+    @staticmethod
+    def test_check(
+        cli_runner: testing.CliRunner,
+        template: pathlib.Path,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that the renders are compared with the golden manifests."""
+        matrix = tmp_path / "matrix.yml"
+        matrix.write_text(
+            "project_name: [alpha, beta]\nlicense: [MIT, Apache-2.0]\n",
+        )
+        golden = tmp_path / "golden"
+        arguments = [
+            "--no-history",
+            "template",
+            "check",
+            str(matrix),
+            "--whiteprint-source",
+            str(template),
+            "--golden",
+            str(golden),
+            "--jobs",
+            "2",
+        ]
+
+        result = cli_runner.invoke(entrypoint.whiteprint, arguments)
+        assert result.exit_code == 1, "Missing manifests must fail."
+        assert "new" in result.stderr, "Missing manifests not reported."
+
+        result = cli_runner.invoke(
+            entrypoint.whiteprint,
+            [*arguments, "--update"],
+        )
+        assert result.exit_code == 0, result.stderr
+        assert len(list(golden.glob("*.json"))) == 4, (  # noqa: PLR2004
+            "Manifests not recorded."
+        )
+
+        result = cli_runner.invoke(entrypoint.whiteprint, arguments)
+        assert result.exit_code == 0, result.stderr
+
+        (template / "LICENSE.jinja").write_text("License: {{ license }}\n")
+        result = cli_runner.invoke(entrypoint.whiteprint, arguments)
+        assert result.exit_code == 1, "A changed render must fail."
+        assert "~ LICENSE" in result.stderr, "Changed file not reported."
+
+    @staticmethod
+    def test_invalid_matrix(
+        cli_runner: testing.CliRunner,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that a matrix must be a mapping."""
+        matrix = tmp_path / "matrix.yml"
+        matrix.write_text("- MIT\n- Apache-2.0\n")
+
+        result = cli_runner.invoke(
+            entrypoint.whiteprint,
+            ["--no-history", "template", "check", str(matrix)],
+        )
+
+        assert result.exit_code == 2, "An invalid matrix must fail."  # noqa: PLR2004
@@ -0,0 +1,290 @@
+"""Test the tool command."""
+
+import json
+import logging
+import subprocess  # nosec
+import threading
+import time
+from pathlib import Path
+from subprocess import CompletedProcess  # nosec
+from typing import Final
+
+import pytest
+from click import testing
+
+from whiteprint import start_process
+from whiteprint.cli import entrypoint
+from whiteprint.cli.commands import tool
+
+
+JOBS: Final = 4
+"""Number of tools installed concurrently in the tests."""
+
+FAILING_TOOL: Final = "ruff"
+"""The tool whose installation fails in the tests."""
+
+
+TOOL_LIST: Final = """\
+babel v2.16.0
+- pybabel
+tox v4.23.2 [with: tox-uv]
+- tox
+ruff v0.8.0
+- ruff
+"""
+"""An output of `uv tool list --show-with`."""
+
+
+class _FakeProjectManager:
+    """Record the commands run instead of the project manager."""
+
+    def __init__(self) -> None:
+        """Initialize the recorder."""
+        self.tool_list = ""
+        self.commands: list[list[str]] = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def start_in_directory(
+        self,
+        command: list[str],
+        *,
+        working_directory: Path = Path(),
+        capture_output: bool = False,
+        encoding: str | None = None,
+    ) -> CompletedProcess[str]:
+        """Record a command, failing for FAILING_TOOL."""
+        del working_directory, capture_output, encoding
+        if command[1:3] == ["tool", "list"]:
+            return CompletedProcess(command, 0, stdout=self.tool_list)
+
+        with self.lock:
+            self.commands.append(command)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+
+        if FAILING_TOOL in command:
+            raise subprocess.CalledProcessError(1, command)
+
+        return CompletedProcess(command, 0, stdout="", stderr="")
+
+
+@pytest.fixture
+def project_manager(monkeypatch: pytest.MonkeyPatch) -> _FakeProjectManager:
+    """Replace the project manager processes by a recorder.
+
+    Returns:
+        The recorder of the commands.
+    """
+    fake = _FakeProjectManager()
+    monkeypatch.setattr(
+        start_process,
+        "which",
+        lambda name, **_kwargs: name,
+    )
+    monkeypatch.setattr(
+        start_process,
+        "start_in_directory",
+        fake.start_in_directory,
+    )
+    return fake
+
+
+class TestInstall:
+    """Test the install command."""
+
+    @staticmethod
+    def test_install(
+        *,
+        cli_runner: testing.CliRunner,
+        project_manager: _FakeProjectManager,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Check that the tools are installed concurrently."""
+        with caplog.at_level(logging.WARNING):
+            result = cli_runner.invoke(
+                entrypoint.whiteprint,
+                ["tool", "install", "--upgrade", "--jobs", str(JOBS)],
+            )
+
+        assert result.exit_code == 0, "A failed tool must not fail install."
+        assert len(project_manager.commands) == len(tool.WHITEPRINT_TOOLS), (
+            "Every tool must be installed."
+        )
+        assert 1 < project_manager.max_running <= JOBS, (
+            "The tools must be installed on a bounded pool."
+        )
+        assert all(
+            "--upgrade" in command and "--force" not in command
+            for command in project_manager.commands
+        ), "Only the flags given must be forwarded."
+        assert FAILING_TOOL in caplog.text, "The failure was not reported."
+
+
+class TestInventory:
+    """Test the inventory of the installed tools."""
+
+    @staticmethod
+    def test_parse_tool_list() -> None:
+        """Check that the tools, versions, extras and commands are parsed."""
+        inventory = tool.parse_tool_list(TOOL_LIST)
+
+        assert inventory["tox"] == tool.InstalledTool(
+            name="tox",
+            version="4.23.2",
+            extras=frozenset({"tox-uv"}),
+            commands=frozenset({"tox"}),
+        ), "Wrong inventory."
+        assert set(inventory) == {"babel", "tox", "ruff"}, "Wrong tools."
+
+    @staticmethod
+    def test_is_current() -> None:
+        """Check that a tool missing an extra is out of date."""
+        inventory = tool.parse_tool_list(
+            TOOL_LIST.replace(" [with: tox-uv]", "")
+        )
+
+        assert tool.is_current(tool.WHITEPRINT_TOOLS[0], inventory), (
+            "Babel must be up to date."
+        )
+        assert not tool.is_current(
+            tool.Tool(name="tox", commands=["tox"], extras=["tox-uv"]),
+            inventory,
+        ), "tox must be out of date."
+
+
+class TestSync:
+    """Test the sync command."""
+
+    @staticmethod
+    def test_sync(
+        *,
+        cli_runner: testing.CliRunner,
+        project_manager: _FakeProjectManager,
+    ) -> None:
+        """Check that only the missing tools are installed."""
+        project_manager.tool_list = TOOL_LIST
+
+        result = cli_runner.invoke(entrypoint.whiteprint, ["tool", "sync"])
+
+        assert result.exit_code == 0, result.stderr
+        installed = {command[4] for command in project_manager.commands}
+        assert installed == {
+            tool_.name
+            for tool_ in tool.WHITEPRINT_TOOLS
+            if tool_.name not in {"Babel", "tox", "ruff"}
+        }, "Only the missing tools must be installed."
+
+    @staticmethod
+    def test_up_to_date(
+        *,
+        cli_runner: testing.CliRunner,
+        project_manager: _FakeProjectManager,
+    ) -> None:
+        """Check that nothing is installed when the tools are up to date."""
+        project_manager.tool_list = "".join(
+            f"{tool_.name} v1.0.0"
+            + (f" [with: {', '.join(tool_.extras)}]" if tool_.extras else "")
+            + "\n"
+            + "".join(f"- {command}\n" for command in tool_.commands)
+            for tool_ in tool.WHITEPRINT_TOOLS
+        )
+
+        result = cli_runner.invoke(entrypoint.whiteprint, ["tool", "sync"])
+
+        assert result.exit_code == 0, result.stderr
+        assert not project_manager.commands, "Nothing must be installed."
+
+
+class TestBundle:
+    """Test the offline bundle of the tools."""
+
+    @staticmethod
+    def test_bundle(
+        *,
+        cli_runner: testing.CliRunner,
+        project_manager: _FakeProjectManager,
+        tmp_path: Path,
+    ) -> None:
+        """Check that the wheels of each tool are built in its directory."""
+        result = cli_runner.invoke(
+            entrypoint.whiteprint,
+            ["tool", "bundle", str(tmp_path)],
+        )
+
+        assert result.exit_code == 0, result.stderr
+        assert [
+            "--wheel-dir",
+            str(tmp_path / "tox"),
+            "tox",
+            "tox-uv",
+        ] in [command[-4:] for command in project_manager.commands], (
+            "The extras must be bundled with the tool."
+        )
+
+    @staticmethod
+    def test_install_from_bundle(
+        *,
+        cli_runner: testing.CliRunner,
+        project_manager: _FakeProjectManager,
+        tmp_path: Path,
+    ) -> None:
+        """Check that the tools are installed without index access."""
+        result = cli_runner.invoke(
+            entrypoint.whiteprint,
+            ["tool", "install", "--from-bundle", str(tmp_path)],
+        )
+
+        assert result.exit_code == 0, result.stderr
+        assert all(
+            command[-4:]
+            == [
+                "--offline",
+                "--no-index",
+                "--find-links",
+                str(tmp_path / command[4]),
+            ]
+            for command in project_manager.commands
+        ), "The tools must be installed from the bundle."
+
+
+class TestDoctor:
+    """Test the diagnostic of the tools."""
+
+    @staticmethod
+    def test_doctor(
+        *,
+        cli_runner: testing.CliRunner,
+        project_manager: _FakeProjectManager,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Check that the missing and failing commands are flagged."""
+        del project_manager
+        monkeypatch.setattr(
+            tool.shutil,
+            "which",
+            lambda command: None if command == "tox" else command,
+        )
+
+        result = cli_runner.invoke(
+            entrypoint.whiteprint,
+            ["tool", "doctor", "--json", "--threshold", "60"],
+        )
+
+        assert result.exit_code == 0, result.stderr
+        health = {
+            command["command"]: command
+            for command in json.loads(result.stdout)
+        }
+        assert len(health) == sum(
+            len(tool_.commands) for tool_ in tool.WHITEPRINT_TOOLS
+        ), "Every command must be diagnosed."
+        assert health["tox"]["status"] == "missing", "tox must be missing."
+        assert health[FAILING_TOOL]["status"] == "failed", "ruff must fail."
+        assert health["pyright"]["status"] == "ok", "pyright must be ok."
+        assert health["pyright"]["warm"] is not None, "No warm latency."
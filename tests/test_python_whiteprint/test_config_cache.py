@@ -0,0 +1,62 @@
+"""Test the configuration cache module."""
+
+import pathlib
+
+import pytest
+
+from whiteprint.cli import exceptions
+from whiteprint.cli.commands import init
+from whiteprint.config_cache import ConfigCache
+
+
+class TestConfigCache:
+    """Test the on-disk cache of the configuration files."""
+
+    @staticmethod
+    def test_store_and_load(tmp_path: pathlib.Path) -> None:
+        """Check that an entry is loaded back until the file changes."""
+        cache = ConfigCache(tmp_path / "cache")
+        (config := tmp_path / "config.yml").write_text("author: Test\n")
+        assert cache.load(config) is None, "The cache must start empty."
+
+        cache.store(config, {"author": "Test"})
+
+        assert cache.load(config) == {"author": "Test"}, "Entry not stored."
+        config.write_text("author: Another Test\n")
+        assert cache.load(config) is None, "A stale entry must be ignored."
+
+    @staticmethod
+    def test_corrupted_cache(tmp_path: pathlib.Path) -> None:
+        """Check that a corrupted cache file is ignored."""
+        cache = ConfigCache(tmp_path)
+        (config := tmp_path / "config.yml").write_text("author: Test\n")
+        cache.path(config).write_text("{")
+
+        assert cache.load(config) is None, "A corrupted entry must be ignored."
+
+
+class TestReadYaml:
+    """Test the cached reading of the yaml files."""
+
+    @staticmethod
+    def test_cached(tmp_path: pathlib.Path) -> None:
+        """Check that a parsed file is read from the cache."""
+        cache = ConfigCache(tmp_path / "cache")
+        (config := tmp_path / "config.yml").write_text("author: Test\n")
+
+        assert init.read_yaml(config, cache=cache) == {"author": "Test"}, (
+            "Wrong content."
+        )
+        assert cache.load(config) == {"author": "Test"}, "Content not cached."
+
+    @staticmethod
+    def test_unsupported_not_cached(tmp_path: pathlib.Path) -> None:
+        """Check that an unsupported content is still rejected."""
+        cache = ConfigCache(tmp_path / "cache")
+        (config := tmp_path / "config.yml").write_text("nested: {a: 1}\n")
+
+        for _attempt in range(2):
+            with pytest.raises(exceptions.UnsupportedTypeInMappingError):
+                init.read_yaml(config, cache=cache)
+
+        assert cache.load(config) is None, "Unsupported content was cached."
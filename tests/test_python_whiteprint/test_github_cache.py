@@ -0,0 +1,45 @@
+"""Test the GitHub cache module."""
+
+import pathlib
+
+from whiteprint import github_cache
+
+
+class TestEntityCache:
+    """Test the on-disk cache of the GitHub entities."""
+
+    @staticmethod
+    def test_store_and_load(tmp_path: pathlib.Path) -> None:
+        """Check that a stored entry is loaded back until it expires."""
+        cache = github_cache.EntityCache(
+            tmp_path,
+            github_cache.token_fingerprint("token", base_url="url"),
+        )
+        assert cache.load() is None, "The cache must start empty."
+
+        cache.store(["organization"], etag='"etag"')
+        entry = cache.load()
+
+        assert entry is not None, "The entry was not stored."
+        assert not entry.expired, "The entry must not be expired yet."
+        assert entry.kind("organization") == "organization", "Wrong kind."
+        assert entry.kind("user") == "user", "Wrong kind."
+
+    @staticmethod
+    def test_corrupted_cache(tmp_path: pathlib.Path) -> None:
+        """Check that a corrupted cache file is ignored."""
+        cache = github_cache.EntityCache(tmp_path, "fingerprint")
+        cache.path.write_text("{")
+
+        assert cache.load() is None, "A corrupted entry must be ignored."
+
+    @staticmethod
+    def test_fingerprint() -> None:
+        """Check that the fingerprint depends on the token and the API."""
+        fingerprint = github_cache.token_fingerprint("token", base_url="url")
+
+        assert "token" not in fingerprint, "The token must not leak."
+        assert fingerprint != github_cache.token_fingerprint(
+            "token",
+            base_url="other",
+        ), "The fingerprint must depend on the API URL."
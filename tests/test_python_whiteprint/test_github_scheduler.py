@@ -0,0 +1,117 @@
+"""Test the GitHub scheduler module."""
+
+import time
+from typing import Final
+
+import github
+import pytest
+from github import Auth
+from github.GithubException import RateLimitExceededException
+
+from tests import github_api as github_api_stand_in
+from tests.github_api import GithubAPI
+from whiteprint import github_scheduler
+
+
+WRITES: Final = 3
+"""Number of mutations sent in the spacing test."""
+
+INTERVAL: Final = 0.05
+"""Number of seconds between two mutations in the tests."""
+
+
+def _scheduler(
+    base_url: str = github.Consts.DEFAULT_BASE_URL,
+) -> github_scheduler.GithubScheduler:
+    """Create a scheduler of a GitHub client."""
+    return github_scheduler.GithubScheduler(
+        github.Github(base_url=base_url, auth=Auth.Token("test")).requester,
+        write_interval=INTERVAL,
+        max_attempts=2,
+    )
+
+
+def _rate_limited() -> None:
+    """Fail like a request hitting a secondary rate limit."""
+    raise RateLimitExceededException(
+        403,
+        {"message": "You have exceeded a secondary rate limit."},
+        {"retry-after": "0"},
+    )
+
+
+class TestGithubScheduler:
+    """Test the scheduling of the GitHub requests."""
+
+    @staticmethod
+    def test_writes_are_spaced() -> None:
+        """Check that the mutations are spaced, but not the reads."""
+        scheduler = _scheduler()
+        start = time.monotonic()
+        for _write in range(WRITES):
+            scheduler.submit(lambda: None, write=True)
+            scheduler.submit(lambda: None)
+
+        assert time.monotonic() - start >= (WRITES - 1) * INTERVAL, (
+            "The mutations were not spaced."
+        )
+        assert scheduler.counters.requests == 2 * WRITES, "Wrong requests."
+        assert scheduler.counters.writes == WRITES, "Wrong writes."
+        assert scheduler.counters.waits == WRITES - 1, "Wrong waits."
+
+    @staticmethod
+    def test_rate_limited_request_is_retried() -> None:
+        """Check that a rate limited request is retried, then fails."""
+        scheduler = _scheduler()
+        attempts = iter([_rate_limited, lambda: "done"])
+
+        def _request() -> str | None:
+            """Send the next attempt of the request."""
+            return next(attempts)()
+
+        assert scheduler.submit(_request) == "done", (
+            "The request was not retried."
+        )
+        with pytest.raises(RateLimitExceededException):
+            scheduler.submit(_rate_limited)
+
+        assert scheduler.counters.requests == 2 + 2, "Wrong requests."
+
+    @staticmethod
+    def test_exhausted_quota_is_awaited() -> None:
+        """Check that the requests wait for the reset of the quota."""
+        scheduler = _scheduler()
+        scheduler.requester.rate_limiting = (0, github_api_stand_in.RATE_LIMIT)
+        scheduler.requester.rate_limiting_resettime = time.time() + INTERVAL
+
+        scheduler.submit(lambda: None)
+
+        assert scheduler.counters.waits == 1, "The reset was not awaited."
+
+    @staticmethod
+    def test_rate_limit_is_tracked(github_api: GithubAPI) -> None:
+        """Check that the remaining quota is read from the responses."""
+        scheduler = _scheduler(github_api.base_url)
+
+        scheduler.submit(
+            lambda: scheduler.requester.requestJsonAndCheck("GET", "/user"),
+        )
+
+        assert scheduler.counters.details() == {
+            "requests": 1,
+            "writes": 0,
+            "retries": 0,
+            "waits": 0,
+            "waited": 0.0,
+            "remaining": github_api.rate_limit_remaining,
+            "limit": github_api_stand_in.RATE_LIMIT,
+        }, "The rate limit was not tracked."
+
+    @staticmethod
+    def test_transport_retry_leaves_rate_limits() -> None:
+        """Check that the HTTP client does not retry the rate limits."""
+        retry = github_scheduler.transport_retry(3)
+        assert not {403, 429} & set(retry.status_forcelist or ()), (
+            "The rate limits must be retried by the scheduler only."
+        )
+        assert retry.total == 3, "Wrong number of retries."  # noqa: PLR2004
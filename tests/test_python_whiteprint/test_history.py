@@ -0,0 +1,124 @@
+"""Test the run history."""
+
+import pathlib
+from typing import Final
+
+import pytest
+
+from whiteprint import history, metrics
+
+
+BASELINE: Final = 1.0
+"""Duration of the baseline runs in the tests."""
+
+
+def _run(
+    duration: float, *, started: float, exit_status: int = 0
+) -> history.RunRecord:
+    """A run of the init command.
+
+    Args:
+        duration: the duration of the run.
+        started: the start time of the run.
+        exit_status: the exit status of the run.
+
+    Returns:
+        The record of the run.
+    """
+    return history.RunRecord(
+        "init",
+        started=started,
+        duration=duration,
+        exit_status=exit_status,
+        template_ref="gh:whiteprints/whiteprint@v1.0.0",
+        steps={"lock": duration / 2},
+        cache_hits={"config": 1},
+    )
+
+
+class TestRunHistory:
+    """Test the SQLite database of the runs."""
+
+    @staticmethod
+    def test_record_and_list(tmp_path: pathlib.Path) -> None:
+        """Check that the runs are listed back in chronological order."""
+        runs = history.RunHistory(tmp_path / "history.sqlite3")
+        for started in (2.0, 1.0, 3.0):
+            runs.record(_run(BASELINE, started=started))
+
+        listed = runs.runs(command="init", limit=2)
+
+        assert [run.started for run in listed] == [2.0, 3.0], "Wrong order."
+        assert listed[-1] == _run(BASELINE, started=3.0), "Run altered."
+        assert not runs.runs(command="tool"), "Wrong command filter."
+
+    @staticmethod
+    def test_successful_runs(tmp_path: pathlib.Path) -> None:
+        """Check that the failed runs can be left out."""
+        runs = history.RunHistory(tmp_path / "history.sqlite3")
+        runs.record(_run(BASELINE, started=1.0))
+        runs.record(_run(BASELINE, started=2.0, exit_status=1))
+
+        assert [run.started for run in runs.runs(successful=True)] == [1.0], (
+            "The failed runs must be left out."
+        )
+
+    @staticmethod
+    def test_from_metrics() -> None:
+        """Check that a run is recorded from the metrics of the run."""
+        with metrics.step("history-step"):
+            pass
+
+        run = history.RunRecord.from_metrics(
+            "init",
+            started=0.0,
+            duration=1.0,
+            exit_status=0,
+        )
+
+        assert "history-step" in run.steps, "Step durations not recorded."
+        assert run.host["cpus"], "Host not described."
+
+
+class TestRegressions:
+    """Test the detection of the slow runs."""
+
+    @staticmethod
+    def test_regressions() -> None:
+        """Check that a run twice as slow as its baseline is flagged."""
+        runs = [
+            *(_run(BASELINE, started=float(started)) for started in range(4)),
+            _run(10 * BASELINE, started=4.0, exit_status=1),
+            _run(2 * BASELINE, started=5.0),
+        ]
+
+        found = history.regressions(runs)
+
+        assert [regression.run for regression in found] == runs[-1:], (
+            "Wrong regressions."
+        )
+        assert found[0].ratio == pytest.approx(2.0), "Wrong ratio."
+
+    @staticmethod
+    def test_record_run_warns(
+        tmp_path: pathlib.Path,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Check that recording a regression warns."""
+        runs = history.RunHistory(tmp_path / "history.sqlite3")
+        for started in range(3):
+            history.record_run(runs, _run(BASELINE, started=float(started)))
+
+        assert history.record_run(runs, _run(3.0, started=3.0)) is not None, (
+            "Regression not detected."
+        )
+        assert "whiteprint stats" in caplog.text, "No warning."
+
+    @staticmethod
+    def test_trend() -> None:
+        """Check that the latest durations are compared to the previous."""
+        assert history.trend([1.0] * 5) is None, "Not enough durations."
+        assert history.trend([1.0] * 3 + [2.0] * 3) == pytest.approx(2.0), (
+            "Wrong trend."
+        )
+        assert history.percentile([3.0, 1.0, 2.0], 0.5) == 2.0, "Wrong p50."  # noqa: PLR2004
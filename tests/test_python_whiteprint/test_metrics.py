@@ -0,0 +1,107 @@
+"""Test the metrics module."""
+
+import io
+import subprocess  # nosec
+import sys
+
+import pytest
+from rich import console as rich_console
+
+from whiteprint import metrics, start_process
+
+
+class TestStep:
+    """Test the step records."""
+
+    @staticmethod
+    def test_step_is_recorded() -> None:
+        """Check that a step is recorded even if it fails."""
+
+        def _fail() -> None:
+            with metrics.step("failing-step"):
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            _fail()
+
+        record = metrics.STEPS[-1]
+
+        assert record.name == "failing-step", "The step was not recorded."
+        assert record.duration >= 0, "Invalid step duration."
+
+    @staticmethod
+    def test_report() -> None:
+        """Check that the report contains the steps and their details."""
+        with metrics.step("reported-step") as record:
+            record.details["size_bytes"] = 2048
+
+        output = io.StringIO()
+        metrics.report(rich_console.Console(file=output, width=200))
+        assert "reported-step" in output.getvalue(), "Step not reported."
+        assert "size=2.0 kB" in output.getvalue(), "Details not reported."
+
+    @staticmethod
+    def test_reset() -> None:
+        """Check that the metrics recorded so far can be forgotten."""
+        with metrics.step("forgotten-step"):
+            metrics.CACHE_HITS["template"] += 1
+            metrics.CACHE_MISSES["template"] += 1
+            metrics.LABELS["template"] = "forgotten"
+
+        metrics.reset()
+
+        assert not metrics.STEPS, "Steps not forgotten."
+        assert not metrics.CACHE_HITS, "Cache hits not forgotten."
+        assert not metrics.CACHE_MISSES, "Cache misses not forgotten."
+        assert not metrics.LABELS, "Labels not forgotten."
+
+    @staticmethod
+    def test_processes_usage() -> None:
+        """Check that the resources used by the subprocesses are recorded."""
+        with metrics.step("subprocess-step") as record:
+            start_process.start_in_directory(
+                [sys.executable, "-c", "print('used')"],
+            )
+
+        assert record.details["processes"] == 1, "Subprocess not accounted."
+        assert record.details["max_rss_bytes"] > 0, "No peak memory."
+        assert start_process.PROCESSES[-1].usage is not None, "No usage."
+
+    @staticmethod
+    def test_processes_peak_is_their_own() -> None:
+        """Check that the peak memory of a subprocess is not inherited."""
+        for size in (256, 0):
+            start_process.start_in_directory(
+                [sys.executable, "-c", f"bytearray({size} * 2**20)"],
+            )
+
+        large, small = (
+            process.usage for process in start_process.PROCESSES[-2:]
+        )
+        assert large is not None, "No usage."
+        assert small is not None, "No usage."
+        assert small.max_rss_bytes < large.max_rss_bytes, (
+            "The peak memory of a subprocess must be its own."
+        )
+
+    @staticmethod
+    def test_processes_reset() -> None:
+        """Check that the subprocesses completed so far can be forgotten."""
+        start_process.start_in_directory([sys.executable, "-c", "pass"])
+        start_process.reset()
+
+        assert not start_process.PROCESSES, "Subprocesses not forgotten."
+
+    @staticmethod
+    def test_failed_process_usage() -> None:
+        """Check that a failed subprocess is accounted and still raises."""
+        with (
+            pytest.raises(subprocess.CalledProcessError) as error,
+            metrics.step("failing-subprocess-step") as record,
+        ):
+            start_process.start_in_directory(
+                [sys.executable, "-c", "raise SystemExit(3)"],
+            )
+
+        assert error.value.returncode == 3, "Wrong return code."  # noqa: PLR2004
+        assert record.details["processes"] == 1, "Subprocess not accounted."
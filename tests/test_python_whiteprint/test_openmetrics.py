@@ -0,0 +1,99 @@
+"""Test the OpenMetrics export of the run metrics."""
+
+import pathlib
+
+import pytest
+from click import testing
+
+from whiteprint import metrics, openmetrics, start_process
+from whiteprint.cli import entrypoint
+from whiteprint.project_manager import ProjectManagerNotFoundError
+
+
+def _missing(*_args: object, **_kwargs: object) -> str:
+    """Fail to find an executable.
+
+    Raises:
+        ProjectManagerNotFoundError: always.
+    """
+    raise ProjectManagerNotFoundError
+
+
+class TestRender:
+    """Test the OpenMetrics exposition."""
+
+    @staticmethod
+    def test_render() -> None:
+        """Check that the steps and their failures are exposed."""
+        with (
+            pytest.raises(RuntimeError),
+            metrics.step('failing "step"'),
+        ):
+            raise RuntimeError
+
+        exposition = openmetrics.render("init", duration=1.5, exit_status=1)
+
+        assert exposition.endswith("# EOF\n"), "Unterminated exposition."
+        assert 'whiteprint_run_exit_status{command="init"} 1' in exposition, (
+            "No exit status."
+        )
+        assert (
+            'whiteprint_step_duration_seconds_bucket{command="init",'
+            'step="failing \\"step\\"",le="+Inf"} 1'
+        ) in exposition, "No step histogram."
+        assert (
+            'whiteprint_step_failures{command="init",'
+            'step="failing \\"step\\""} 1'
+        ) in exposition, "No step failure."
+
+
+class TestTextfile:
+    """Test the textfile written at the end of a run."""
+
+    @staticmethod
+    def test_metrics_file(
+        cli_runner: testing.CliRunner,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Check that the metrics of a tool run are written."""
+        monkeypatch.setattr(start_process, "which", _missing)
+        result = cli_runner.invoke(
+            entrypoint.whiteprint,
+            [
+                "--no-history",
+                "--metrics-file",
+                str(tmp_path / "whiteprint_{command}.prom"),
+                "tool",
+                "sync",
+            ],
+        )
+
+        assert result.exit_code, "The command must fail."
+        assert [path.name for path in tmp_path.iterdir()] == [
+            "whiteprint_tool_sync.prom",
+        ], "The textfile must be written atomically."
+        assert (
+            'whiteprint_run_exit_status{command="tool sync"} 1'
+            in (tmp_path / "whiteprint_tool_sync.prom").read_text()
+        ), "Wrong exit status."
+
+    @staticmethod
+    def test_failed_write_is_cleaned(
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Check that the temporary file is removed when the write fails."""
+
+        def _fail(*_args: object, **_kwargs: object) -> None:
+            """Fail to rename the temporary file.
+
+            Raises:
+                OSError: always.
+            """
+            raise OSError
+
+        monkeypatch.setattr(pathlib.Path, "replace", _fail)
+        openmetrics.write_textfile(tmp_path / "whiteprint.prom", "")
+
+        assert not list(tmp_path.iterdir()), "The temporary file was left."
@@ -0,0 +1,57 @@
+"""Test the regression checks of a template over a matrix of answers."""
+
+import pathlib
+
+from whiteprint import template_matrix
+
+
+class TestSample:
+    """Test the sampling of the combinations of a matrix."""
+
+    @staticmethod
+    def test_sample_covers_every_value() -> None:
+        """Check that every value of every question is sampled."""
+        matrix = {
+            "license": ["MIT", "Apache-2.0", "GPL-3.0", "BSD-3-Clause"],
+            "git_platform": ["github", "no_git_platform"],
+            "python": ["3.10", "3.11", "3.12"],
+        }
+
+        sample = template_matrix.sample(matrix, 6, seed=1)
+
+        assert len(sample) == 6, "Wrong sample size."  # noqa: PLR2004
+        assert len({template_matrix.answers_key(a) for a in sample}) == len(
+            sample,
+        ), "The combinations must be distinct."
+        for question, values in matrix.items():
+            assert {answers[question] for answers in sample} == set(values), (
+                f"Values of {question} not covered."
+            )
+        assert template_matrix.sample(matrix, 6, seed=1) == sample, (
+            "The sample must be reproducible."
+        )
+
+    @staticmethod
+    def test_small_matrix() -> None:
+        """Check that a small matrix is fully enumerated."""
+        matrix = {"license": ["MIT", "Apache-2.0"], "python": ["3.12"]}
+
+        assert template_matrix.sample(matrix, 10, seed=0) == list(
+            template_matrix.combinations(matrix),
+        ), "Every combination must be checked."
+        assert template_matrix.size(matrix) == 2, "Wrong size."  # noqa: PLR2004
+
+
+class TestTreeManifest:
+    """Test the manifests of the rendered trees."""
+
+    @staticmethod
+    def test_tree_manifest(tmp_path: pathlib.Path) -> None:
+        """Check that the answers file is not hashed."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "module.py").write_text("")
+        (tmp_path / ".copier-answers.yml").write_text("_commit: v1\n")
+
+        assert list(template_matrix.tree_manifest(tmp_path)) == [
+            "src/module.py",
+        ], "Wrong files."
@@ -0,0 +1,136 @@
+"""Test the pytest plugin rendering the templates."""
+
+import pathlib
+
+import pytest
+
+from whiteprint import filesystem, version_control
+from whiteprint.testing import ProjectRenderer, template_fingerprint
+
+
+@pytest.fixture
+def template(tmp_path: pathlib.Path) -> pathlib.Path:
+    """A minimal Copier template.
+
+    Args:
+        tmp_path: a temporary directory.
+
+    Returns:
+        The path of the template.
+    """
+    template = tmp_path / "template"
+    template.mkdir()
+    (template / "copier.yml").write_text(
+        "project_name:\n  type: str\n  default: demo\n",
+    )
+    (template / "{{ project_name }}.txt.jinja").write_text(
+        "{{ project_name }}\n",
+    )
+    return template
+
+
+class TestProjectRenderer:
+    """Test the cached renders of the projects."""
+
+    @staticmethod
+    def test_render_is_cached(
+        template: pathlib.Path,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that a set of answers is rendered once."""
+        renderer = ProjectRenderer(str(template), tmp_path / "renders")
+
+        render = renderer.render({"project_name": "cached"})
+        (render / "marker").touch()
+
+        assert (render / "cached.txt").read_text() == "cached\n", (
+            "Not rendered."
+        )
+        assert renderer.render({"project_name": "cached"}) == render, (
+            "The render must be reused."
+        )
+        assert renderer.render({"project_name": "other"}) != render, (
+            "The answers must be part of the key."
+        )
+        assert (
+            ProjectRenderer(str(template), tmp_path / "renders").render(
+                {"project_name": "cached"},
+            )
+            / "marker"
+        ).is_file(), "The render must be reused across sessions."
+
+    @staticmethod
+    def test_template_change(
+        template: pathlib.Path,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that a modified template is rendered again."""
+        render = ProjectRenderer(str(template), tmp_path / "renders").render(
+            {}
+        )
+        (template / "added.txt").write_text("added\n")
+
+        assert (
+            ProjectRenderer(str(template), tmp_path / "renders").render({})
+            != render
+        ), "The template must be part of the key."
+
+    @staticmethod
+    def test_new_release(template: pathlib.Path) -> None:
+        """Check that a new tag of a template changes its fingerprint."""
+        repository = version_control.init_and_commit(
+            template,
+            commit_data=version_control.CommitData(message="v1"),
+        )
+        repository.references.create(
+            "refs/tags/v1.0.0", repository.head.target
+        )
+        fingerprint = template_fingerprint(str(template))
+
+        version_control.add_and_commit(
+            repository,
+            commit_data=version_control.CommitData(message="v2"),
+        )
+        repository.references.create(
+            "refs/tags/v2.0.0", repository.head.target
+        )
+
+        assert template_fingerprint(str(template)) != fingerprint, (
+            "A new release must change the fingerprint."
+        )
+        assert template_fingerprint(
+            str(template),
+            vcs_ref="v1.0.0",
+        ) == template_fingerprint(str(template), vcs_ref="v1.0.0"), (
+            "The fingerprint must be stable."
+        )
+
+    @staticmethod
+    def test_copy(template: pathlib.Path, tmp_path: pathlib.Path) -> None:
+        """Check that a copy does not alter the cached render."""
+        renderer = ProjectRenderer(str(template), tmp_path / "renders")
+
+        copy = renderer.copy({}, tmp_path / "project")
+        (copy / "demo.txt").write_text("modified\n")
+
+        assert (renderer.render({}) / "demo.txt").read_text() == "demo\n", (
+            "The cached render was modified."
+        )
+
+
+class TestCopyTree:
+    """Test the copy-on-write copy of the directory trees."""
+
+    @staticmethod
+    def test_copy_tree(tmp_path: pathlib.Path) -> None:
+        """Check that the files and the links are copied."""
+        (source := tmp_path / "source" / "package").mkdir(parents=True)
+        (source / "module.py").write_text("content")
+        (source / "link.py").symlink_to("module.py")
+
+        copy = filesystem.copy_tree(tmp_path / "source", tmp_path / "copy")
+
+        assert (copy / "package" / "module.py").read_text() == "content", (
+            "File not copied."
+        )
+        assert (copy / "package" / "link.py").is_symlink(), "Link not kept."
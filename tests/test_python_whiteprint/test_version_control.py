@@ -0,0 +1,469 @@
+"""Test the version control module."""
+
+import pathlib
+import shutil
+from typing import Final
+
+import github
+import github.Repository
+import pygit2
+import pygit2.repository
+import yaml
+from github import Auth
+
+from tests import github_api as github_api_stand_in
+from tests.github_api import GithubAPI
+from whiteprint import (
+    filesystem,
+    github_scheduler,
+    metrics,
+    version_control,
+)
+
+
+FILES: Final = 10
+"""Number of files committed in the test repository."""
+
+
+class TestPack:
+    """Test packing the loose objects of a repository."""
+
+    @staticmethod
+    def test_pack_repository(tmp_path: pathlib.Path) -> None:
+        """Check that the loose objects are replaced by a packfile."""
+        for index in range(FILES):
+            (tmp_path / f"file_{index}.txt").write_text(str(index))
+
+        repository = version_control.init_and_commit(
+            tmp_path,
+            commit_data=version_control.CommitData(message="test"),
+        )
+        objects = pathlib.Path(repository.path) / "objects"
+        size_before = filesystem.disk_usage(objects)
+
+        written_objects = version_control.pack_repository(repository)
+
+        assert written_objects == FILES + 2, (
+            "Expected one blob per file, one tree and one commit."
+        )
+        assert not list(
+            objects.glob("[0-9a-f][0-9a-f]"),
+        ), "Loose objects remain after packing."
+        assert len(list((objects / "pack").glob("*.pack"))) == 1, (
+            "Expected a single packfile."
+        )
+        assert filesystem.disk_usage(objects) < size_before, (
+            "Packing did not reduce the disk usage."
+        )
+        head = repository.revparse_single(version_control.HEAD)
+        assert head.tree["file_0.txt"].data == b"0", (
+            "Objects are not readable."
+        )
+
+
+class TestSharedObjects:
+    """Test sharing objects between repositories through alternates."""
+
+    @staticmethod
+    def _init(
+        destination: pathlib.Path,
+        *,
+        shared_objects: pathlib.Path,
+    ) -> pygit2.repository.Repository:
+        """Commit the same files in a new repository using a store.
+
+        The commit message is the name of the repository so that commits
+        differ between repositories.
+        """
+        destination.mkdir()
+        for index in range(FILES):
+            (destination / f"file_{index}.txt").write_text(str(index))
+
+        return version_control.init_and_commit(
+            destination,
+            commit_data=version_control.CommitData(message=destination.name),
+            shared_objects=shared_objects,
+        )
+
+    @staticmethod
+    def test_share_objects(tmp_path: pathlib.Path) -> None:
+        """Check that identical objects are stored once."""
+        store = tmp_path / "store"
+        first = TestSharedObjects._init(
+            tmp_path / "first",
+            shared_objects=store,
+        )
+        assert (
+            version_control.share_objects(first, shared_objects=store)
+            == FILES + 2
+        ), "Expected one blob per file, one tree and one commit."
+
+        second = TestSharedObjects._init(
+            tmp_path / "second",
+            shared_objects=store,
+        )
+        assert (
+            version_control.share_objects(second, shared_objects=store) == 1
+        ), "Only the commit of the second repository should be new."
+        assert not list(
+            (pathlib.Path(second.path) / "objects").glob("[0-9a-f][0-9a-f]"),
+        ), "Loose objects remain after sharing."
+        head = second.revparse_single(version_control.HEAD)
+        assert head.tree["file_0.txt"].data == b"0", (
+            "Objects are not readable."
+        )
+
+    @staticmethod
+    def test_detach_repository(tmp_path: pathlib.Path) -> None:
+        """Check that a detached repository no longer needs the store."""
+        store = tmp_path / "store"
+        repository = TestSharedObjects._init(
+            tmp_path / "repository",
+            shared_objects=store,
+        )
+        version_control.share_objects(repository, shared_objects=store)
+
+        assert version_control.detach_repository(repository) == FILES + 2, (
+            "Expected one blob per file, one tree and one commit."
+        )
+        shutil.rmtree(store)
+        detached = pygit2.Repository(repository.path)
+        head = detached.revparse_single(version_control.HEAD)
+        assert head.tree["file_0.txt"].data == b"0", (
+            "Objects are not readable."
+        )
+
+
+class TestPush:
+    """Test pushing a repository."""
+
+    @staticmethod
+    def test_push_repository(tmp_path: pathlib.Path) -> None:
+        """Check that the push progress is recorded in the metrics."""
+        (destination := tmp_path / "repository").mkdir()
+        for index in range(FILES):
+            (destination / f"file_{index}.txt").write_text(str(index))
+
+        repository = version_control.init_and_commit(
+            destination,
+            commit_data=version_control.CommitData(message="test"),
+        )
+        remote = pygit2.init_repository(tmp_path / "remote.git", bare=True)
+        repository.remotes.create("origin", remote.path)
+
+        version_control.push_repository(
+            repository,
+            github_user=version_control.GithubUser(
+                login="whiteprint",
+                token=Auth.Token("unused"),
+            ),
+        )
+
+        assert metrics.STEPS[-1].name == "push", "The push was not recorded."
+        assert metrics.STEPS[-1].details["objects"] == FILES + 2, (
+            "Expected one blob per file, one tree and one commit."
+        )
+        assert remote.branches[version_control.INITIAL_HEAD_NAME], (
+            "The default branch was not pushed."
+        )
+
+    @staticmethod
+    def test_server_timeout_is_restored() -> None:
+        """Check that the server timeout is restored after the pushes."""
+        previous = pygit2.option(pygit2.enums.Option.GET_SERVER_TIMEOUT)
+        timeout = version_control._PUSH_SERVER_TIMEOUT  # noqa: SLF001
+        with timeout.apply(1.5), timeout.apply(1.5):
+            assert (
+                pygit2.option(pygit2.enums.Option.GET_SERVER_TIMEOUT) == 1500  # noqa: PLR2004
+            ), "The push stall timeout was not set."
+
+        assert (
+            pygit2.option(pygit2.enums.Option.GET_SERVER_TIMEOUT) == previous
+        ), "The server timeout was not restored."
+
+
+class TestLabels:
+    """Test the synchronisation of the labels."""
+
+    @staticmethod
+    def _repository(
+        github_api: GithubAPI,
+    ) -> github.Repository.Repository:
+        """Get the repository served by the GitHub API stand-in."""
+        return github.Github(
+            base_url=github_api.base_url,
+            auth=Auth.Token("test"),
+            seconds_between_requests=None,
+            seconds_between_writes=None,
+        ).get_repo(
+            f"{github_api_stand_in.OWNER}/{github_api_stand_in.REPOSITORY}"
+        )
+
+    @staticmethod
+    def _scheduler(
+        repository: github.Repository.Repository,
+    ) -> github_scheduler.GithubScheduler:
+        """Schedule the requests without spacing the mutations."""
+        return github_scheduler.GithubScheduler(
+            repository.requester,
+            write_interval=0.0,
+        )
+
+    @staticmethod
+    def test_sync_labels(
+        *,
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that only the differences are sent."""
+        github_api.labels = {
+            "bug": {"name": "bug", "color": "d73a4a", "description": "Bug"},
+            "docs": {"name": "docs", "color": "ffffff", "description": ""},
+            "wontfix": {"name": "wontfix", "color": "000000"},
+        }
+        wanted = [
+            {"name": "bug", "color": "D73A4A", "description": "Bug"},
+            {"name": "docs", "color": "0075ca", "description": "Docs"},
+            {"name": "ci", "color": "4a97d6", "description": "CI"},
+        ]
+        (labels := tmp_path / "labels.yml").write_text(yaml.safe_dump(wanted))
+
+        repository = TestLabels._repository(github_api)
+        scheduler = TestLabels._scheduler(repository)
+        delta = version_control.sync_labels(
+            repository,
+            labels=labels,
+            scheduler=scheduler,
+        )
+
+        assert [label["name"] for label in delta.create] == ["ci"], (
+            "Only the missing label must be created."
+        )
+        assert [label.name for label, _ in delta.update] == ["docs"], (
+            "Only the modified label must be edited."
+        )
+        assert [label.name for label in delta.delete] == ["wontfix"], (
+            "Only the extra label must be deleted."
+        )
+        assert set(github_api.labels) == {"bug", "ci", "docs"}, (
+            "The labels were not synchronised."
+        )
+        assert github_api.labels["docs"] == wanted[1], (
+            "The label was not edited."
+        )
+        assert (
+            sum(
+                method == "GET" and path.endswith("/labels")
+                for method, path in github_api.requests
+            )
+            == 1
+        ), "The labels must be listed once."
+        assert scheduler.counters.writes == len(wanted), (
+            "Every mutation must go through the scheduler."
+        )
+
+    @staticmethod
+    def test_sync_labels_noop(
+        *,
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that no request is sent when the labels are up to date."""
+        wanted = [{"name": "bug", "color": "d73a4a", "description": "Bug"}]
+        github_api.labels = {"bug": dict(wanted[0])}
+        (labels := tmp_path / "labels.yml").write_text(yaml.safe_dump(wanted))
+        repository = TestLabels._repository(github_api)
+        github_api.requests.clear()
+
+        version_control.sync_labels(
+            repository,
+            labels=labels,
+            scheduler=TestLabels._scheduler(repository),
+        )
+
+        labels_path = (
+            f"/repos/{github_api_stand_in.OWNER}/"
+            f"{github_api_stand_in.REPOSITORY}/labels"
+        )
+        assert github_api.requests == [("GET", labels_path)], (
+            "Only the labels listing is expected."
+        )
+
+
+class TestGithubSession:
+    """Test the GitHub session."""
+
+    @staticmethod
+    def _session(
+        github_api: GithubAPI,
+        cache_directory: pathlib.Path | None = None,
+    ) -> version_control.GithubSession:
+        """Open a session on the GitHub API stand-in."""
+        return version_control.GithubSession(
+            version_control.GithubUser(
+                login="organization",
+                token=Auth.Token("test"),
+            ),
+            base_url=github_api.base_url,
+            cache_directory=cache_directory,
+        )
+
+    @staticmethod
+    def test_entity_is_memoized(github_api: GithubAPI) -> None:
+        """Check that the organizations are listed once per session."""
+        github_api.organizations = ["other", "organization"]
+        with TestGithubSession._session(github_api) as session:
+            organization = session.entity()
+            assert session.entity() is organization, "Entity not memoized."
+            assert github_api.requests.count(("GET", "/user/orgs")) == 1, (
+                "The organizations must be listed once per login."
+            )
+            assert session.entity(github_api_stand_in.OWNER) is (
+                session.authenticated_user
+            ), "The user login must give the authenticated user."
+
+        assert organization.login == "organization", "Wrong organization."
+
+    @staticmethod
+    def test_views_share_the_lookups(github_api: GithubAPI) -> None:
+        """Check that the views of a session share its lookups."""
+        github_api.organizations = ["organization"]
+        with TestGithubSession._session(github_api) as session:
+            view = session.with_login(github_api_stand_in.OWNER)
+            assert view.entity() is view.authenticated_user, "Wrong entity."
+            assert session.entity().login == "organization", (
+                "Wrong organization."
+            )
+            assert session.with_login("organization").entity() is (
+                session.entity()
+            ), "The entities must be shared."
+
+        assert github_api.requests.count(("GET", "/user/orgs")) == 1, (
+            "The organizations must be listed once for all the views."
+        )
+        assert github_api.requests.count(("GET", "/orgs/organization")) == 1, (
+            "The organization must be looked up once for all the views."
+        )
+
+    @staticmethod
+    def test_requests_are_scheduled(github_api: GithubAPI) -> None:
+        """Check that the lookups and the deletion go through the scheduler."""
+        github_api.organizations = ["organization"]
+        with TestGithubSession._session(github_api) as session:
+            session.scheduler.write_interval = 0.0
+            session.entity()
+            version_control.delete_github_repository(
+                github_api_stand_in.REPOSITORY,
+                session=session,
+                owner=github_api_stand_in.OWNER,
+            )
+            counters = session.scheduler.counters
+
+        assert (counters.requests, counters.writes) == (4, 1), (
+            "The requests must be submitted to the scheduler."
+        )
+        assert github_api.requests[-1] == (
+            "DELETE",
+            (
+                f"/repos/{github_api_stand_in.OWNER}/"
+                f"{github_api_stand_in.REPOSITORY}"
+            ),
+        ), "The repository was not deleted."
+
+    @staticmethod
+    def test_organizations_are_cached(
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that the organizations are listed once across sessions."""
+        github_api.organizations = ["organization"]
+        for _session in range(2):
+            with TestGithubSession._session(github_api, tmp_path) as session:
+                assert session.entity().login == "organization", (
+                    "Wrong organization."
+                )
+
+        assert github_api.requests.count(("GET", "/user/orgs")) == 1, (
+            "The organizations must be listed once per cache lifetime."
+        )
+        assert "test" not in "".join(
+            path.read_text() + path.name for path in tmp_path.iterdir()
+        ), "The token must not be stored in the cache."
+
+    @staticmethod
+    def test_expired_cache_is_revalidated(
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that an expired cache is revalidated with its ETag."""
+        github_api.organizations = ["organization"]
+        with TestGithubSession._session(github_api, tmp_path) as session:
+            session.entity()
+
+        (cache_file,) = tmp_path.iterdir()
+        cache_file.write_text(
+            cache_file.read_text().replace('"expires": ', '"expires": -'),
+        )
+        with TestGithubSession._session(github_api, tmp_path) as session:
+            assert session.entity().login == "organization", (
+                "Wrong organization."
+            )
+
+        assert github_api.not_modified == 1, "The cache was not revalidated."
+
+
+class TestProtection:
+    """Test the protection of the default branch."""
+
+    @staticmethod
+    def _protect(github_api: GithubAPI, tmp_path: pathlib.Path) -> None:
+        """Protect the repository served by the GitHub API stand-in."""
+        repository = pygit2.init_repository(tmp_path)
+        with version_control.GithubSession(
+            version_control.GithubUser(
+                login=github_api_stand_in.OWNER,
+                token=Auth.Token("test"),
+            ),
+            base_url=github_api.base_url,
+        ) as session:
+            session.scheduler.write_interval = 0.0
+            version_control.protect_repository(
+                repository,
+                project_slug=github_api_stand_in.REPOSITORY,
+                session=session,
+                https_origin=True,
+            )
+
+    @staticmethod
+    def test_graphql(github_api: GithubAPI, tmp_path: pathlib.Path) -> None:
+        """Check that the protection is applied in a single mutation."""
+        TestProtection._protect(github_api, tmp_path)
+
+        assert github_api.protection["graphql"] == {
+            "repositoryId": "R_1",
+            "pattern": version_control.INITIAL_HEAD_NAME,
+            "isAdminEnforced": True,
+            "lockBranch": True,
+            "requiresApprovingReviews": True,
+            "requiresCodeOwnerReviews": True,
+            "requiresStatusChecks": True,
+            "requiresStrictStatusChecks": True,
+        }, "Unexpected protection rule."
+        assert not any(
+            "/branches/" in path for _, path in github_api.requests
+        ), "The REST API must not be used."
+
+    @staticmethod
+    def test_rest_fallback(
+        github_api: GithubAPI,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Check that REST is used when GraphQL is not available."""
+        github_api.graphql = False
+        TestProtection._protect(github_api, tmp_path)
+
+        assert set(github_api.protection) == {
+            "protection",
+            "required_pull_request_reviews",
+            "required_status_checks",
+        }, "The protection was not applied with the REST API."